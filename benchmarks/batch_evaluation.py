@@ -0,0 +1,93 @@
+"""Compare the evaluations per second of the example optimization
+with one simulation per individual and with stacked simulations of several individuals.
+
+All variants evaluate the same random individuals with the same number of worker processes.
+
+Needs oemof and the cbc solver.
+
+Usage::
+
+    python benchmarks/batch_evaluation.py [--individuals 32] [--n-core 4] [--batch-sizes 2 4 8]
+"""
+
+import argparse
+import copy
+import logging
+import random
+import time
+from multiprocessing import freeze_support
+
+from smooth.examples.example_model import mymodel
+from smooth.optimization.run_optimization import Individual, Optimization
+
+logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+
+
+def get_opt_config(args, batch_size):
+    model = copy.deepcopy(mymodel)
+    names = [c.pop("name") for c in model["components"]]
+    model["components"] = dict(zip(names, model["components"]))
+    return {
+        'population_size': args.individuals,
+        'n_generation': 1,
+        'n_core': args.n_core,
+        'batch_size': batch_size,
+        'attribute_variation': [{
+            'comp_name': 'this_ely',
+            'comp_attribute': 'power_max',
+            'val_min': 100e3,
+            'val_max': 2000e3,
+            'val_step': 50e3
+        }, {
+            'comp_name': 'h2_storage',
+            'comp_attribute': 'storage_capacity',
+            'val_min': 0,
+            'val_max': 2000,
+            'val_step': 50
+        }],
+        'model': model,
+    }
+
+
+def evaluations_per_second(args, batch_size, genes):
+    """Evaluate the individuals once, return evaluations per second and fitness"""
+    opt = Optimization(get_opt_config(args, batch_size))
+    # start workers before measuring
+    opt.start_pool()
+    try:
+        opt.population = [Individual(list(values)) for values in genes]
+        start = time.perf_counter()
+        n_evaluated = opt.compute_fitness()
+        duration = time.perf_counter() - start
+    finally:
+        opt.close_pool()
+    return n_evaluated / duration, [ind.fitness for ind in opt.population]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--individuals', type=int, default=32)
+    parser.add_argument('--n-core', type=int, default=4)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[2, 4, 8])
+    args = parser.parse_args()
+
+    random.seed(0)
+    genes = [[random.randrange(2, 41) * 50e3, random.randrange(0, 41) * 50]
+             for _ in range(args.individuals)]
+
+    single, reference = evaluations_per_second(args, None, genes)
+    print('one simulation per individual: {:.2f} evaluations/s'.format(single))
+    for batch_size in args.batch_sizes:
+        batched, fitness = evaluations_per_second(args, batch_size, genes)
+        # stacked simulations must not change the result
+        deviation = max((abs(a - b) / max(abs(a), 1e-9)
+                         for fa, fb in zip(fitness, reference) if fa and fb
+                         for a, b in zip(fa, fb)), default=0)
+        print('batch size {:3}: {:.2f} evaluations/s ({:.2f}x), '
+              'max. relative deviation of fitness {:.1e}'.format(
+                  batch_size, batched, batched / single, deviation))
+
+
+if __name__ == '__main__':
+    freeze_support()
+    main()
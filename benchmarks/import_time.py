@@ -0,0 +1,66 @@
+"""Measure the startup time of `import smooth` with `python -X importtime`.
+
+Prints the cumulative import time of smooth and the slowest imported modules.
+Exits with an error if heavy or optional packages are imported on startup
+or if the import takes longer than the given limit.
+
+Usage::
+
+    python benchmarks/import_time.py [--max-ms 500] [--top 10]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# packages which must not be imported by `import smooth`
+LAZY_PACKAGES = ['oemof', 'pyomo', 'matplotlib', 'tkinter', 'dill', 'seaborn', 'bokeh']
+
+
+def measure_import_time(module='smooth'):
+    """Import module in a fresh interpreter and parse the output of -X importtime.
+
+    :param module: name of module to import
+    :type module: string
+    :return: cumulative import time in microseconds for each imported module
+    :rtype: dict
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        stderr=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        # format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if importing smooth takes longer (milliseconds)')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest modules to show')
+    args = parser.parse_args()
+
+    times = measure_import_time()
+    total_ms = times['smooth'] / 1000
+    print('import smooth: {:.1f} ms'.format(total_ms))
+    print('slowest modules (cumulative):')
+    for name, t in sorted(times.items(), key=lambda x: -x[1])[:args.top]:
+        print('  {:8.1f} ms  {}'.format(t / 1000, name))
+
+    errors = []
+    loaded = [p for p in LAZY_PACKAGES if p in times]
+    if loaded:
+        errors.append('packages imported on startup: {}'.format(', '.join(loaded)))
+    if args.max_ms is not None and total_ms > args.max_ms:
+        errors.append('import time exceeds {} ms'.format(args.max_ms))
+    if errors:
+        sys.exit('\n'.join(errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Time the non-dominated sorting and crowding distance of the optimization
+for different population sizes and numbers of objectives.
+
+For small populations, the previous pure Python fast non-dominated sort of NSGA-II
+is timed as well and its fronts are compared to the new implementation.
+
+Usage::
+
+    python benchmarks/non_dominated_sorting.py [--sizes 100 1000 10000] [--objectives 2 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from smooth.optimization import non_dominated_sorting as nds
+
+# legacy algorithm is quadratic in runtime and memory: only run it for small populations
+LEGACY_MAX_SIZE = 2000
+
+
+def legacy_dominates(f1, f2):
+    return all(a >= b for a, b in zip(f1, f2)) and any(a > b for a, b in zip(f1, f2))
+
+
+def legacy_fast_non_dominated_sort(fitness):
+    """Previous pure Python implementation (for comparison)"""
+    S = [[] for _ in fitness]
+    front = [[]]
+    n = [0]*len(fitness)
+    for i in range(len(fitness)):
+        for j in range(len(fitness)):
+            if legacy_dominates(fitness[i], fitness[j]):
+                S[i].append(j)
+            elif legacy_dominates(fitness[j], fitness[i]):
+                n[i] += 1
+        if n[i] == 0:
+            front[0].append(i)
+    i = 0
+    while len(front[i]) > 0:
+        Q = []
+        for p in front[i]:
+            for q in S[p]:
+                n[q] -= 1
+                if n[q] == 0:
+                    Q.append(q)
+        i += 1
+        front.append(Q)
+    front.pop()
+    return front
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--objectives', type=int, nargs='+', default=[2, 3])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+    print('{:>8} {:>4} {:>7} {:>10} {:>10} {:>10} {:>10}'.format(
+        'size', 'obj', 'fronts', 'sort [s]', 'crowd [s]', 'select [s]', 'legacy [s]'))
+    for n_objectives in args.objectives:
+        for size in args.sizes:
+            # rounded values: duplicates and ties like in real populations
+            fitness = np.round(rng.rand(size, n_objectives), 3)
+            t_sort, fronts = timed(nds.non_dominated_fronts, fitness)
+            t_crowd = sum(timed(nds.crowding_distance, fitness[front])[0] for front in fronts)
+            t_select, _ = timed(nds.select_by_rank_and_crowding, fitness, size // 2)
+
+            t_legacy = float('nan')
+            if size <= LEGACY_MAX_SIZE:
+                t_legacy, legacy_fronts = timed(legacy_fast_non_dominated_sort, fitness.tolist())
+                assert [sorted(f) for f in legacy_fronts] == [f.tolist() for f in fronts], \
+                    "Fronts differ from legacy implementation"
+
+            print('{:>8} {:>4} {:>7} {:>10.4f} {:>10.4f} {:>10.4f} {:>10.4f}'.format(
+                size, n_objectives, len(fronts), t_sort, t_crowd, t_select, t_legacy))
+
+
+if __name__ == '__main__':
+    main()
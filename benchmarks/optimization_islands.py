@@ -0,0 +1,124 @@
+"""Compare the example optimization with one population and with islands.
+
+Both variants use the same number of cores and the same number of children per generation.
+Reports the hypervolume of the pareto front of all evaluations over time
+and the time each variant needed to reach the final hypervolume
+of the single population.
+
+Needs oemof and the cbc solver.
+
+Usage::
+
+    python benchmarks/optimization_islands.py [--generations 10] [--population 16] \
+[--n-core 8] [--islands 4] [--migration-interval 2]
+"""
+
+import argparse
+import copy
+import logging
+import time
+from multiprocessing import freeze_support
+
+from smooth.examples.example_model import mymodel
+from smooth.optimization import non_dominated_sorting as nds
+from smooth.optimization.run_optimization import Optimization
+
+logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+
+
+class TimedOptimization(Optimization):
+    """Record the time and fitness of each evaluation (shared by all islands)"""
+
+    def update_individual(self, individual, fitness, *args, **kwargs):
+        super().update_individual(individual, fitness, *args, **kwargs)
+        self.timeline.append((time.perf_counter() - self.start_time, fitness))
+
+
+def get_opt_config(args, n_islands):
+    model = copy.deepcopy(mymodel)
+    names = [c.pop("name") for c in model["components"]]
+    model["components"] = dict(zip(names, model["components"]))
+    return {
+        'population_size': args.population,
+        'n_generation': args.generations,
+        'n_core': args.n_core,
+        'n_islands': n_islands,
+        'migration_interval': args.migration_interval,
+        'attribute_variation': [{
+            'comp_name': 'this_ely',
+            'comp_attribute': 'power_max',
+            'val_min': 100e3,
+            'val_max': 2000e3,
+            'val_step': 50e3
+        }, {
+            'comp_name': 'h2_storage',
+            'comp_attribute': 'storage_capacity',
+            'val_min': 0,
+            'val_max': 2000,
+            'val_step': 50
+        }],
+        'model': model,
+    }
+
+
+def hypervolume(fitness, reference):
+    """Area dominated by the fitness values of two objectives (maximized) up to reference"""
+    area = 0
+    best_f2 = reference[1]
+    for f1, f2 in sorted(fitness, reverse=True):
+        if f2 > best_f2:
+            area += (f1 - reference[0]) * (f2 - best_f2)
+            best_f2 = f2
+    return area
+
+
+def run(args, n_islands):
+    """Run optimization, return time and fitness of all evaluations in order of completion"""
+    opt = TimedOptimization(get_opt_config(args, n_islands))
+    opt.timeline = []
+    opt.start_time = time.perf_counter()
+    opt.run()
+    return sorted(opt.timeline, key=lambda entry: entry[0])
+
+
+def front_history(timeline, reference):
+    """Time and hypervolume after each evaluation"""
+    history = []
+    valid = []
+    for t, fitness in timeline:
+        if fitness is not None:
+            valid.append(fitness)
+        front = nds.non_dominated_fronts(valid)[0] if valid else []
+        history.append((t, hypervolume([valid[i] for i in front], reference)))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--n-core', type=int, default=8)
+    parser.add_argument('--islands', type=int, default=4)
+    parser.add_argument('--migration-interval', type=int, default=2)
+    args = parser.parse_args()
+
+    runs = {'single population': run(args, 1),
+            '{} islands'.format(args.islands): run(args, args.islands)}
+
+    # common reference point: worst value of each objective over all runs
+    all_fitness = [f for timeline in runs.values() for _, f in timeline if f is not None]
+    reference = [min(f[i] for f in all_fitness) for i in range(2)]
+    histories = {name: front_history(timeline, reference) for name, timeline in runs.items()}
+    target = histories['single population'][-1][1]
+
+    for name, history in histories.items():
+        reached = [t for t, hv in history if hv >= target]
+        print('{}: {} evaluations in {:.1f} s, final hypervolume {:.4g}'.format(
+            name, len(history), history[-1][0], history[-1][1]))
+        print('  time to reach final hypervolume of single population: {}'.format(
+            '{:.1f} s'.format(reached[0]) if reached else 'not reached'))
+
+
+if __name__ == '__main__':
+    freeze_support()
+    main()
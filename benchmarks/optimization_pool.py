@@ -0,0 +1,82 @@
+"""Compare the time per generation of the example optimization
+with a persistent worker pool and with a new pool for every generation.
+
+Needs oemof and the cbc solver.
+
+Usage::
+
+    python benchmarks/optimization_pool.py [--generations 5] [--population 8] [--n-core 4]
+"""
+
+import argparse
+import copy
+import logging
+from multiprocessing import freeze_support
+
+from smooth.examples.example_model import mymodel
+from smooth.optimization.run_optimization import Optimization
+
+logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+
+
+class FreshPoolOptimization(Optimization):
+    """Old behaviour: start new worker processes for every call of compute_fitness"""
+
+    def compute_fitness(self):
+        n_evaluated = super().compute_fitness()
+        self.close_pool()
+        return n_evaluated
+
+
+def get_opt_config(args):
+    model = copy.deepcopy(mymodel)
+    names = [c.pop("name") for c in model["components"]]
+    model["components"] = dict(zip(names, model["components"]))
+    return {
+        'population_size': args.population,
+        'n_generation': args.generations,
+        'n_core': args.n_core,
+        'attribute_variation': [{
+            'comp_name': 'this_ely',
+            'comp_attribute': 'power_max',
+            'val_min': 100e3,
+            'val_max': 2000e3,
+            'val_step': 50e3
+        }, {
+            'comp_name': 'h2_storage',
+            'comp_attribute': 'storage_capacity',
+            'val_min': 0,
+            'val_max': 2000,
+            'val_step': 50
+        }],
+        'model': model,
+    }
+
+
+def mean_generation_time(opt_class, args):
+    opt = opt_class(get_opt_config(args))
+    opt.run()
+    times = [stats['time'] for stats in opt.generation_stats]
+    return sum(times) / len(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--generations', type=int, default=5)
+    parser.add_argument('--population', type=int, default=8)
+    parser.add_argument('--n-core', default='max')
+    args = parser.parse_args()
+    if args.n_core != 'max':
+        args.n_core = int(args.n_core)
+
+    fresh = mean_generation_time(FreshPoolOptimization, args)
+    persistent = mean_generation_time(Optimization, args)
+    print('mean time per generation:')
+    print('  new pool per generation: {:.2f} s'.format(fresh))
+    print('  persistent pool:         {:.2f} s'.format(persistent))
+    print('  speedup:                 {:.2f}x'.format(fresh / persistent))
+
+
+if __name__ == '__main__':
+    freeze_support()
+    main()
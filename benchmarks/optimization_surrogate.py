@@ -0,0 +1,115 @@
+"""Compare the example optimization with and without surrogate pre-screening.
+
+Reports the number of simulations and the hypervolume of the pareto front
+after each generation, and how many simulations each variant needed
+to reach the final hypervolume of the plain genetic algorithm.
+
+Needs oemof and the cbc solver.
+
+Usage::
+
+    python benchmarks/optimization_surrogate.py [--generations 10] [--population 8] [--n-core 4]
+"""
+
+import argparse
+import copy
+import logging
+from multiprocessing import freeze_support
+
+from smooth.examples.example_model import mymodel
+from smooth.optimization import non_dominated_sorting as nds
+from smooth.optimization.run_optimization import Optimization
+
+logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+
+
+def get_opt_config(args, surrogate):
+    model = copy.deepcopy(mymodel)
+    names = [c.pop("name") for c in model["components"]]
+    model["components"] = dict(zip(names, model["components"]))
+    return {
+        'population_size': args.population,
+        'n_generation': args.generations,
+        'n_core': args.n_core,
+        'surrogate': surrogate,
+        'attribute_variation': [{
+            'comp_name': 'this_ely',
+            'comp_attribute': 'power_max',
+            'val_min': 100e3,
+            'val_max': 2000e3,
+            'val_step': 50e3
+        }, {
+            'comp_name': 'h2_storage',
+            'comp_attribute': 'storage_capacity',
+            'val_min': 0,
+            'val_max': 2000,
+            'val_step': 50
+        }],
+        'model': model,
+    }
+
+
+def hypervolume(fitness, reference):
+    """Area dominated by the fitness values of two objectives (maximized) up to reference"""
+    area = 0
+    best_f2 = reference[1]
+    for f1, f2 in sorted(fitness, reverse=True):
+        if f2 > best_f2:
+            area += (f1 - reference[0]) * (f2 - best_f2)
+            best_f2 = f2
+    return area
+
+
+def run(args, surrogate):
+    """Run optimization, return fitness of all simulations in order and simulations per generation
+    """
+    opt = Optimization(get_opt_config(args, surrogate))
+    opt.run()
+    # evaluated keeps the order in which individuals were generated
+    fitness = [ind.fitness for ind in opt.evaluated.values() if ind is not None]
+    return fitness, [stats['n_evaluated'] for stats in opt.generation_stats]
+
+
+def front_history(fitness, n_evaluated, reference):
+    """Simulations and hypervolume after each generation"""
+    history = []
+    n_sim = 0
+    for n in n_evaluated:
+        n_sim += n
+        valid = [f for f in fitness[:n_sim] if f is not None]
+        front = nds.non_dominated_fronts(valid)[0] if valid else []
+        history.append((n_sim, hypervolume([valid[i] for i in front], reference)))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=8)
+    parser.add_argument('--n-core', default='max')
+    args = parser.parse_args()
+    if args.n_core != 'max':
+        args.n_core = int(args.n_core)
+
+    runs = {'plain GA': run(args, False), 'surrogate': run(args, True)}
+
+    # common reference point: worst value of each objective over all runs
+    all_fitness = [f for fitness, _ in runs.values() for f in fitness if f is not None]
+    reference = [min(f[i] for f in all_fitness) for i in range(2)]
+    histories = {name: front_history(fitness, n_evaluated, reference)
+                 for name, (fitness, n_evaluated) in runs.items()}
+    target = histories['plain GA'][-1][1]
+
+    for name, history in histories.items():
+        print('{}:'.format(name))
+        for gen, (n_sim, hv) in enumerate(history):
+            print('  generation {:3}: {:5} simulations, hypervolume {:.4g}'.format(
+                gen + 1, n_sim, hv))
+        reached = [n_sim for n_sim, hv in history if hv >= target]
+        print('  simulations to reach final hypervolume of plain GA: {}'.format(
+            reached[0] if reached else 'not reached'))
+
+
+if __name__ == '__main__':
+    freeze_support()
+    main()
@@ -0,0 +1,60 @@
+"""Compare a full simulation of the example model with simulations of typical periods.
+
+Reports run time and the relative error of the annual costs and emissions
+for different numbers of typical periods.
+
+Needs oemof and the cbc solver.
+
+Usage::
+
+    python benchmarks/typical_periods.py [--n-intervals 2016] [--periods 2 4 8] [--length 24]
+"""
+
+import argparse
+import copy
+import logging
+import time
+
+from smooth import run_smooth
+from smooth.examples.example_model import mymodel
+
+logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+
+
+def simulate(args, n_periods=None):
+    """Run example model, return run time, annual costs and annual emissions"""
+    model = copy.deepcopy(mymodel)
+    model['sim_params'].update({
+        'n_intervals': args.n_intervals,
+        'n_typical_periods': n_periods,
+        'typical_period_length': args.length,
+    })
+    start = time.perf_counter()
+    components, _ = run_smooth(model)
+    duration = time.perf_counter() - start
+    costs = sum(c.results['annuity_total'] for c in components)
+    emissions = sum(c.results['annual_total_emissions'] for c in components)
+    return duration, costs, emissions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n-intervals', type=int, default=24 * 7 * 12)
+    parser.add_argument('--periods', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--length', type=int, default=24)
+    args = parser.parse_args()
+
+    full_time, full_costs, full_emissions = simulate(args)
+    print('{:>8} {:>10} {:>8} {:>12} {:>12}'.format(
+        'periods', 'time [s]', 'speedup', 'costs err', 'emiss. err'))
+    print('{:>8} {:>10.1f} {:>8} {:>12} {:>12}'.format('full', full_time, '', '', ''))
+    for n_periods in args.periods:
+        duration, costs, emissions = simulate(args, n_periods)
+        print('{:>8} {:>10.1f} {:>7.1f}x {:>11.2%} {:>11.2%}'.format(
+            n_periods, duration, full_time / duration,
+            (costs - full_costs) / abs(full_costs) if full_costs else 0,
+            (emissions - full_emissions) / abs(full_emissions) if full_emissions else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,52 @@
 # Define which functions should be directly accessible when smooth is installed with pip.
-from .framework.run_smooth import run_smooth
-from .optimization.run_optimization import run_optimization
+# Functions that depend on heavy or optional packages (oemof, matplotlib, dill, ...)
+# are wrapped, so their modules are only imported when they are called for the first time.
+# This keeps `import smooth` fast, e.g. for every worker process of the optimization.
+from .framework.simulation_hooks import SimulationHook
 from .framework.functions.load_results import load_results
 from .framework.functions.save_results import save_results
 from .framework.functions.print_results import print_smooth_results
-from .framework.functions.plot_results import plot_smooth_results
+
+
+def run_smooth(*args, **kwargs):
+    """See :func:`smooth.framework.run_smooth.run_smooth`. Imports oemof on first call."""
+    from .framework.run_smooth import run_smooth as _run_smooth
+    return _run_smooth(*args, **kwargs)
+
+
+def run_optimization(*args, **kwargs):
+    """See :func:`smooth.optimization.run_optimization.run_optimization`."""
+    from .optimization.run_optimization import run_optimization as _run_optimization
+    return _run_optimization(*args, **kwargs)
+
+
+def run_sweep(*args, **kwargs):
+    """See :func:`smooth.optimization.run_sweep.run_sweep`."""
+    from .optimization.run_sweep import run_sweep as _run_sweep
+    return _run_sweep(*args, **kwargs)
+
+
+def plot_smooth_results(*args, **kwargs):
+    """See :func:`smooth.framework.functions.plot_results.plot_smooth_results`.
+    Imports matplotlib on first call."""
+    from .framework.functions.plot_results import plot_smooth_results as _plot_smooth_results
+    return _plot_smooth_results(*args, **kwargs)
+
+
+def to_frame(*args, **kwargs):
+    """See :func:`smooth.framework.functions.functions.to_frame`. Imports pandas on first call."""
+    from .framework.functions.functions import to_frame as _to_frame
+    return _to_frame(*args, **kwargs)
+
 
 __all__ = [
     'run_smooth',
+    'SimulationHook',
     'run_optimization',
+    'run_sweep',
     'load_results',
     'save_results',
     'print_smooth_results',
     'plot_smooth_results',
+    'to_frame',
 ]
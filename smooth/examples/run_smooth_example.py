@@ -11,9 +11,10 @@ This example shows how a simulation in SMOOTH can be defined.
 * The results are printed in the terminal by calling the
   :func:`~smooth.framework.functions.print_results` function.
 
-* The results are saved as a pickle file with the
+* The results are saved as a result file with the
   :func:`~smooth.framework.functions.save_results` function, that can later be
-  loaded with the :func:`~smooth.framework.functions.load_results` function.
+  loaded (completely or partially) with the
+  :func:`~smooth.framework.functions.load_results` function.
 
 * The costs of the external components are calculated by using the
   :func:`~smooth.framework.functions.calculate_external_costs.costs_for_ext_components`
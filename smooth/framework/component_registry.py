@@ -0,0 +1,171 @@
+"""Registry that maps component type names to component classes.
+
+*****
+Scope
+*****
+Every smooth model names the type of each of its components, e.g. *'electrolyzer'*.
+To create the component objects, the corresponding class has to be found.
+The registries in this module do this lookup only once per type and cache the result,
+so creating components (e.g. for every individual of an optimization) only costs
+the construction of the objects.
+
+*******
+Concept
+*******
+A type name is resolved in this order:
+
+#. classes registered by hand with :meth:`ComponentRegistry.register`
+#. classes provided by other packages via entry points (loaded once on first lookup)
+#. modules of the smooth.components package, following the naming convention:
+   type *'my_comp'* is class *MyComp* in module *component_my_comp*
+   (*external_component_my_comp* for external components)
+
+Third party packages can provide components by declaring an entry point in their setup.py::
+
+    entry_points={
+        'smooth.components': ['my_comp = my_package.my_module:MyComp'],
+        'smooth.external_components': ['my_ext_comp = my_package.my_module:MyExtComp'],
+    }
+"""
+
+import importlib
+import re
+
+
+def _load_entry_points(group):
+    """Load all entry points of a group.
+
+    :param group: name of the entry point group
+    :type group: string
+    :return: loaded objects by entry point name
+    :rtype: dict
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # python < 3.8
+        import pkg_resources
+        return {ep.name: ep.load() for ep in pkg_resources.iter_entry_points(group)}
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=group)
+    else:
+        # python < 3.10: dict of groups
+        eps = eps.get(group, [])
+    return {ep.name: ep.load() for ep in eps}
+
+
+def component_class_name(type_name):
+    """Convert component type from snake_case to CamelCase to get class name
+
+    :param type_name: component type, e.g. 'energy_demand_from_csv'
+    :type type_name: string
+    :return: class name, e.g. 'EnergyDemandFromCsv'
+    :rtype: string
+    """
+    return ''.join(x.capitalize() for x in type_name.split('_'))
+
+
+def external_component_class_name(type_name):
+    """Convert external component type to class name.
+
+    Like :func:`component_class_name`, but all caps names are used as-is.
+
+    :param type_name: external component type, e.g. 'h2_dispenser'
+    :type type_name: string
+    :return: class name, e.g. 'H2Dispenser'
+    :rtype: string
+    """
+    if type_name.isupper():
+        return type_name
+    return component_class_name(type_name)
+
+
+class ComponentRegistry:
+    """Cached mapping from component type names to classes.
+
+    :param module_prefix: module name of a type without type name,
+        e.g. 'smooth.components.component\\_'
+    :type module_prefix: string
+    :param entry_point_group: entry point group of third party components
+    :type entry_point_group: string
+    :param class_name: function to convert type name to class name
+    :type class_name: function
+    :param valid_name: regular expression for valid type names. Defaults to None (no check)
+    :type valid_name: string, optional
+    :var classes: known classes by type name
+    :type classes: dict
+    """
+
+    def __init__(self, module_prefix, entry_point_group, class_name, valid_name=None):
+        self.module_prefix = module_prefix
+        self.entry_point_group = entry_point_group
+        self.class_name = class_name
+        self.valid_name = re.compile(valid_name) if valid_name else None
+        self.classes = {}
+        self._entry_points_loaded = False
+
+    def register(self, type_name, cls):
+        """Register a class for a type name. Replaces any known class of this type.
+
+        :param type_name: component type
+        :type type_name: string
+        :param cls: component class
+        :type cls: class
+        """
+        self.classes[type_name] = cls
+
+    def load_entry_points(self):
+        """Register classes of all entry points of this registry's group.
+        Classes registered by hand take precedence.
+        """
+        for type_name, cls in _load_entry_points(self.entry_point_group).items():
+            self.classes.setdefault(type_name, cls)
+        self._entry_points_loaded = True
+
+    def get(self, type_name):
+        """Get class of component type
+
+        :param type_name: component type
+        :type type_name: string
+        :return: component class
+        :rtype: class
+        :raises: *ValueError* if type name is invalid or type can not be found
+        """
+        try:
+            return self.classes[type_name]
+        except KeyError:
+            pass
+
+        if not self._entry_points_loaded:
+            self.load_entry_points()
+            if type_name in self.classes:
+                return self.classes[type_name]
+
+        if self.valid_name is not None and self.valid_name.fullmatch(type_name) is None:
+            raise ValueError('Invalid component type name "{}". '
+                             'Only lower case letters, numbers and underscores are allowed.'
+                             .format(type_name))
+        # Import the module of the component.
+        try:
+            module = importlib.import_module(self.module_prefix + type_name)
+        except ImportError as e:
+            # only catch error of missing component module, not missing packages within
+            if e.name != self.module_prefix + type_name:
+                raise
+            raise ValueError('Unknown component type "{}"'.format(type_name))
+        # Load the class (which by convention has a name with a capital first
+        # letter and camel case).
+        cls = getattr(module, self.class_name(type_name))
+        self.classes[type_name] = cls
+        return cls
+
+
+# Component type should consist of lower case letters, numbers and underscores
+components = ComponentRegistry(
+    'smooth.components.component_', 'smooth.components',
+    component_class_name, r'[a-z0-9_]+')
+
+external_components = ComponentRegistry(
+    'smooth.components.external_component_', 'smooth.external_components',
+    external_component_class_name)
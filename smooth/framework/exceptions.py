@@ -1,3 +1,13 @@
 class SolverNonOptimalError(Exception):  # RuntimeError
     def __init__(self, message):
         super().__init__(message)
+
+
+class SimulationAbortedError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class UnsupportedResultDataError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
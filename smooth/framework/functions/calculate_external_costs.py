@@ -1,5 +1,5 @@
-import importlib
 from smooth.framework.simulation_parameters import SimulationParameters as sp
+from smooth.framework import component_registry
 
 
 def costs_for_ext_components(model):
@@ -38,25 +38,11 @@ def costs_for_ext_components(model):
         else:
             comp_names.append(this_ext_comp_name)
 
-        this_ext_comp_name = this_ext_comp['external_component']
         # Add simulation parameters to the components so they can be used
         this_ext_comp['sim_params'] = sim_params
-        # Import the module of the component.
-        importpath = 'smooth.components.external_component_{}'.format(this_ext_comp_name)
-        this_comp_module = importlib.import_module(importpath)
-        # class name: camel case
-        # remove underscores, letters after underscores have to be capital
-        # all caps is special (use as-is)
-        class_name = ''
-        if this_ext_comp_name.isupper():
-            class_name = this_ext_comp_name
-        else:
-            this_comp_name_split = this_ext_comp_name.split('_')
-            for this_comp_name_part in this_comp_name_split:
-                class_name += this_comp_name_part.capitalize()
-        # Load the class (which by convention has a name with a capital first letter
-        # and camel case).
-        this_comp_class = getattr(this_comp_module, class_name)
+        # Load the class of the external component (cached after first use).
+        this_comp_class = component_registry.external_components.get(
+            this_ext_comp['external_component'])
         # Initialize the component.
         this_comp_obj = this_comp_class(this_ext_comp)
         # Check if this component is valid.
@@ -1,5 +1,4 @@
 import pandas as pd
-from smooth.framework.functions.plot_results import plot_smooth_results
 
 
 def get_df_debug(df_results, results_dict, new_df_results):
@@ -71,6 +70,9 @@ def show_debug(df_debug, components):
     :param components: result from run_smooth for plotting
     :type components: list of :class:`~smooth.components.component.Component`
     """
+    # only import matplotlib when debug info is actually shown
+    from smooth.framework.functions.plot_results import plot_smooth_results
+
     print("------------------------------------------------------------------------------")
     with pd.option_context(
             "display.max_rows", 99,
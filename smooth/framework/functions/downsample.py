@@ -0,0 +1,152 @@
+"""Reduce the number of points of long time series for plotting.
+
+*****
+Scope
+*****
+A simulation over a year has 8760 (hourly) or 35040 (quarter-hourly) values per flow.
+Drawing every point of dozens of flows makes plots slow and interactive HTML files large,
+although a screen can only show a few thousand points per line.
+The functions in this module select a subset of the points that keeps the visual shape
+of a time series.
+
+*******
+Concept
+*******
+Both methods keep the original points (no averaging), so peaks keep their exact values.
+
+* *lttb*: Largest-Triangle-Three-Buckets. The first and last point are kept,
+  all others are split into buckets of equal size. From each bucket, the point is chosen
+  that forms the largest triangle with the point chosen from the previous bucket
+  and the average of the next bucket. Good for smooth lines.
+* *min_max*: envelope of the time series. The points are split into buckets
+  and the smallest and largest value of each bucket is kept. No peak is lost,
+  which is important for spiky series, e.g. the power of a component that switches on and off.
+
+The time series must not contain missing values (NaN).
+"""
+
+import numpy as np
+
+# downsampling methods, see downsample
+METHODS = ('lttb', 'min_max')
+
+
+def lttb_indices(y, n_out, x=None):
+    """Indices of the points chosen by Largest-Triangle-Three-Buckets
+
+    :param y: values of the time series
+    :type y: array-like
+    :param n_out: number of points to keep
+    :type n_out: int
+    :param x: x values of the time series. Defaults to None (equidistant)
+    :type x: array-like, optional
+    :return: sorted indices of the chosen points (all points if *n_out* is not smaller)
+    :rtype: numpy array of int
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # first and last point are kept, the others are split into n_out - 2 buckets
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+    indices = np.empty(n_out, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # average of next bucket (last point after last bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        x_avg = x[end:next_end].mean()
+        y_avg = y[end:next_end].mean()
+        # (double) area of triangle of previous point, candidate and average of next bucket
+        area = np.abs((x[a] - x_avg) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (y_avg - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def min_max_indices(y, n_out):
+    """Indices of the smallest and largest value of each bucket (envelope)
+
+    :param y: values of the time series
+    :type y: array-like
+    :param n_out: maximum number of points to keep (two per bucket)
+    :type n_out: int
+    :return: sorted indices of the chosen points (all points if *n_out* is not smaller)
+    :rtype: numpy array of int
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(int)
+    chosen = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        chosen += [start + int(np.argmin(bucket)), start + int(np.argmax(bucket))]
+    # keep order of time series, a bucket may have only one point
+    return np.unique(chosen)
+
+
+def downsample(x, y, max_points, method='lttb'):
+    """Reduce a time series to at most *max_points* points
+
+    :param x: x values of the time series, e.g. the hour of each interval
+    :type x: array-like
+    :param y: values of the time series
+    :type y: array-like
+    :param max_points: maximum number of points to keep
+    :type max_points: int
+    :param method: 'lttb' or 'min_max', see module description. Defaults to 'lttb'
+    :type method: string, optional
+    :return: x and y values of the chosen points
+    :rtype: tuple of numpy arrays
+    :raises: `ValueError` for an unknown method
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if method == 'lttb':
+        indices = lttb_indices(y, max_points, x)
+    elif method == 'min_max':
+        indices = min_max_indices(y, max_points)
+    else:
+        raise ValueError('Unknown downsampling method "{}", use one of {}'.format(
+            method, METHODS))
+    return x[indices], y[indices]
+
+
+def detail_levels(x, y, max_points, method='lttb', factor=4, n_levels=None, full=True):
+    """Downsampled versions of a time series from coarse to fine, to show more detail on zoom
+
+    :param x: x values of the time series
+    :type x: array-like
+    :param y: values of the time series
+    :type y: array-like
+    :param max_points: number of points of the coarsest level
+    :type max_points: int
+    :param method: downsampling method, see :func:`downsample`. Defaults to 'lttb'
+    :type method: string, optional
+    :param factor: number of points grows by this factor from level to level. Defaults to 4
+    :type factor: int, optional
+    :param n_levels: maximum number of downsampled levels. Defaults to None (no limit)
+    :type n_levels: int, optional
+    :param full: add the complete time series as last level. Defaults to True
+    :type full: bool, optional
+    :return: x and y values of each level. The complete time series is the only level
+        if it has no more than *max_points* points
+    :rtype: list of tuples of numpy arrays
+    """
+    levels = []
+    n_points = max_points
+    while n_points < len(y) and (n_levels is None or len(levels) < n_levels):
+        levels.append(downsample(x, y, n_points, method))
+        n_points *= factor
+    if full or not levels:
+        levels.append((np.asarray(x), np.asarray(y)))
+    return levels
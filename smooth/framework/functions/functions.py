@@ -1,7 +1,8 @@
 import os
-import importlib
-import pandas as pd
 import re
+import numpy as np
+import pandas as pd
+from smooth.framework import component_registry
 
 
 def read_data_file(path, filename, csv_separator, column_title):
@@ -79,6 +80,8 @@ def create_component_obj(model, sim_params):
     :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
     :return: list of components in model
     :rtype: list of :class:`~smooth.components.component.Component`
+    :raises: *ValueError* if a component type is invalid or unknown
+        (see :mod:`~smooth.framework.component_registry`)
     """
     # CREATE COMPONENT OBJECTS
     components = []
@@ -87,20 +90,8 @@ def create_component_obj(model, sim_params):
         this_comp['sim_params'] = sim_params
         # assign unique name
         this_comp['name'] = name
-        # load the component class.
-        this_comp_type = this_comp['component']
-        # Component type should consist of lower case letters, numbers and underscores
-        if re.fullmatch(r'[a-z0-9_]+', this_comp_type) is None:
-            raise ValueError('Invalid component type name "{}". '
-                             'Only lower case letters, numbers and underscores are allowed.'
-                             .format(this_comp_type))
-        # Import the module of the component.
-        this_comp_module = importlib.import_module('smooth.components.component_' + this_comp_type)
-        # Convert component type from snake_case to CamelCase to get class name
-        class_name = ''.join(x.capitalize() for x in this_comp_type.split('_'))
-        # Load the class (which by convention has a name with a capital first
-        # letter and camel case).
-        this_comp_class = getattr(this_comp_module, class_name)
+        # load the component class (cached after first use).
+        this_comp_class = component_registry.components.get(this_comp['component'])
         # Initialize the component.
         this_comp_obj = this_comp_class(this_comp)
         # Check if this component is valid.
@@ -157,6 +148,72 @@ def cut_suffix_loop(name_tuple, suffix_list):
     return name_tuple
 
 
+def to_frame(smooth_result):
+    """All flows and states of a smooth run as one table
+
+    :param smooth_result: result from run_smooth (or loaded from a result file)
+    :type smooth_result: list of :class:`~smooth.components.component.Component`
+    :return: one row per interval, indexed by the *date_time_index* of the simulation
+        parameters (if known). One column per flow and state, named
+        (*component*, *kind*, *from*, *to*): *kind* is 'flow' (*from* and *to* are
+        the labels of the nodes) or 'state' (*from* is the name of the state, *to* is empty).
+        Missing values (e.g. of an aborted simulation) are NaN
+    :rtype: pandas DataFrame
+    """
+    columns = []
+    series = []
+    sim_params = None
+    for component in smooth_result:
+        if sim_params is None:
+            sim_params = getattr(component, 'sim_params', None)
+        for flow_name, flow in getattr(component, 'flows', {}).items():
+            columns.append((component.name, 'flow', str(flow_name[0]), str(flow_name[1])))
+            series.append(flow)
+        for state_name, state in getattr(component, 'states', {}).items():
+            columns.append((component.name, 'state', state_name, ''))
+            series.append(state)
+
+    # one conversion for all values, None becomes NaN
+    values = np.array(series, dtype=float).T if series else np.empty((0, 0))
+    names = ['component', 'kind', 'from', 'to']
+    if columns:
+        columns = pd.MultiIndex.from_tuples(columns, names=names)
+    else:
+        columns = pd.MultiIndex.from_arrays([[]] * len(names), names=names)
+    index = None
+    date_time_index = getattr(sim_params, 'date_time_index', None)
+    if date_time_index is not None and len(date_time_index) >= len(values):
+        index = date_time_index[:len(values)]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def bus_balance(frame, suffixes=('_thermal', '_electric')):
+    """Flows of each component to and from each bus
+
+    :param frame: flows and states of a smooth run, see :func:`to_frame`
+    :type frame: pandas DataFrame
+    :param suffixes: suffixes of the oemof models of components that consist of
+        several models (e.g. chp). Defaults to ('_thermal', '_electric')
+    :type suffixes: tuple of strings, optional
+    :return: one column per bus and component, named (*bus*, *component*).
+        Flows into the bus are positive, flows out of the bus negative
+    :rtype: pandas DataFrame
+    """
+    flows = frame.loc[:, frame.columns.get_level_values('kind') == 'flow']
+    component = flows.columns.get_level_values('component')
+    # name of the component without suffix of its oemof model
+    pattern = '({})$'.format('|'.join(re.escape(suffix) for suffix in suffixes))
+    source = flows.columns.get_level_values('from').str.replace(pattern, '', regex=True)
+    target = flows.columns.get_level_values('to').str.replace(pattern, '', regex=True)
+    # component flows into bus or takes from bus
+    outgoing = source == component
+    bus = np.where(outgoing, target, source)
+    signed = flows * np.where(outgoing, 1.0, -1.0)
+    balance = signed.T.groupby([bus, component], sort=False).sum(min_count=1).T
+    balance.columns = pd.MultiIndex.from_tuples(list(balance.columns), names=['bus', 'component'])
+    return balance
+
+
 def extract_flow_per_bus(smooth_result, name_label_dict):
     """Extract dict containing the busses that will be plotted.
 
@@ -169,74 +226,25 @@ def extract_flow_per_bus(smooth_result, name_label_dict):
     # Creates empty dict which will later contain the busses that will be plotted.
     busses_to_plot = dict()
     nb_trailing_none = 0
-
-    for component_result in smooth_result:
-        if hasattr(component_result, 'flows'):
-            # Track the flows of this component.
-            this_comp_flows = dict()
-            component_flows = component_result.flows
-            for flow_tuple, flow in component_flows.items():
-                # Identify the number of trailing None values in case the
-                # optimization stopped before termination
-                nb_intervals = len(flow)
-                nb_trailing_none = nb_intervals
-                for flow_val in flow:
-                    if flow_val is not None:
-                        nb_trailing_none -= 1
-                    else:
-                        break
-                # check if it's a chp component which consists of two oemof models
-                # if so get rid of the ending '_electric' or '_thermal'
-                flow_tuple = cut_suffix_loop(flow_tuple, ['_thermal', '_electric'])
-                if flow_tuple[0] == component_result.name:
-                    # Case: Component flows into bus.
-                    bus = flow_tuple[1]
-                    # Check if this component already has a flow with this bus.
-                    if bus in this_comp_flows:
-                        updated_bus_list = []
-                        for i_val in range(len(this_comp_flows[bus]) - nb_trailing_none):
-                            # Get the summed up value.
-                            this_val = this_comp_flows[bus][i_val] + flow[i_val]
-                            updated_bus_list.append(this_val)
-                        # Override the old bus list with the updated one.
-                        this_comp_flows[bus] = updated_bus_list
-                    else:
-                        # Case: Component has no flow with this bus yet.
-                        this_comp_flows[bus] = flow[:nb_intervals - nb_trailing_none]
-
-                else:
-                    # Case: Component takes from bus.
-                    bus = flow_tuple[0]
-                    # Check if this component already has a flow with this bus.
-                    if bus in this_comp_flows:
-                        updated_bus_list = []
-                        for i_val in range(len(this_comp_flows[bus]) - nb_trailing_none):
-                            # Get the summed up value.
-                            this_val = this_comp_flows[bus][i_val] - flow[i_val]
-                            updated_bus_list.append(this_val)
-                        # Override the old bus list with the updated one.
-                        this_comp_flows[bus] = updated_bus_list
-                    else:
-                        # Case: Component has no flow with this bus yet.
-                        flow_range = flow[:nb_intervals - nb_trailing_none]
-                        this_comp_flows[bus] = [-this_val for this_val in flow_range]
-
-            # get name from dictionary
-            # set default component name
-            name = component_result.name
-            try:
-                # set name from dictionary
-                name = name_label_dict[name]
-            except KeyError:
-                print("{}: is not defined in the label dict.".format(name))
-
-            for this_bus in this_comp_flows:
-                if this_bus not in busses_to_plot:
-                    # If bus name didn't appear so far, add it to the list of busses.
-                    busses_to_plot[this_bus] = dict()
-
-                # Add the flow of this component to this bus.
-                busses_to_plot[this_bus][name] = this_comp_flows[this_bus]
+    names = dict()
+
+    balance = bus_balance(to_frame(smooth_result))
+    for bus, component in balance.columns:
+        values = balance[(bus, component)].values
+        # Identify the number of trailing None values in case the
+        # optimization stopped before termination
+        missing = np.flatnonzero(np.isnan(values))
+        nb_valid = missing[0] if len(missing) else len(values)
+        nb_trailing_none = max(nb_trailing_none, len(values) - nb_valid)
+
+        # get name from dictionary
+        if component not in names:
+            names[component] = name_label_dict.get(component, component)
+            if component not in name_label_dict:
+                print("{}: is not defined in the label dict.".format(component))
+
+        # Add the flow of this component to this bus.
+        busses_to_plot.setdefault(bus, dict())[names[component]] = values[:nb_valid].tolist()
 
     if nb_trailing_none > 0:
         print(
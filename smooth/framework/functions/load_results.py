@@ -1,11 +1,29 @@
 import pickle
+import zipfile
 
 
-def load_results(file_path):
+def load_results(file_path, components=None, columns=None, mmap=False):
     """Load the result of either a smooth run or an optimization run by the genetic algorithm.
 
-    :param file_path: path of the result pickle file
+    Columnar result files (see :mod:`~smooth.framework.functions.result_file`)
+    can be loaded partially: only some components and columns, and memory-mapped.
+    Pickle files are always loaded completely.
+
+    :param file_path: path of the result file (columnar or pickle)
     :type file_path: string
+    :param components: names of the components to load. Defaults to None (all)
+    :type components: list of strings, optional
+    :param columns: columns of the components to load, e.g. ['results'] for the scalar results
+        only (see :func:`~smooth.framework.functions.result_file.load_result_file`).
+        Defaults to None (all)
+    :type columns: list of strings, optional
+    :param mmap: memory-map the time series instead of reading them. Defaults to False
+    :type mmap: boolean, optional
+    :return: components or individuals
+    :rtype: list
     """
+    if zipfile.is_zipfile(file_path):
+        from smooth.framework.functions.result_file import load_result_file
+        return load_result_file(file_path, components, columns, mmap)
     with open(file_path, 'rb') as file_to_load:
         return pickle.load(file_to_load)
@@ -1,17 +1,54 @@
-from bokeh.plotting import figure, show
-from bokeh.layouts import row
-from bokeh.palettes import Spectral11
 import pandas as pd
-from bokeh.io import export_png
 from smooth.framework.functions.functions import extract_flow_per_bus
+from smooth.framework.functions.downsample import detail_levels
 from smooth.examples.example_plotting_dicts import comp_dict, bus_dict, y_dict
 
+# Browser side level of detail: on zoom, show the coarsest level of each flow
+# that still has max_points points in the visible range.
+LEVEL_OF_DETAIL_JS = """
+const start = x_range.start;
+const end = x_range.end;
+for (let i = 0; i < sources.length; i++) {
+    const flow_levels = levels[i];
+    let level = flow_levels[flow_levels.length - 1].data;
+    for (const candidate of flow_levels) {
+        const xs = candidate.data.x;
+        let visible = 0;
+        for (let j = 0; j < xs.length; j++) {
+            if (xs[j] >= start && xs[j] <= end) {
+                visible++;
+            }
+        }
+        if (visible >= max_points) {
+            level = candidate.data;
+            break;
+        }
+    }
+    // visible range and one point on each side
+    let first = 0;
+    while (first < level.x.length - 1 && level.x[first] < start) {
+        first++;
+    }
+    let last = level.x.length - 1;
+    while (last > 0 && level.x[last] > end) {
+        last--;
+    }
+    first = Math.max(first - 1, 0);
+    last = Math.min(last + 1, level.x.length - 1);
+    sources[i].data = {x: level.x.slice(first, last + 1), y: level.y.slice(first, last + 1)};
+}
+"""
+
 
 def plot_interactive_smooth_results(
         smooth_result,
         comp_label_dict=comp_dict,
         bus_dict=bus_dict,
-        y_dict=y_dict):
+        y_dict=y_dict,
+        max_points=None,
+        method='lttb',
+        zoom_levels=0,
+        zoom_full=False):
     # Plots the results of a smooth run - the distinction between this function
     # and the 'plot_results' function is:
     #    1) all figures are displayed at once,
@@ -19,6 +56,20 @@ def plot_interactive_smooth_results(
     #
     # Parameter:
     #  smooth_results: Smooth result file containing all components [list].
+    #  max_points: maximum number of points drawn per flow, None to draw all points [int].
+    #  method: downsampling method, 'lttb' or 'min_max' [string].
+    #  zoom_levels: number of finer levels (4 times the points each) that are shown when
+    #    zooming in. Every level is saved in the HTML file, by default only the
+    #    downsampled overview is saved [int].
+    #  zoom_full: also save the complete flows to show every point when zooming in.
+    #    Makes the HTML file larger than drawing all points without max_points [boolean].
+
+    # bokeh is optional: only import it when plotting.
+    from bokeh.models import ColumnDataSource, CustomJS
+    from bokeh.plotting import figure, show
+    from bokeh.layouts import row
+    from bokeh.palettes import Spectral11
+    from bokeh.io import export_png
 
     # Extract dict containing the busses that will be plotted.
     busses_to_plot = extract_flow_per_bus(smooth_result, comp_label_dict)
@@ -48,21 +99,38 @@ def plot_interactive_smooth_results(
         # Assigns each flow a different colour from the chosen palette.
         my_palette = Spectral11[0:num_lines]
 
-        # Creates a list of x values to represent the number of hours.
-        xs = [df.index.values] * num_lines
-        # Creates a list of the lists of flows for each bus
-        ys = [df[component].values for component in df]
+        # Draws each flow with the x values representing the number of hours.
+        sources = []
+        levels = []
+        for (colour, legend_label) in zip(my_palette, df.columns):
+            if max_points is None:
+                flow_levels = [(df.index.values, df[legend_label].values)]
+            else:
+                # overview and finer downsampled versions, complete flow only if asked for
+                flow_levels = detail_levels(
+                    df.index.values, df[legend_label].values, max_points, method,
+                    n_levels=zoom_levels + 1, full=zoom_full)
+            source = ColumnDataSource(data={'x': flow_levels[0][0], 'y': flow_levels[0][1]})
+            figures[this_bus].line(
+                'x', 'y', source=source, color=colour, legend_label=legend_label)
+            sources.append(source)
+            levels.append(flow_levels)
+
+        if any(len(flow_levels) > 1 for flow_levels in levels):
+            # Re-samples the flows when the visible range changes.
+            level_sources = [[ColumnDataSource(data={'x': x, 'y': y}) for x, y in flow_levels]
+                             for flow_levels in levels]
+            callback = CustomJS(
+                args={'x_range': figures[this_bus].x_range, 'sources': sources,
+                      'levels': level_sources, 'max_points': max_points},
+                code=LEVEL_OF_DETAIL_JS)
+            figures[this_bus].x_range.js_on_change('start', callback)
+            figures[this_bus].x_range.js_on_change('end', callback)
 
-        for this_component, this_flow in busses_to_plot[this_bus].items():
-            # Loops through the colour palette, the legend labels,
-            # the x lists (xs) and the y lists (ys).
-            labels = busses_to_plot[this_bus].keys()
-            for (colours, legend_label, x, y) in zip(my_palette, labels, xs, ys):
-                figures[this_bus].line(x, y, color=colours, legend_label=legend_label)
-            # Sets the legend in the top left corner of the figure.
-            figures[this_bus].legend.location = "top_left"
-            # Enables the legends to be seen or hidden.
-            figures[this_bus].legend.click_policy = "hide"
+        # Sets the legend in the top left corner of the figure.
+        figures[this_bus].legend.location = "top_left"
+        # Enables the legends to be seen or hidden.
+        figures[this_bus].legend.click_policy = "hide"
     # Create a list of figures to later enable them to be displayed in a row.
     list_of_figures = []
     for this_bus in figures:
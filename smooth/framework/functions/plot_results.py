@@ -1,14 +1,18 @@
 from matplotlib import pyplot as plt
 from smooth.framework.simulation_parameters import SimulationParameters
 from smooth.framework.functions.functions import extract_flow_per_bus
+from smooth.framework.functions.downsample import downsample
 from smooth.examples.example_plotting_dicts import comp_dict_german, bus_dict_german, y_dict_german
 
 
 def plot_smooth_results(smooth_result, comp_label_dict=comp_dict_german,
-                        bus_dict=bus_dict_german, y_dict=y_dict_german):
+                        bus_dict=bus_dict_german, y_dict=y_dict_german,
+                        max_points=None, method='lttb'):
     """Create figures of smooth run.
 
     All plots are drawn in a new window.
+    Long time series can be downsampled to speed up drawing,
+    see :mod:`~smooth.framework.functions.downsample`.
 
     :param smooth_result: result from run_smooth containing all components
     :type smooth_result: list of :class:`~smooth.components.component.Component`
@@ -24,6 +28,10 @@ def plot_smooth_results(smooth_result, comp_label_dict=comp_dict_german,
         key being the bus names from the model to plot and value the y-axis labels.
         Defaults to y_dict_german from example_plotting_dicts.
     :type y_dict: dictionary, optional
+    :param max_points: maximum number of points per flow. Defaults to None (all points)
+    :type max_points: int, optional
+    :param method: downsampling method, 'lttb' or 'min_max'. Defaults to 'lttb'
+    :type method: string, optional
     """
 
     # Extract dict containing the busses that will be plotted.
@@ -40,6 +48,8 @@ def plot_smooth_results(smooth_result, comp_label_dict=comp_dict_german,
         for this_component, this_flow in busses_to_plot[this_bus].items():
             # get time axis (in hours, interval_time is in minutes)
             timeseries = [sim_params.interval_time/60 * t for t in range(len(this_flow))]
+            if max_points is not None:
+                timeseries, this_flow = downsample(timeseries, this_flow, max_points, method)
             plt.plot(timeseries, this_flow, label=str(this_component))
         plt.legend()
         plt.xlabel('Stunden des Jahres')
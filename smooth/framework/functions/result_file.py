@@ -0,0 +1,411 @@
+"""Columnar result files of smooth runs and optimizations.
+
+*****
+Scope
+*****
+Pickling the result of :func:`~smooth.framework.run_smooth.run_smooth` or an optimization
+saves the complete component objects, including their input data.
+Reading a single value back means unpickling everything, which also needs
+oemof and the component classes (in a compatible version).
+The result files written by :func:`save_result_file` only contain plain arrays and
+a JSON manifest, so they can be read without smooth, partially and memory-mapped.
+
+*******
+Concept
+*******
+A result file is a ZIP archive (not compressed) with a *manifest.json*
+and one NumPy array (*.npy*) for each time series:
+flows, states and time series results (e.g. the variable costs of each interval).
+The manifest lists each component with its name, type, parameters
+(all attributes that can be written as JSON), scalar results and the names of its arrays.
+For an optimization result, it lists each individual with its attribute values,
+fitness, KPIs and components. The simulation parameters are saved once.
+
+:func:`load_result_file` returns :class:`StoredComponent` objects
+with the same *name*, *component*, *flows*, *states*, *results* and parameter attributes
+as the simulated components (flow names are tuples of node labels) and for optimization
+results :class:`StoredIndividual` objects. Only the requested components and columns are read.
+As the arrays are not compressed, they can be memory-mapped: they are only read from disk
+when accessed.
+
+Each file has a format *version*. Entries that are unknown to the reading version
+are ignored, missing entries get default values.
+"""
+
+import io
+import json
+import os
+import struct
+import warnings
+import zipfile
+
+import numpy as np
+
+from smooth.framework.exceptions import UnsupportedResultDataError
+from smooth.framework.simulation_parameters import SimulationParameters
+
+# version of the result file format written by this module
+FORMAT_VERSION = 1
+
+# name of the table of contents in the result file
+MANIFEST_NAME = 'manifest.json'
+
+# all columns of a component, see load_result_file
+COLUMNS = ('parameters', 'flows', 'states', 'series', 'results')
+
+# component attributes that are saved separately, not as parameters
+SPECIAL_ATTRIBUTES = ('name', 'component', 'flows', 'states', 'results', 'sim_params')
+
+
+class StoredComponent:
+    """Results of one component, loaded from a result file.
+    Parameters of the component (e.g. *power_max*) are set as attributes.
+
+    :param name: name of the component
+    :type name: string
+    :param component: type of the component
+    :type component: string
+    :var flows: flow values by flow name (tuple of node labels)
+    :type flows: dict of numpy arrays
+    :var states: state values by name
+    :type states: dict of numpy arrays
+    :var results: results (numbers or numpy arrays) by name
+    :type results: dict
+    :var sim_params: simulation parameters, if saved
+    :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
+    """
+
+    def __init__(self, name, component):
+        self.name = name
+        self.component = component
+        self.flows = {}
+        self.states = {}
+        self.results = {}
+        self.sim_params = None
+
+    def __repr__(self):
+        return 'StoredComponent({!r}, {!r})'.format(self.name, self.component)
+
+
+class StoredIndividual:
+    """Individual of an optimization result, loaded from a result file
+
+    :var values: attribute values
+    :type values: list
+    :var fitness: fitness values, None if evaluation failed
+    :type fitness: tuple
+    :var kpis: key performance indicators, if saved
+    :type kpis: dict
+    :var failure: reason of a failed evaluation
+    :type failure: string
+    :var smooth_result: components, None if not saved
+    :type smooth_result: list of :class:`StoredComponent`
+    """
+
+    def __init__(self, values, fitness=None, kpis=None, failure=None, smooth_result=None):
+        self.values = values
+        self.fitness = fitness
+        self.kpis = kpis
+        self.failure = failure
+        self.smooth_result = smooth_result
+
+    def __str__(self):
+        return str(self.values)
+
+    def __repr__(self):
+        return 'StoredIndividual({!r})'.format(self.values)
+
+
+def json_value(value):
+    """Convert numpy numbers and arrays to JSON types (*default* of `json.dumps`)
+
+    :param value: value to convert
+    :type value: object
+    :return: converted value
+    :raises: `TypeError` if the value can not be written as JSON
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('{} can not be written as JSON'.format(type(value).__name__))
+
+
+def component_columns(component, add_array):
+    """Split the data of a component into columns
+
+    :param component: simulated component (or :class:`StoredComponent`)
+    :type component: :class:`~smooth.components.component.Component`
+    :param add_array: function that saves a time series and returns its key
+    :type add_array: function
+    :return: entry of the component (name, type, parameters, scalar results
+        and keys of flows, states and time series results)
+    :rtype: dict
+    """
+    entry = {
+        'name': component.name,
+        'component': getattr(component, 'component', None),
+        'parameters': {},
+        'flows': [],
+        'states': [],
+        'series': [],
+        'results': {},
+    }
+    for attribute, value in vars(component).items():
+        if attribute in SPECIAL_ATTRIBUTES or attribute.startswith('_'):
+            continue
+        try:
+            # only parameters that can be written as JSON (no data frames or oemof objects)
+            json.dumps(value, default=json_value)
+        except (TypeError, ValueError):
+            continue
+        entry['parameters'][attribute] = value
+    for flow_name, flow in getattr(component, 'flows', {}).items():
+        entry['flows'].append([[str(node) for node in flow_name], add_array(flow)])
+    for state_name, state in getattr(component, 'states', {}).items():
+        entry['states'].append([state_name, add_array(state)])
+    for result_name, result in getattr(component, 'results', {}).items():
+        if isinstance(result, (list, tuple, np.ndarray)):
+            entry['series'].append([result_name, add_array(result)])
+        elif isinstance(result, (int, float, np.number)) or result is None:
+            entry['results'][result_name] = None if result is None else float(result)
+        # other results (e.g. objects) are not stored
+    return entry
+
+
+def load_component(entry, get_array, columns=COLUMNS):
+    """Create a component from its entry (inverse of :func:`component_columns`)
+
+    :param entry: entry of the component
+    :type entry: dict
+    :param get_array: function that returns the time series of a key
+    :type get_array: function
+    :param columns: columns to load, see :data:`COLUMNS`. Defaults to all
+    :type columns: list of strings, optional
+    :return: component
+    :rtype: :class:`StoredComponent`
+    """
+    component = StoredComponent(entry['name'], entry.get('component'))
+    if 'parameters' in columns:
+        for attribute, value in entry.get('parameters', {}).items():
+            if attribute not in SPECIAL_ATTRIBUTES:
+                setattr(component, attribute, value)
+    if 'flows' in columns:
+        for flow_name, key in entry.get('flows', []):
+            component.flows[tuple(flow_name)] = get_array(key)
+    if 'states' in columns:
+        for state_name, key in entry.get('states', []):
+            component.states[state_name] = get_array(key)
+    if 'series' in columns:
+        for result_name, key in entry.get('series', []):
+            component.results[result_name] = get_array(key)
+    if 'results' in columns:
+        component.results.update(entry.get('results', {}))
+    return component
+
+
+def is_individual(result):
+    """Is this an individual of an optimization (has attribute values and fitness)?"""
+    return hasattr(result, 'values') and hasattr(result, 'fitness')
+
+
+def result_kind(result_data):
+    """Kind of result data that can be written to a columnar result file
+
+    :param result_data: data to save
+    :type result_data: object
+    :return: 'optimization' for a list of individuals, 'components' for a list of components,
+        None for any other data
+    :rtype: string
+    """
+    if not isinstance(result_data, (list, tuple)):
+        return None
+    if result_data and all(is_individual(result) for result in result_data):
+        return 'optimization'
+    if all(hasattr(result, 'name') for result in result_data):
+        return 'components'
+    return None
+
+
+def save_result_file(file_name, result_data, dtype='float64'):
+    """Write the result of a smooth run or an optimization to a columnar result file
+
+    :param file_name: path of the result file
+    :type file_name: string
+    :param result_data: components returned by `run_smooth`
+        or individuals returned by `run_optimization`
+    :type result_data: list
+    :param dtype: data type of the arrays, e.g. 'float32'. Defaults to 'float64'
+    :type dtype: string, optional
+    :raises: :class:`~smooth.framework.exceptions.UnsupportedResultDataError`
+        if the data is neither a list of components nor of individuals (see :func:`result_kind`)
+    """
+    kind = result_kind(result_data)
+    if kind is None:
+        raise UnsupportedResultDataError('Result data must be a list of components or individuals')
+    manifest = {
+        'format': 'smooth-result', 'version': FORMAT_VERSION, 'kind': kind, 'sim_params': None}
+
+    tmp_file_name = file_name + '.tmp'
+    try:
+        with zipfile.ZipFile(tmp_file_name, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+            n_arrays = [0]
+
+            def add_array(series):
+                key = 'a{}.npy'.format(n_arrays[0])
+                n_arrays[0] += 1
+                data = io.BytesIO()
+                np.save(data, np.array([np.nan if v is None else v for v in series], dtype=dtype),
+                        allow_pickle=False)
+                archive.writestr(key, data.getvalue())
+                return key
+
+            def add_components(components):
+                components = list(components)
+                if manifest['sim_params'] is None and components:
+                    manifest['sim_params'] = sim_params_entry(components[0])
+                return [component_columns(c, add_array) for c in components]
+
+            if kind == 'optimization':
+                manifest['individuals'] = [{
+                    'values': list(ind.values),
+                    'fitness': None if ind.fitness is None else list(ind.fitness),
+                    'kpis': getattr(ind, 'kpis', None),
+                    'failure': getattr(ind, 'failure', None),
+                    'components': None if ind.smooth_result is None
+                    else add_components(ind.smooth_result),
+                } for ind in result_data]
+            else:
+                manifest['components'] = add_components(result_data)
+
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, default=json_value))
+        # replace existing file only when complete
+        os.replace(tmp_file_name, file_name)
+    finally:
+        # no partial file is left behind on failure
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+
+
+def sim_params_entry(component):
+    """Simulation parameters of a component that can be written as JSON
+
+    :param component: simulated component
+    :type component: :class:`~smooth.components.component.Component`
+    :return: parameters, None if the component has no simulation parameters
+    :rtype: dict
+    """
+    sim_params = getattr(component, 'sim_params', None)
+    if sim_params is None:
+        return None
+    entry = {}
+    for name, value in vars(sim_params).items():
+        try:
+            json.dumps(value, default=json_value)
+        except (TypeError, ValueError):
+            continue
+        entry[name] = value
+    return entry
+
+
+def read_manifest(file_name):
+    """Read the table of contents of a result file (no arrays)
+
+    :param file_name: path of the result file
+    :type file_name: string
+    :return: manifest
+    :rtype: dict
+    """
+    with zipfile.ZipFile(file_name) as archive:
+        manifest = json.loads(archive.read(MANIFEST_NAME).decode())
+    if manifest.get('version', 0) > FORMAT_VERSION:
+        warnings.warn('{} was written by a newer version of smooth (format {}), '
+                      'unknown entries are ignored'.format(file_name, manifest['version']))
+    return manifest
+
+
+def read_member(file_name, archive, key, mmap=False):
+    """Read an array of a result file
+
+    :param file_name: path of the result file
+    :type file_name: string
+    :param archive: opened result file
+    :type archive: :class:`zipfile.ZipFile`
+    :param key: name of the array in the result file
+    :type key: string
+    :param mmap: memory-map the array instead of reading it
+        (only for arrays that are not compressed). Defaults to False
+    :type mmap: boolean, optional
+    :return: array
+    :rtype: numpy array
+    """
+    info = archive.getinfo(key)
+    if not mmap or info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member, allow_pickle=False)
+    with open(file_name, 'rb') as data:
+        # skip local header of the member: fixed part, file name and extra field
+        data.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', data.read(4))
+        data.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(data)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(data)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(data)
+        offset = data.tell()
+    if not np.prod(shape):
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def load_result_file(file_name, components=None, columns=None, mmap=False):
+    """Load a result file written by :func:`save_result_file`
+
+    :param file_name: path of the result file
+    :type file_name: string
+    :param components: names of the components to load. Defaults to None (all)
+    :type components: list of strings, optional
+    :param columns: columns of the components to load: 'parameters', 'flows', 'states',
+        'series' (time series results like the variable costs of each interval)
+        and 'results' (scalar results). Defaults to None (all)
+    :type columns: list of strings, optional
+    :param mmap: memory-map the arrays instead of reading them. Defaults to False
+    :type mmap: boolean, optional
+    :return: components or, for an optimization result, individuals
+    :rtype: list of :class:`StoredComponent` or list of :class:`StoredIndividual`
+    """
+    columns = COLUMNS if columns is None else columns
+    manifest = read_manifest(file_name)
+    sim_params = None
+    if manifest.get('sim_params') is not None:
+        defaults = SimulationParameters({})
+        # unknown or derived parameters of other versions are skipped
+        sim_params = SimulationParameters({
+            name: value for name, value in manifest['sim_params'].items()
+            if hasattr(defaults, name) and name not in ['date_time_index', 'sim_time_span']})
+
+    with zipfile.ZipFile(file_name) as archive:
+        def get_array(key):
+            return read_member(file_name, archive, key, mmap)
+
+        def load_components(entries):
+            loaded = []
+            for entry in entries:
+                if components is None or entry['name'] in components:
+                    component = load_component(entry, get_array, columns)
+                    component.sim_params = sim_params
+                    loaded.append(component)
+            return loaded
+
+        if manifest.get('kind') == 'optimization':
+            return [StoredIndividual(
+                entry.get('values'),
+                None if entry.get('fitness') is None else tuple(entry['fitness']),
+                entry.get('kpis'),
+                entry.get('failure'),
+                None if entry.get('components') is None
+                else load_components(entry['components']),
+            ) for entry in manifest.get('individuals', [])]
+        return load_components(manifest.get('components', []))
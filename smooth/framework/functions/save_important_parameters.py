@@ -1,11 +1,7 @@
 import csv
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 
-sns.set()
-
 
 def save_important_parameters(optimization_results, result_index, result_filename,
                               comp_dict, external_components=None):
@@ -17,14 +13,20 @@ def save_important_parameters(optimization_results, result_index, result_filenam
     :type optimization_results: ?
     :param result_index: The index number that relates to the specific optimization result
     :type result_index: int
-    :param result_filename: The result filename e.g. 'my_optimization_results.pickle'
+    :param result_filename: The result filename e.g. 'my_optimization_results.zip'
     :type result_filename: pickle
     :param comp_dict: The dictionary containing names of all components
     :type comp_dict: dict
     """
+    # plotting packages are only imported when needed (seaborn is optional)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set()
 
     if result_filename.endswith('.pickle'):
         result_filename = result_filename[:-7]
+    elif result_filename.endswith('.zip'):
+        result_filename = result_filename[:-4]
     # create an empty csv file
     with open(str(result_filename + '_important_params'), 'w', newline='') as file:
         writer = csv.writer(file)
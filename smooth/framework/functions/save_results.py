@@ -2,18 +2,38 @@ import datetime
 import pickle
 
 
-def save_results(file_name, result_data):
+def save_results(file_name, result_data, file_format='columnar', dtype='float64'):
     """Save the result of either a smooth run or an optimization run by the genetic algorithm.
 
-    :param file_name: name of the result pickle file
+    By default, the result is written to a columnar result file (*.zip*), which can be loaded
+    partially and without the component classes
+    (see :mod:`~smooth.framework.functions.result_file`).
+    Data that is neither a list of components nor of individuals is pickled.
+
+    :param file_name: name of the result file (without date and extension)
     :type file_name: string
     :param result_data: data to save
+    :param file_format: 'columnar' or 'pickle' (previous file format). Defaults to 'columnar'
+    :type file_format: string, optional
+    :param dtype: data type of the saved time series in a columnar result file,
+        e.g. 'float32'. Defaults to 'float64'
+    :type dtype: string, optional
+    :return: name of the written file
+    :rtype: string
     """
 
     # Create the name of result by using the current time and then "_smooth_optimization_result.pcl"
     time_now = datetime.datetime.now()
-    file_name = time_now.strftime("%Y-%m-%d_%H-%M-%S_{}.pickle".format(file_name))
+    file_name = time_now.strftime("%Y-%m-%d_%H-%M-%S_{}".format(file_name))
+    if file_format == 'columnar':
+        from smooth.framework.functions.result_file import result_kind, save_result_file
+        # neither components nor individuals: pickle instead
+        if result_kind(result_data) is not None:
+            save_result_file(file_name + '.zip', result_data, dtype)
+            return file_name + '.zip'
+    file_name += '.pickle'
     # Create pointer to the file where the result will be saved.
     with open(file_name, 'wb') as save_file:
         # Pickle the result.
         pickle.dump(result_data, save_file)
+    return file_name
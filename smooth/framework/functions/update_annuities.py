@@ -1,6 +1,21 @@
 from smooth.framework.functions.functions import choose_valid_dict
 
 
+def weighted_sum(values, weights=None):
+    """Sum of values, each multiplied with its weight.
+
+    :param values: values to sum
+    :type values: list of numbers
+    :param weights: weight of each value. Defaults to None (all weights are 1)
+    :type weights: list of numbers, optional
+    :return: weighted sum
+    :rtype: number
+    """
+    if weights is None:
+        return sum(values)
+    return sum(value * weight for value, weight in zip(values, weights))
+
+
 def update_annuities(component):
     """Compute the annual CAPEX, variable costs and emissions.
 
@@ -46,12 +61,14 @@ def update_annuities(component):
     # Calculate the ratio of simulation time to one year (sim_time_span is in minutes) [-].
     time_ratio = component.sim_params.sim_time_span / (365 * 24 * 60)
     # Get the total amount of variable costs [EUR].
-    variable_cost_tot = sum(component.results['variable_costs'])
+    # With typical periods, each interval counts as often as its weight.
+    weights = component.sim_params.interval_weights
+    variable_cost_tot = weighted_sum(component.results['variable_costs'], weights)
     # Get the annuity of the variable cost [EUR/a].
     variable_cost_annuity = variable_cost_tot / time_ratio
 
     # Get the total amount of variable emissions [kg].
-    variable_emissions_tot = sum(component.results['variable_emissions'])
+    variable_emissions_tot = weighted_sum(component.results['variable_emissions'], weights)
     # Get the annual emissions out of the variable emissions [kg/a].
     variable_emissions_annual = variable_emissions_tot / time_ratio
 
@@ -99,19 +99,26 @@ Initialization
 There is not much to see here. Mainly, component instances get created from the
 model description. For legacy models (version < 0.2.0), the component list is
 converted to a dictionary. No oemof model is built here.
+If *n_typical_periods* is set in the simulation parameters, the time series of the model
+are aggregated to typical periods first (see :mod:`~smooth.framework.typical_periods`).
+The typical periods are simulated back to back from the *start_date*,
+so the dates of the results do not match the original dates of the periods.
 
 Simulation
 ----------
 This is the main part of the function. For each time step, an oemof model is
 solved and evaluated:
 
-#. print current time step to console if *print_progress* is set in parameters
+#. call *on_interval_start* of all hooks (prints current time step to console \
+    if *print_progress* is set in parameters)
 #. initialize oemof energy system model
 #. create buses
 #. update components and add them to the oemof model
 #. update bus constraints
+#. call *on_model_built* of all hooks
 #. write lp file in current directory
 #. call solver for model
+#. call *on_solved* of all hooks with solver time and status
 #. check returned status for non#.optimal solution
 #. handle results for each component
 
@@ -119,29 +126,43 @@ solved and evaluated:
     #. update states
     #. update costs
     #. update emissions
+#. call *on_interval_end* of all hooks. Stop if any hook returns True
+
+Hooks
+-----
+Optionally, a list of hooks can be given to :func:`run_smooth` to follow the simulation
+(see :mod:`~smooth.framework.simulation_hooks`). Without any hooks, there is no overhead.
 
 Post-processing
 ---------------
 After all time steps have been computed, call the *generate_results* function of each component.
+Then, call *on_run_end* of all hooks.
 Finally, return the updated components and the last oemof status.
 """
 
+import tempfile
+import time
 from oemof import solph
 from oemof.outputlib import processing
 from smooth.framework.simulation_parameters import SimulationParameters as sp
 from smooth.framework.functions.debug import get_df_debug, show_debug
-from smooth.framework.exceptions import SolverNonOptimalError
+from smooth.framework.exceptions import SolverNonOptimalError, SimulationAbortedError
+from smooth.framework.simulation_hooks import PrintProgressHook
 from smooth.framework.functions.functions import create_component_obj
+from smooth.framework.typical_periods import aggregate_model
 
 
-def run_smooth(model):
+def run_smooth(model, hooks=None):
     """Runs the smooth simulation framework
 
     :param model: smooth model object containing parameters for components, simulation and busses
     :type model: dictionary
+    :param hooks: event hooks called during the simulation. Defaults to None
+    :type hooks: list of :class:`~smooth.framework.simulation_hooks.SimulationHook`, optional
     :return: results of all components and oemof status
     :rtype: tuple of components and string
-    :raises: *SolverNonOptimalError* if oemof result is not ok and not optimal
+    :raises: *SolverNonOptimalError* if oemof result is not ok and not optimal,
+        *SimulationAbortedError* if a hook stopped the simulation
     """
 
     # ------------------- INITIALIZATION -------------------
@@ -155,7 +176,22 @@ def run_smooth(model):
     sim_params = sp(model['sim_params'])
 
     # CREATE COMPONENT OBJECTS
-    components = create_component_obj(model, sim_params)
+    if sim_params.n_typical_periods:
+        # Simulate typical periods only. The components read their aggregated
+        # time series on creation, so the files are only needed until then.
+        with tempfile.TemporaryDirectory() as directory:
+            model, _ = aggregate_model(
+                model, sim_params.n_typical_periods, sim_params.typical_period_length, directory)
+            sim_params = sp(model['sim_params'])
+            components = create_component_obj(model, sim_params)
+    else:
+        components = create_component_obj(model, sim_params)
+
+    # SET UP HOOKS
+    # Copy the given hooks, so the progress printer is not added to the caller's list.
+    hooks = list(hooks) if hooks else []
+    if sim_params.print_progress:
+        hooks.append(PrintProgressHook())
 
     # There are no results yet.
     df_results = None
@@ -165,8 +201,8 @@ def run_smooth(model):
     for i_interval in range(sim_params.n_intervals):
         # Save the interval index of this run to the sim_params to make it usable later on.
         sim_params.i_interval = i_interval
-        if sim_params.print_progress:
-            print('Simulating interval {}/{}'.format(i_interval+1, sim_params.n_intervals))
+        for hook in hooks:
+            hook.on_interval_start(i_interval, sim_params)
 
         # Initialize the oemof energy system for this time step.
         this_time_index = sim_params.date_time_index[i_interval: (i_interval + 1)]
@@ -203,17 +239,24 @@ def run_smooth(model):
         for this_comp in components:
             this_comp.update_constraints(busses, model_to_solve)
 
+        for hook in hooks:
+            hook.on_model_built(i_interval, sim_params, model_to_solve)
+
         if i_interval == 0:
             # Save the set of linear equations for the first interval.
             model_to_solve.write('./oemof_model.lp', io_options={'symbolic_solver_labels': True})
 
+        solver_start = time.perf_counter()
         oemof_results = model_to_solve.solve(solver='cbc', solve_kwargs={'tee': False})
+        solver_time = time.perf_counter() - solver_start
 
         # ------------------- CHECK IF SOLVING WAS SUCCESSFUL -------------------
         # If the status and temination condition is not ok/optimal, get and
         # print the current flows and status
         status = oemof_results["Solver"][0]["Status"].key
         termination_condition = oemof_results["Solver"][0]["Termination condition"].key
+        for hook in hooks:
+            hook.on_solved(i_interval, sim_params, solver_time, status, termination_condition)
         if status != "ok" and termination_condition != "optimal":
             if sim_params.show_debug_flag:
                 new_df_results = processing.create_dataframe(model_to_solve)
@@ -240,8 +283,20 @@ def run_smooth(model):
             # Update the costs and artificial costs.
             this_comp.update_var_emissions(results)
 
+        # Let the hooks know this interval is done. Any hook may stop the simulation.
+        # Evaluate all hooks, even if an earlier one already asked to stop.
+        stop_requests = [hook.on_interval_end(i_interval, sim_params, components)
+                         for hook in hooks]
+        if any(stop_requests):
+            raise SimulationAbortedError(
+                'simulation stopped by hook after interval {}/{}'.format(
+                    i_interval+1, sim_params.n_intervals))
+
     # Calculate the annuity for each component.
     for this_comp in components:
         this_comp.generate_results()
 
+    for hook in hooks:
+        hook.on_run_end(components, status)
+
     return components, status
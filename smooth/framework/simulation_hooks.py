@@ -0,0 +1,193 @@
+"""Event hooks to instrument a run of :func:`~smooth.framework.run_smooth.run_smooth`.
+
+*****
+Scope
+*****
+Hooks allow callers to follow the progress of a simulation, collect metrics
+or stop a run early without changing the simulation itself.
+If no hooks are given, :func:`~smooth.framework.run_smooth.run_smooth` does not call anything.
+
+*******
+Concept
+*******
+A hook is an object derived from :class:`SimulationHook` that overrides one or more
+of its event methods. The events are called in this order:
+
+#. *on_interval_start* before the oemof model of an interval is built
+#. *on_model_built* after the oemof model and all component constraints are set up
+#. *on_solved* right after the solver returned (also if the solution is not optimal)
+#. *on_interval_end* after all component results of this interval have been updated
+#. *on_run_end* after the results of all components have been generated
+
+If *on_interval_end* of any hook returns True, the simulation is stopped and
+:class:`~smooth.framework.exceptions.SimulationAbortedError` is raised.
+:class:`AbortHook` uses this to stop runs early, depending on the results so far
+(see :func:`provisional_results`).
+
+Example::
+
+    class MyHook(SimulationHook):
+        def on_solved(self, i_interval, sim_params, solver_time, status, termination_condition):
+            print(i_interval, solver_time)
+
+    run_smooth(mymodel, hooks=[MyHook()])
+"""
+
+import copy
+import time
+
+# component attributes changed by generate_results
+RESULT_ATTRIBUTES = ('results', 'capex', 'opex', 'fix_emissions', 'op_emissions')
+
+
+class SimulationHook:
+    """Base class for simulation hooks. All event methods do nothing by default.
+    """
+
+    def on_interval_start(self, i_interval, sim_params):
+        """Called before the oemof model of an interval is built.
+
+        :param i_interval: index of the current interval
+        :type i_interval: int
+        :param sim_params: simulation parameters
+        :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
+        """
+        pass
+
+    def on_model_built(self, i_interval, sim_params, model_to_solve):
+        """Called after the oemof model of an interval is built, before it is solved.
+
+        :param i_interval: index of the current interval
+        :type i_interval: int
+        :param sim_params: simulation parameters
+        :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
+        :param model_to_solve: oemof model of this interval
+        :type model_to_solve: oemof.solph.Model
+        """
+        pass
+
+    def on_solved(self, i_interval, sim_params, solver_time, status, termination_condition):
+        """Called after the solver returned.
+
+        :param i_interval: index of the current interval
+        :type i_interval: int
+        :param sim_params: simulation parameters
+        :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
+        :param solver_time: wall clock time of the solver call [s]
+        :type solver_time: float
+        :param status: solver status, e.g. 'ok'
+        :type status: str
+        :param termination_condition: solver termination condition, e.g. 'optimal'
+        :type termination_condition: str
+        """
+        pass
+
+    def on_interval_end(self, i_interval, sim_params, components):
+        """Called after the results of all components were updated for this interval.
+
+        :param i_interval: index of the current interval
+        :type i_interval: int
+        :param sim_params: simulation parameters
+        :type sim_params: :class:`~smooth.framework.simulation_parameters.SimulationParameters`
+        :param components: all components of the simulation
+        :type components: list of :class:`~smooth.components.component.Component`
+        :return: True to stop the simulation, otherwise False or None
+        :rtype: boolean
+        """
+        pass
+
+    def on_run_end(self, components, status):
+        """Called after the results of all components have been generated.
+
+        :param components: all components of the simulation
+        :type components: list of :class:`~smooth.components.component.Component`
+        :param status: last oemof solver status
+        :type status: str
+        """
+        pass
+
+
+class PrintProgressHook(SimulationHook):
+    """Print the current interval to the console.
+
+    This hook is added by :func:`~smooth.framework.run_smooth.run_smooth`
+    if *print_progress* is set in the simulation parameters.
+
+    :param min_time: minimum time between two printed lines [s].
+        Defaults to 0 (print every interval)
+    :type min_time: number, optional
+    :var last_print: time of the last printed line
+    :type last_print: float
+    """
+
+    def __init__(self, min_time=0):
+        self.min_time = min_time
+        self.last_print = None
+
+    def on_interval_start(self, i_interval, sim_params):
+        now = time.perf_counter()
+        is_last = i_interval + 1 == sim_params.n_intervals
+        if self.last_print is None or is_last or now - self.last_print >= self.min_time:
+            self.last_print = now
+            print('Simulating interval {}/{}'.format(i_interval+1, sim_params.n_intervals))
+
+
+def copy_components(components):
+    """Copy components, so *generate_results* can be called without changing the originals.
+    Only the :data:`RESULT_ATTRIBUTES` are copied, all other attributes
+    (e.g. flows and states) are shared with the originals.
+
+    :param components: components of a simulation
+    :type components: list of :class:`~smooth.components.component.Component`
+    :return: copies of the components
+    :rtype: list of :class:`~smooth.components.component.Component`
+    """
+    copies = []
+    for component in components:
+        this_copy = copy.copy(component)
+        for attribute in RESULT_ATTRIBUTES:
+            setattr(this_copy, attribute, copy.deepcopy(getattr(component, attribute)))
+        copies.append(this_copy)
+    return copies
+
+
+def provisional_results(components):
+    """Annual results of a simulation that is still running.
+
+    Calls *generate_results* on copies of the components, so the components
+    of the simulation are not changed. Variable costs and emissions of the intervals
+    not simulated yet count as zero. If they can not be negative, the provisional
+    annual costs and emissions are lower bounds of the final results.
+
+    :param components: all components of the simulation
+    :type components: list of :class:`~smooth.components.component.Component`
+    :return: copies of the components with updated *results*
+    :rtype: list of :class:`~smooth.components.component.Component`
+    """
+    provisional = copy_components(components)
+    for component in provisional:
+        component.generate_results()
+    return provisional
+
+
+class AbortHook(SimulationHook):
+    """Stop the simulation if a predicate on the provisional results is true.
+
+    The predicate is checked every *check_every* intervals, but not after the last one.
+
+    :param predicate: function that takes the provisional results
+        (see :func:`provisional_results`) and returns True to stop the simulation
+    :type predicate: function
+    :param check_every: number of intervals between checks. Defaults to 24
+    :type check_every: int, optional
+    """
+
+    def __init__(self, predicate, check_every=24):
+        self.predicate = predicate
+        self.check_every = check_every
+
+    def on_interval_end(self, i_interval, sim_params, components):
+        n_done = i_interval + 1
+        if n_done % self.check_every or n_done >= sim_params.n_intervals:
+            return False
+        return bool(self.predicate(provisional_results(components)))
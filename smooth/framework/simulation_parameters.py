@@ -17,8 +17,17 @@ class SimulationParameters:
     :param show_debug_flag: Decide if last result values should be shown
         in case solver was not successful. Defaults to True
     :type show_debug_flag: boolean
+    :param interval_weights: weight of each interval for variable costs and emissions,
+        e.g. number of represented periods when simulating typical periods. Defaults to None
+    :type interval_weights: list of numbers
+    :param n_typical_periods: simulate this number of typical periods instead of all intervals,
+        see :mod:`~smooth.framework.typical_periods`. Defaults to None (all intervals)
+    :type n_typical_periods: integer
+    :param typical_period_length: number of intervals of a typical period. Defaults to 24
+    :type typical_period_length: integer
     :var date_time_index: pandas date range of all time periods to be evaluated
     :var sim_time_span: length of simulation time range in minutes
+        (weighted with *interval_weights*, if given)
     """
 
     def __init__(self, params):
@@ -29,6 +38,9 @@ class SimulationParameters:
         self.interest_rate = 0.03
         self.print_progress = False
         self.show_debug_flag = True
+        self.interval_weights = None
+        self.n_typical_periods = None
+        self.typical_period_length = 24
 
         # ------------------- UPDATE PARAMETER DEFAULT VALUES -------------------
         self.set_parameters(params)
@@ -37,7 +49,14 @@ class SimulationParameters:
         self.date_time_index = func.get_date_time_index(
             self.start_date, self.n_intervals, self.interval_time)
         # Time span of the simulation [min].
-        self.sim_time_span = func.get_sim_time_span(self.n_intervals, self.interval_time)
+        if self.interval_weights is None:
+            self.sim_time_span = func.get_sim_time_span(self.n_intervals, self.interval_time)
+        else:
+            # Each interval represents the time of as many intervals as its weight.
+            assert len(self.interval_weights) == self.n_intervals, \
+                "Number of interval weights does not match n_intervals"
+            self.sim_time_span = func.get_sim_time_span(
+                sum(self.interval_weights), self.interval_time)
 
     def set_parameters(self, params):
         """Helper function to set simulation parameters on initialisation.
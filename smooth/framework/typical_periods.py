@@ -0,0 +1,216 @@
+"""Aggregation of the input time series into typical periods.
+
+*****
+Scope
+*****
+A simulation of a whole year with hourly intervals solves 8760 oemof models,
+although many days of a year are very similar. This module reduces a model
+to a few representative (typical) periods, e.g. days or weeks,
+that are simulated instead of the whole time range.
+
+*******
+Concept
+*******
+All time series of a model are the CSV files of its components
+(every component with a *csv_filename*). They are cut into periods of
+*typical_period_length* intervals, each time series is scaled to its range and the
+periods are clustered with k-medoids. The medoid of each cluster is an actual period
+of the input data, so all time series of a typical period belong to the same time.
+
+The aggregated model simulates the medoids in chronological order. The components
+read the time series of the medoids from new CSV files, so all states
+(e.g. of storages) are passed on from one typical period to the next, as in a normal run.
+Each interval of a typical period is weighted with the number of periods in its cluster
+(*interval_weights* of the
+:class:`~smooth.framework.simulation_parameters.SimulationParameters`).
+The variable costs and emissions are summed with these weights and scaled
+to the time span of the original simulation
+(see :func:`~smooth.framework.functions.update_annuities.update_annuities`).
+
+To simulate typical periods, set *n_typical_periods* (and optionally *typical_period_length*,
+which defaults to 24 intervals) in the simulation parameters of the model. Then
+:func:`~smooth.framework.run_smooth.run_smooth` aggregates the model before the simulation.
+The flows and states in the results only cover the typical periods.
+An incomplete last period of the original time range is ignored.
+
+The typical periods are simulated back to back from the *start_date*:
+the *date_time_index* of the aggregated simulation is not remapped to the original
+dates of the medoids. Components that depend on the date (not only on their time series)
+and all timestamps of the results therefore do not match the dates of the typical periods.
+The original start of each typical period is its index (returned by :func:`aggregate_model`)
+times *typical_period_length* intervals after the *start_date*.
+"""
+
+import copy
+import os
+import sys
+
+import numpy as np
+
+from smooth.framework import component_registry
+import smooth.framework.functions.functions as func
+
+
+def read_time_series(model, n_intervals):
+    """Read the time series of all components of a model that have a CSV file.
+
+    :param model: smooth model with components as dict
+    :type model: dict
+    :param n_intervals: number of intervals to read
+    :type n_intervals: int
+    :return: time series by component name
+    :rtype: dict of numpy arrays
+    :raises: *ValueError* if a time series is shorter than *n_intervals*
+    """
+    time_series = {}
+    for name, component in model['components'].items():
+        if component.get('csv_filename') is None:
+            continue
+        path = component.get('path')
+        if path is None:
+            # default path of components: directory of the component module
+            cls = component_registry.components.get(component['component'])
+            path = os.path.dirname(sys.modules[cls.__module__].__file__)
+        data = func.read_data_file(
+            path, component['csv_filename'],
+            component.get('csv_separator', ','), component.get('column_title', 0))
+        values = data.iloc[:n_intervals, 0].values.astype(float)
+        if len(values) < n_intervals:
+            raise ValueError('Time series of {} has only {} values, {} needed'.format(
+                name, len(values), n_intervals))
+        time_series[name] = values
+    return time_series
+
+
+def k_medoids(features, n_clusters, max_iter=100, seed=0):
+    """Cluster feature vectors with k-medoids (alternating assignment and medoid update).
+
+    :param features: feature vector of each item (items x features)
+    :type features: numpy array
+    :param n_clusters: number of clusters
+    :type n_clusters: int
+    :param max_iter: maximum number of iterations. Defaults to 100
+    :type max_iter: int, optional
+    :param seed: seed of the initial medoid choice. Defaults to 0
+    :type seed: int, optional
+    :return: sorted indices of the medoids and cluster of each item (index into medoids)
+    :rtype: tuple(list of int, numpy array)
+    """
+    n_items = len(features)
+    if n_clusters >= n_items:
+        return list(range(n_items)), np.arange(n_items)
+    distance = np.sqrt(((features[:, None, :] - features[None, :, :]) ** 2).sum(axis=2))
+
+    # k-means++ initialisation: far away items are likely to become medoids
+    rng = np.random.RandomState(seed)
+    medoids = [rng.randint(n_items)]
+    while len(medoids) < n_clusters:
+        weight = distance[:, medoids].min(axis=1) ** 2
+        if weight.sum() == 0:
+            # all remaining items equal to a medoid
+            weight = np.ones(n_items)
+            weight[medoids] = 0
+        medoids.append(rng.choice(n_items, p=weight / weight.sum()))
+
+    for _ in range(max_iter):
+        labels = distance[:, medoids].argmin(axis=1)
+        new_medoids = []
+        for cluster in range(n_clusters):
+            members = np.flatnonzero(labels == cluster)
+            # member with the least distance to all other members
+            cost = distance[np.ix_(members, members)].sum(axis=1)
+            new_medoids.append(members[cost.argmin()])
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+
+    medoids = sorted(medoids)
+    return medoids, distance[:, medoids].argmin(axis=1)
+
+
+def cluster_periods(time_series, n_periods, period_length, seed=0):
+    """Find typical periods of the time series.
+
+    :param time_series: time series of the same length
+    :type time_series: dict of numpy arrays
+    :param n_periods: number of typical periods
+    :type n_periods: int
+    :param period_length: number of intervals of a period
+    :type period_length: int
+    :param seed: seed of the clustering. Defaults to 0
+    :type seed: int, optional
+    :return: index of the typical periods (in chronological order)
+        and number of periods each of them represents
+    :rtype: tuple(list of int, list of int)
+    """
+    series = list(time_series.values())
+    n_total = len(series[0]) // period_length if series else 0
+    if n_total == 0:
+        return [], []
+    features = []
+    for values in series:
+        periods = values[:n_total * period_length].reshape(n_total, period_length)
+        value_range = values.max() - values.min()
+        features.append((periods - values.min()) / (value_range if value_range > 0 else 1))
+    medoids, labels = k_medoids(np.hstack(features), n_periods, seed=seed)
+    weights = np.bincount(labels, minlength=len(medoids))
+    return medoids, weights.tolist()
+
+
+def aggregate_model(model, n_periods, period_length=24, directory='.'):
+    """Create a model that simulates only typical periods.
+
+    The time series of the typical periods are written to new CSV files in *directory*,
+    the components of the returned model read these files.
+
+    :param model: smooth model with components as dict
+    :type model: dict
+    :param n_periods: number of typical periods
+    :type n_periods: int
+    :param period_length: number of intervals of a period. Defaults to 24
+    :type period_length: int, optional
+    :param directory: directory for the CSV files of the typical periods. Defaults to '.'
+    :type directory: string, optional
+    :return: aggregated model and the typical periods
+        (index of each period in the original time range and its weight).
+        The simulation parameters of the aggregated model keep the *start_date*,
+        so its dates do not match the original dates of the periods
+    :rtype: tuple(dict, list of tuples)
+    """
+    sim_params = dict(model['sim_params'])
+    n_intervals = sim_params.get('n_intervals', 24 * 7)
+    n_total = n_intervals // period_length
+    if n_total * period_length != n_intervals:
+        print('Typical periods: last {} intervals are ignored'.format(
+            n_intervals - n_total * period_length))
+
+    time_series = read_time_series(model, n_total * period_length)
+    if time_series:
+        medoids, weights = cluster_periods(time_series, n_periods, period_length)
+    else:
+        # no time series: any period is typical
+        medoids, weights = [0], [n_total]
+
+    aggregated = dict(model)
+    aggregated['components'] = copy.deepcopy(model['components'])
+    for name, values in time_series.items():
+        file_name = 'typical_periods_{}.csv'.format(name)
+        data = np.concatenate([
+            values[i * period_length:(i + 1) * period_length] for i in medoids])
+        with open(os.path.join(directory, file_name), 'w') as csv_file:
+            csv_file.write('value\n')
+            csv_file.writelines('{!r}\n'.format(float(value)) for value in data)
+        aggregated['components'][name].update({
+            'path': directory,
+            'csv_filename': file_name,
+            'csv_separator': ',',
+            'column_title': 'value',
+        })
+
+    sim_params.update({
+        'n_intervals': len(medoids) * period_length,
+        'interval_weights': [w for w in weights for _ in range(period_length)],
+        'n_typical_periods': None,
+    })
+    aggregated['sim_params'] = sim_params
+    return aggregated, list(zip(medoids, weights))
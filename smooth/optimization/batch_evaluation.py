@@ -0,0 +1,144 @@
+"""Simulate several configurations of a model together in one solver call per interval.
+
+*****
+Scope
+*****
+For small models, most of the time of an evaluation is spent building the oemof model
+and starting the solver for each interval, not solving it.
+The individuals of the optimization are independent, so the models of several individuals
+can be stacked into one energy system: the linear program of each interval is block-diagonal
+(one block per individual) and is solved in one solver call.
+This is **experimental**, see *batch_size* of
+:class:`~smooth.optimization.run_optimization.Optimization`.
+
+*******
+Concept
+*******
+:func:`stack_models` copies the components and busses of each model into one model.
+All labels of a block get the prefix of the block (see :func:`block_prefix`):
+the names of the components and busses and all parameter values that refer to them
+(e.g. *bus_el* of an electrolyzer). Blocks are only connected by the simulation
+parameters, which must be the same for all models.
+
+The stacked model is simulated with :func:`~smooth.framework.run_smooth.run_smooth`.
+Afterwards, :func:`split_components` sorts the components back into their blocks
+and removes the prefixes from their names, label attributes and flow names.
+Flow names are tuples of label strings (like in
+:mod:`~smooth.optimization.result_store`).
+
+Limitations:
+
+- if any block can not be solved, the whole stack fails
+- a string parameter that equals the name of a bus or component is treated as a label
+- hooks see the stacked components
+- flow names are tuples of label strings, while `run_smooth` of a single model keys the flows
+  by tuples of oemof nodes. Objectives and KPIs that should work with both
+  look up flows by tuples of labels (like *dependency_flow_costs* of a component)
+  or convert the nodes with `str`
+"""
+
+# separates the block number from the original label
+PREFIX_SEPARATOR = '__'
+
+
+def block_prefix(block):
+    """Prefix of all labels of a block
+
+    :param block: index of the block
+    :type block: int
+    :return: prefix
+    :rtype: string
+    """
+    return 'b{}{}'.format(block, PREFIX_SEPARATOR)
+
+
+def prefix_labels(value, labels, prefix):
+    """Add prefix to all labels in a parameter value
+
+    :param value: parameter value, lists, tuples and dicts are searched recursively
+    :type value: object
+    :param labels: names of busses and components
+    :type labels: set of strings
+    :param prefix: prefix of the block
+    :type prefix: string
+    :return: value with prefixed labels
+    :rtype: object
+    """
+    if isinstance(value, str):
+        return prefix + value if value in labels else value
+    if isinstance(value, (list, tuple)):
+        return type(value)(prefix_labels(v, labels, prefix) for v in value)
+    if isinstance(value, dict):
+        return {k: prefix_labels(v, labels, prefix) for k, v in value.items()}
+    return value
+
+
+def strip_labels(value, prefix):
+    """Remove prefix from all labels in a value (inverse of :func:`prefix_labels`)
+
+    :param value: attribute value, lists and tuples are searched recursively
+    :type value: object
+    :param prefix: prefix of the block
+    :type prefix: string
+    :return: value without prefixes
+    :rtype: object
+    """
+    if isinstance(value, str):
+        return value[len(prefix):] if value.startswith(prefix) else value
+    if isinstance(value, (list, tuple)):
+        return type(value)(strip_labels(v, prefix) for v in value)
+    return value
+
+
+def stack_models(models):
+    """Stack models into one model with independent blocks
+
+    :param models: smooth models with components as dict and the same simulation parameters
+    :type models: list of dicts
+    :return: stacked model
+    :rtype: dict
+    :raises: `AssertionError` if the simulation parameters differ
+    """
+    assert models, "No models to stack"
+    sim_params = models[0].get('sim_params')
+    stacked = {'components': {}, 'busses': [], 'sim_params': sim_params}
+    for block, model in enumerate(models):
+        assert model.get('sim_params') == sim_params, \
+            "Stacked models need the same simulation parameters"
+        prefix = block_prefix(block)
+        labels = set(model['busses']) | set(model['components'])
+        stacked['busses'] += [prefix + bus for bus in model['busses']]
+        for name, parameters in model['components'].items():
+            stacked['components'][prefix + name] = {
+                # component type is never a label
+                key: value if key == 'component' else prefix_labels(value, labels, prefix)
+                for key, value in parameters.items()}
+    return stacked
+
+
+def split_components(components, n_blocks):
+    """Sort simulated components of a stacked model back into their blocks
+
+    Names and label attributes of the components are restored.
+    Flow names become tuples of the original labels.
+
+    :param components: components returned by `run_smooth` for the stacked model
+    :type components: list of :class:`~smooth.components.component.Component`
+    :param n_blocks: number of stacked models
+    :type n_blocks: int
+    :return: components of each block
+    :rtype: list of lists
+    """
+    blocks = [[] for _ in range(n_blocks)]
+    for component in components:
+        block = int(component.name[1:].split(PREFIX_SEPARATOR, 1)[0])
+        prefix = block_prefix(block)
+        for attribute, value in vars(component).items():
+            if isinstance(value, (str, list, tuple)):
+                setattr(component, attribute, strip_labels(value, prefix))
+        if hasattr(component, 'flows'):
+            component.flows = {
+                tuple(strip_labels(str(node), prefix) for node in flow_name): flow
+                for flow_name, flow in component.flows.items()}
+        blocks[block].append(component)
+    return blocks
@@ -0,0 +1,168 @@
+"""Reuse the dispatch of a simulation for attributes that only change costs and emissions.
+
+*****
+Scope
+*****
+Some attributes varied by the optimization do not change the dispatch
+(flows and states) of the energy system, only the results computed afterwards
+by *generate_results*: the *life_time* of a component, its *capex*, *opex*,
+*fix_emissions* and *op_emissions*. Individuals that differ only in these attributes
+share the same simulation, so only the cost and emission pass has to be repeated.
+
+*******
+Concept
+*******
+Each :class:`~smooth.optimization.run_optimization.AttributeVariation` is either
+dispatch-affecting or cost-only. By default, the attributes in :data:`COST_ONLY_ATTRIBUTES`
+are cost-only. This can be set explicitly for each attribute variation with
+*dispatch_invariant* (e.g. for a component parameter that is only used
+in its cost functions).
+
+Each worker keeps a :class:`DispatchCache`. The key of a simulation are the values
+of all dispatch-affecting attributes (and the simulation parameters).
+With *ignore_zero*, a cost-only attribute of zero removes its component,
+so it is part of the key as well. A :class:`SnapshotHook` copies the components
+after the last interval, before *generate_results*. For an individual with a known key,
+the snapshot is copied again, the cost-only attributes are set on the copied components,
+their validity is checked like after creating a component
+and only *generate_results* is called (see :func:`finish_dispatch`).
+
+The copies share the flows and states with the snapshot, only the attributes changed
+by *generate_results* are copied
+(see :func:`~smooth.framework.simulation_hooks.copy_components`).
+The least recently used snapshots are dropped when the cache is full.
+"""
+
+from collections import OrderedDict
+import copy
+
+from smooth.framework.simulation_hooks import SimulationHook, copy_components
+
+# component attributes that are only used after the simulation
+COST_ONLY_ATTRIBUTES = ('life_time', 'capex', 'opex', 'fix_emissions', 'op_emissions')
+
+
+def is_dispatch_invariant(attribute_variation):
+    """Does an attribute variation only change costs and emissions?
+
+    :param attribute_variation: attribute variation
+    :type attribute_variation: :class:`~smooth.optimization.run_optimization.AttributeVariation`
+    :return: *dispatch_invariant* of the attribute variation if set,
+        otherwise True for the attributes in :data:`COST_ONLY_ATTRIBUTES`
+    :rtype: boolean
+    """
+    explicit = getattr(attribute_variation, 'dispatch_invariant', None)
+    if explicit is not None:
+        return explicit
+    return attribute_variation.comp_attribute in COST_ONLY_ATTRIBUTES
+
+
+class SnapshotHook(SimulationHook):
+    """Copy the components after the last interval, before *generate_results* is called.
+
+    :var components: copied components, None if the simulation did not finish
+    :type components: list of :class:`~smooth.components.component.Component`
+    """
+
+    def __init__(self):
+        self.components = None
+
+    def on_interval_end(self, i_interval, sim_params, components):
+        if i_interval + 1 == sim_params.n_intervals:
+            self.components = copy_components(components)
+        return False
+
+
+def finish_dispatch(components, attribute_variation, genes):
+    """Set cost-only attributes on the components of a simulation and generate the results
+
+    :param components: components of a simulation, before *generate_results*
+    :type components: list of :class:`~smooth.components.component.Component`
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of
+        :class:`~smooth.optimization.run_optimization.AttributeVariation`
+    :param genes: attribute values of the individual
+    :type genes: list
+    :return: components with results
+    :rtype: list of :class:`~smooth.components.component.Component`
+    :raises: `ValueError` if a changed attribute is not valid
+        (see :meth:`~smooth.components.component.Component.check_validity`)
+    """
+    by_name = {component.name: component for component in components}
+    for av, value in zip(attribute_variation, genes):
+        if is_dispatch_invariant(av) and av.comp_name in by_name:
+            setattr(by_name[av.comp_name], av.comp_attribute, copy.deepcopy(value))
+    for component in components:
+        # same check as for a simulated individual
+        component.check_validity()
+        component.generate_results()
+    return components
+
+
+class DispatchCache:
+    """Simulations of a worker by their dispatch-affecting attribute values
+
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of
+        :class:`~smooth.optimization.run_optimization.AttributeVariation`
+    :param ignore_zero: attribute values of zero remove components. Defaults to False
+    :type ignore_zero: boolean, optional
+    :param max_size: maximum number of saved simulations. Defaults to 16
+    :type max_size: int, optional
+    :var hits: number of reused simulations
+    :type hits: int
+    """
+
+    def __init__(self, attribute_variation, ignore_zero=False, max_size=16):
+        self.invariant = [is_dispatch_invariant(av) for av in attribute_variation]
+        self.ignore_zero = ignore_zero
+        self.max_size = max_size
+        self.snapshots = OrderedDict()
+        self.hits = 0
+
+    def key(self, genes, sim_params=None):
+        """Key of the simulation of an individual
+
+        :param genes: attribute values
+        :type genes: list
+        :param sim_params: changed simulation parameters (e.g. reduced fidelity)
+        :type sim_params: dict, optional
+        :return: key
+        :rtype: string
+        """
+        key = []
+        for invariant, value in zip(self.invariant, genes):
+            if not invariant:
+                key.append(value)
+            elif self.ignore_zero:
+                # zero removes component from simulation
+                key.append(value == 0)
+        return repr((key, sorted((sim_params or {}).items())))
+
+    def get(self, key):
+        """Copy of a saved simulation
+
+        :param key: key of the simulation, see :meth:`key`
+        :type key: string
+        :return: copied components before *generate_results*, None if unknown
+        :rtype: list of :class:`~smooth.components.component.Component`
+        """
+        if key not in self.snapshots:
+            return None
+        self.snapshots.move_to_end(key)
+        self.hits += 1
+        return copy_components(self.snapshots[key])
+
+    def put(self, key, components):
+        """Save a simulation
+
+        :param key: key of the simulation, see :meth:`key`
+        :type key: string
+        :param components: components before *generate_results* (see :class:`SnapshotHook`)
+        :type components: list of :class:`~smooth.components.component.Component`
+        """
+        self.snapshots[key] = components
+        self.snapshots.move_to_end(key)
+        while len(self.snapshots) > self.max_size:
+            # drop least recently used
+            self.snapshots.popitem(last=False)
@@ -0,0 +1,376 @@
+"""Distributed fitness evaluation over the network.
+
+*****
+Scope
+*****
+A multiprocessing pool only uses the cores of one machine.
+With the *distributed* evaluator of :class:`~smooth.optimization.run_optimization.Optimization`,
+the optimization starts a :class:`Broker` instead, which waits for worker processes
+to connect over a socket. Workers may run on any machine that can reach the broker,
+so an optimization can be scaled over several nodes.
+
+*******
+Concept
+*******
+The broker has the same interface as a multiprocessing pool
+(*apply_async*, *close*, *join*), so the optimization does not need to know
+where the evaluations run. All connections are authenticated with a shared key
+and transfer pickled data (see `multiprocessing.connection
+<https://docs.python.org/3/library/multiprocessing.html#module-multiprocessing.connection>`_).
+
+#. tasks are put into a queue of the broker
+#. each connected worker gets the initializer arguments once (e.g. the model),
+   then one task at a time
+#. while a worker computes a task, it sends a heartbeat every few seconds
+#. if a worker disconnects or its heartbeat is missing, its task is put back into the queue
+   and given to another worker
+#. each task is only finished once: a late result of a re-queued task is ignored
+
+Start workers on each machine with::
+
+    python -m smooth.optimization.distributed --address HOST:PORT --authkey KEY --processes N
+
+The workers keep trying to connect until the broker is started
+and exit when the optimization is finished.
+
+Anyone who can connect with the key can run code on the broker and the workers,
+because the transferred data is unpickled. The broker listens on *localhost* by default
+and a random key is generated unless one is given. Only listen on other interfaces
+(e.g. ``('', 6000)`` for all) in a trusted network.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+from multiprocessing.connection import Client, Listener
+import queue
+import threading
+import time
+
+
+class RemoteError(Exception):
+    """Error raised by a task on a remote worker"""
+    pass
+
+
+class Task:
+    """Handle of a submitted task, like the result of `Pool.apply_async`
+
+    :param func: function to call on the worker
+    :type func: function
+    :param args: arguments of the function
+    :type args: tuple
+    :param callback: called with the result on success
+    :type callback: function
+    :param error_callback: called with the exception on failure
+    :type error_callback: function
+    """
+
+    def __init__(self, func, args, callback=None, error_callback=None):
+        self.func = func
+        self.args = args
+        self.callback = callback
+        self.error_callback = error_callback
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.value = None
+        self.error = None
+
+    def finish(self, value=None, error=None):
+        """Set result of task and call callback. Only the first call has an effect.
+
+        :return: True if this call finished the task
+        :rtype: boolean
+        """
+        with self.lock:
+            if self.event.is_set():
+                # duplicate result (task was re-queued)
+                return False
+            self.value = value
+            self.error = error
+            # callbacks are done before the task is ready, like in multiprocessing
+            if error is None:
+                if self.callback is not None:
+                    self.callback(value)
+            elif self.error_callback is not None:
+                self.error_callback(error)
+            self.event.set()
+            return True
+
+    def ready(self):
+        return self.event.is_set()
+
+    def wait(self, timeout=None):
+        self.event.wait(timeout)
+
+    def get(self, timeout=None):
+        """Wait for the result
+
+        :return: return value of the function
+        :raises: the error of the task, *TimeoutError* if not ready within *timeout*
+        """
+        if not self.event.wait(timeout):
+            raise TimeoutError
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def generate_authkey():
+    """Random key for a broker
+
+    :return: 32 hexadecimal digits
+    :rtype: bytes
+    """
+    return os.urandom(16).hex().encode()
+
+
+class Broker:
+    """Task queue that remote workers connect to, with the interface of a multiprocessing pool
+
+    :param address: (host, port) to listen on. Port 0 picks a free port.
+        Defaults to ('localhost', 0)
+    :type address: tuple, optional
+    :param authkey: shared key for authentication of the workers.
+        Defaults to None (random key, see *authkey* attribute)
+    :type authkey: bytes, optional
+    :param initializer: function each worker calls once after connecting. Defaults to None
+    :type initializer: function, optional
+    :param initargs: arguments of the initializer
+    :type initargs: tuple, optional
+    :param heartbeat_timeout: seconds without message from a busy worker
+        until it is considered lost. Defaults to 60
+    :type heartbeat_timeout: number, optional
+    :var address: address the broker listens on
+    :type address: tuple
+    :var authkey: key the workers need to connect
+    :type authkey: bytes
+    :var n_workers: number of connected workers
+    :type n_workers: int
+    :var n_requeued: number of tasks that were given to another worker
+    :type n_requeued: int
+    """
+
+    def __init__(self, address=('localhost', 0), authkey=None,
+                 initializer=None, initargs=(), heartbeat_timeout=60):
+        if authkey is None:
+            # printable, so it can be passed to the workers on the command line
+            authkey = generate_authkey()
+        self.authkey = authkey
+        self.initializer = initializer
+        self.initargs = initargs
+        self.heartbeat_timeout = heartbeat_timeout
+        self.tasks = queue.Queue()
+        self.closed = threading.Event()
+        # cleared right before the listener is closed
+        self.listening = threading.Event()
+        self.listening.set()
+        self.lock = threading.Lock()
+        self.n_workers = 0
+        self.n_requeued = 0
+        self.handlers = []
+        self.listener = Listener(tuple(address), authkey=self.authkey)
+        self.address = self.listener.address
+        self.accept_thread = threading.Thread(target=self.accept_workers, daemon=True)
+        self.accept_thread.start()
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        """Submit a task
+
+        :return: task handle
+        :rtype: :class:`Task`
+        """
+        task = Task(func, args, callback, error_callback)
+        self.tasks.put(task)
+        return task
+
+    def accept_workers(self):
+        """Accept connections of new workers until the broker is closed (thread)"""
+        while True:
+            try:
+                connection = self.listener.accept()
+            except Exception:
+                # failed authentication or listener closed
+                if not self.listening.is_set():
+                    break
+                # keep accepting: close() waits for its connection to be accepted
+                continue
+            if self.closed.is_set():
+                connection.close()
+                break
+            handler = threading.Thread(target=self.serve_worker, args=(connection,), daemon=True)
+            self.handlers.append(handler)
+            handler.start()
+
+    def serve_worker(self, connection):
+        """Send tasks to one worker and collect the results (thread)"""
+        with self.lock:
+            self.n_workers += 1
+        task = None
+        try:
+            connection.send(('init', self.initializer, self.initargs))
+            while True:
+                try:
+                    task = self.tasks.get(timeout=0.1)
+                except queue.Empty:
+                    if self.closed.is_set():
+                        break
+                    continue
+                if task.ready():
+                    # finished by another worker meanwhile
+                    task = None
+                    continue
+                connection.send(('task', task.func, task.args))
+                while True:
+                    if not connection.poll(self.heartbeat_timeout):
+                        raise TimeoutError('no heartbeat')
+                    message = connection.recv()
+                    if message[0] == 'result':
+                        task.finish(value=message[1])
+                        break
+                    if message[0] == 'error':
+                        task.finish(error=RemoteError(message[1]))
+                        break
+                    # heartbeat: worker still busy
+                task = None
+            connection.send(('stop',))
+        except (EOFError, OSError, TimeoutError) as e:
+            # worker lost: give task to another worker
+            if task is not None and not task.ready():
+                print('Worker lost ({}), task re-queued'.format(str(e) or type(e).__name__))
+                with self.lock:
+                    self.n_requeued += 1
+                self.tasks.put(task)
+        finally:
+            connection.close()
+            with self.lock:
+                self.n_workers -= 1
+
+    def close(self):
+        """Stop accepting tasks. Workers are stopped when they ask for the next task."""
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        try:
+            # wake up accept thread
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self.listening.clear()
+        self.listener.close()
+
+    def join(self):
+        """Wait until all workers are stopped"""
+        self.accept_thread.join()
+        for handler in self.handlers:
+            handler.join()
+
+    def terminate(self):
+        self.close()
+
+
+def serve(connection, heartbeat_interval=5):
+    """Worker loop: evaluate tasks of the broker until it sends stop
+
+    :param connection: connection to the broker
+    :type connection: `multiprocessing.connection.Connection`
+    :param heartbeat_interval: seconds between heartbeats while a task is computed
+    :type heartbeat_interval: number
+    """
+    while True:
+        message = connection.recv()
+        if message[0] == 'stop':
+            return
+        if message[0] == 'init':
+            _, initializer, initargs = message
+            if initializer is not None:
+                initializer(*initargs)
+            continue
+        _, func, args = message
+        outcome = {}
+
+        def compute():
+            try:
+                outcome['result'] = ('result', func(*args))
+            except BaseException as e:
+                # also e.g. SystemExit of the task: report it and keep the worker running
+                outcome['result'] = ('error', '{}: {}'.format(type(e).__name__, e))
+
+        thread = threading.Thread(target=compute, daemon=True)
+        thread.start()
+        while True:
+            thread.join(heartbeat_interval)
+            if not thread.is_alive():
+                break
+            connection.send(('heartbeat',))
+        connection.send(outcome['result'])
+
+
+def run_worker(address, authkey, heartbeat_interval=5, retry=True):
+    """Connect to a broker and evaluate its tasks until it is closed
+
+    :param address: (host, port) of the broker
+    :type address: tuple
+    :param authkey: shared key of the broker
+    :type authkey: bytes
+    :param heartbeat_interval: seconds between heartbeats. Defaults to 5
+    :type heartbeat_interval: number, optional
+    :param retry: keep trying to connect until the broker is reachable. Defaults to True
+    :type retry: boolean, optional
+    """
+    while True:
+        try:
+            connection = Client(tuple(address), authkey=authkey)
+            break
+        except OSError:
+            if not retry:
+                raise
+            time.sleep(1)
+    try:
+        serve(connection, heartbeat_interval)
+    except (EOFError, OSError):
+        # broker gone
+        pass
+    finally:
+        connection.close()
+
+
+def start_local_workers(address, n_workers, authkey, heartbeat_interval=5):
+    """Start worker processes on this machine
+
+    :param address: (host, port) of the broker
+    :type address: tuple
+    :param n_workers: number of worker processes
+    :type n_workers: int
+    :param authkey: shared key of the broker
+    :type authkey: bytes
+    :param heartbeat_interval: seconds between heartbeats. Defaults to 5
+    :type heartbeat_interval: number, optional
+    :return: started processes
+    :rtype: list of `multiprocessing.Process`
+    """
+    workers = [mp.Process(target=run_worker, args=(address, authkey, heartbeat_interval))
+               for _ in range(n_workers)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Start workers for a distributed optimization')
+    parser.add_argument('--address', required=True, help='HOST:PORT of the broker')
+    parser.add_argument('--authkey', required=True,
+                        help='key of the broker (printed by the optimization)')
+    parser.add_argument('--processes', type=int, default=mp.cpu_count())
+    parser.add_argument('--heartbeat', type=float, default=5, help='seconds between heartbeats')
+    args = parser.parse_args()
+    host, port = args.address.rsplit(':', 1)
+    workers = start_local_workers(
+        (host, int(port)), args.processes, args.authkey.encode(), args.heartbeat)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Persistent archive of fitness evaluations for the genetic algorithm.
+
+*****
+Scope
+*****
+Each fitness evaluation of the optimization is a complete smooth run.
+The archive saves the results of all evaluations in a SQLite database file,
+so repeated or interrupted optimizations of the same model can reuse them
+instead of simulating the same configurations again.
+
+*******
+Concept
+*******
+Every evaluation is saved with a key made of two parts:
+
+* a hash of everything that influences the result besides the genes: the model,
+  the varied attributes, the source code of the objective functions
+  and the *ignore_zero* flag. The source code (not the compiled functions)
+  does not depend on the location of the file, so the archive stays valid
+  when other code in the same file is changed or the code is run from another checkout
+* the gene values, quantized to a number of significant digits
+
+For each key, the fitness (None if the evaluation failed)
+and optional key performance indicators (KPIs) are stored.
+The optimization looks up each new individual in the archive before it is simulated
+and writes each result to the archive as soon as it arrives.
+"""
+
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+
+from smooth.framework.functions.result_file import json_value
+
+
+def model_hash(*args):
+    """Hash of all arguments, which must be JSON serializable (numpy values are converted).
+
+    :return: hexadecimal SHA-256 hash
+    :rtype: string
+    :raises: `TypeError` for any other value, e.g. the simulation parameter object
+        of a model that has already been simulated. Its string would contain
+        a memory address, so the hash would never match again
+    """
+    data = json.dumps(args, sort_keys=True, default=json_value)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def function_source(function):
+    """Source code of a function to identify it in :func:`model_hash`.
+
+    :param function: function, e.g. an objective
+    :type function: function
+    :return: source code, the name of the function if the source is not available
+    :rtype: string
+    """
+    try:
+        return inspect.getsource(function).strip()
+    except (OSError, TypeError):
+        return getattr(function, '__qualname__', type(function).__name__)
+
+
+def quantize_genes(genes, digits=12):
+    """Convert gene values to a string, rounded to significant digits.
+
+    :param genes: gene values
+    :type genes: iterable of numbers
+    :param digits: number of significant digits
+    :type digits: int
+    :return: quantized gene values
+    :rtype: string
+    """
+    return ','.join('{:.{}g}'.format(float(gene), digits) for gene in genes)
+
+
+class FitnessArchive:
+    """On-disk archive of fitness evaluations
+
+    :param path: path of the SQLite database file. Created if it does not exist
+    :type path: string
+    :param key: hash identifying the optimization problem, see :func:`model_hash`
+    :type key: string
+    :param digits: significant digits of gene values. Defaults to 12
+    :type digits: int, optional
+    :var hits: number of successful lookups
+    :type hits: int
+    """
+
+    def __init__(self, path, key, digits=12):
+        self.path = path
+        self.key = key
+        self.digits = digits
+        self.hits = 0
+        # results may be written from the result thread of the worker pool
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS evaluations ('
+                'model_hash TEXT NOT NULL, '
+                'genes TEXT NOT NULL, '
+                'fitness TEXT, '
+                'kpis TEXT, '
+                'created REAL, '
+                'PRIMARY KEY (model_hash, genes))')
+
+    def get(self, genes):
+        """Look up evaluation of genes
+
+        :param genes: gene values
+        :type genes: iterable of numbers
+        :return: None if unknown, otherwise fitness (None if evaluation failed) and KPIs
+        :rtype: None or tuple(tuple, dict)
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT fitness, kpis FROM evaluations WHERE model_hash = ? AND genes = ?',
+                (self.key, quantize_genes(genes, self.digits))).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        fitness = None if row[0] is None else tuple(json.loads(row[0]))
+        kpis = None if row[1] is None else json.loads(row[1])
+        return fitness, kpis
+
+    def put(self, genes, fitness, kpis=None):
+        """Save evaluation of genes. Replaces previous evaluation of the same genes.
+
+        :param genes: gene values
+        :type genes: iterable of numbers
+        :param fitness: fitness values, None if evaluation failed
+        :type fitness: tuple or None
+        :param kpis: key performance indicators
+        :type kpis: dict, optional
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?)',
+                (self.key, quantize_genes(genes, self.digits),
+                 None if fitness is None else json.dumps(list(fitness)),
+                 None if kpis is None else json.dumps(kpis, default=str),
+                 time.time()))
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM evaluations WHERE model_hash = ?',
+                (self.key,)).fetchone()[0]
+
+    def close(self):
+        """Close database connection
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,160 @@
+"""Non-dominated sorting and crowding distance for any number of objectives.
+
+*****
+Scope
+*****
+The selection of the genetic algorithm (NSGA-II) sorts all individuals into fronts of
+non-dominated solutions and prefers individuals with a high crowding distance within a front.
+The functions in this module work on a fitness matrix with one row per individual and
+one column per objective (all objectives are maximized) and use NumPy for all comparisons,
+so they are fast even for large populations.
+
+*******
+Concept
+*******
+Non-dominated sorting uses the efficient non-dominated sort with binary search
+(ENS-BS, `Zhang et al. 2015 <https://doi.org/10.1109/TEVC.2014.2308305>`_):
+the individuals are sorted lexicographically in descending order, so no individual
+can be dominated by an individual that comes after it. Each individual is then
+assigned to the first front that has no member dominating it. This front is found
+by binary search, and each check of a front is a single vectorized comparison.
+
+The crowding distance of an individual is the sum over all objectives of the normalized
+distance between its two neighbours. Border individuals of each objective get a
+distance of 1e100. Objectives where all individuals have the same value are ignored.
+"""
+
+import numpy as np
+
+# crowding distance of individuals on the border of a front
+BORDER_DISTANCE = 1e100
+
+
+class _Front:
+    """Growable fitness buffer of the members of one front"""
+
+    def __init__(self, n_objectives):
+        self.fitness = np.empty((8, n_objectives))
+        self.indices = []
+
+    def add(self, index, fitness):
+        size = len(self.indices)
+        if size == len(self.fitness):
+            self.fitness = np.concatenate((self.fitness, np.empty_like(self.fitness)))
+        self.fitness[size] = fitness
+        self.indices.append(index)
+
+    def dominates(self, fitness):
+        """Is fitness dominated by any member of this front?"""
+        members = self.fitness[:len(self.indices)]
+        return bool(np.any(
+            np.all(members >= fitness, axis=1) & np.any(members > fitness, axis=1)))
+
+
+def dominates(fitness1, fitness2):
+    """Check if fitness1 dominates fitness2 (maximization)
+
+    :param fitness1: fitness values
+    :type fitness1: iterable of numbers
+    :param fitness2: fitness values to compare against, same length as fitness1
+    :type fitness2: iterable of numbers
+    :return: True if all values are greater or equal and at least one is greater
+    :rtype: boolean
+    """
+    fitness1 = np.asarray(fitness1)
+    fitness2 = np.asarray(fitness2)
+    return bool(np.all(fitness1 >= fitness2) and np.any(fitness1 > fitness2))
+
+
+def non_dominated_fronts(fitness):
+    """Sort individuals into fronts of non-dominated individuals (maximization).
+
+    :param fitness: fitness matrix (individuals x objectives)
+    :type fitness: array-like
+    :return: indices of the individuals of each front, best front first.
+        Indices within a front are sorted in ascending order
+    :rtype: list of numpy arrays
+    """
+    fitness = np.asarray(fitness, dtype=float)
+    if fitness.size == 0:
+        return []
+    if fitness.ndim == 1:
+        fitness = fitness.reshape(-1, 1)
+
+    # lexicographical order, best first: later individuals can't dominate earlier ones
+    order = np.lexsort(fitness.T[::-1])[::-1]
+
+    fronts = []
+    for index in order:
+        this_fitness = fitness[index]
+        # binary search for first front without a member dominating this individual
+        low, high = 0, len(fronts)
+        while low < high:
+            mid = (low + high) // 2
+            if fronts[mid].dominates(this_fitness):
+                low = mid + 1
+            else:
+                high = mid
+        if low == len(fronts):
+            fronts.append(_Front(fitness.shape[1]))
+        fronts[low].add(index, this_fitness)
+
+    return [np.sort(np.array(front.indices, dtype=int)) for front in fronts]
+
+
+def crowding_distance(fitness):
+    """Crowding distance of each individual within one front
+
+    :param fitness: fitness matrix of the front (individuals x objectives)
+    :type fitness: array-like
+    :return: crowding distance of each individual
+    :rtype: numpy array
+    """
+    fitness = np.asarray(fitness, dtype=float)
+    if fitness.ndim == 1:
+        fitness = fitness.reshape(-1, 1)
+    n = fitness.shape[0]
+    distance = np.zeros(n)
+    if n < 3:
+        distance[:] = BORDER_DISTANCE
+        return distance
+
+    order = np.argsort(fitness, axis=0, kind='stable')
+    sorted_fitness = np.take_along_axis(fitness, order, axis=0)
+    value_range = sorted_fitness[-1] - sorted_fitness[0]
+    # ignore objectives without spread
+    valid = value_range > 0
+    if not np.any(valid):
+        distance[:] = BORDER_DISTANCE
+        return distance
+
+    # normalized distance between neighbours for each objective
+    gaps = (sorted_fitness[2:, valid] - sorted_fitness[:-2, valid]) / value_range[valid]
+    np.add.at(distance, order[1:-1, valid], gaps)
+    distance[order[0, valid]] = BORDER_DISTANCE
+    distance[order[-1, valid]] = BORDER_DISTANCE
+    return distance
+
+
+def select_by_rank_and_crowding(fitness, n):
+    """NSGA-II selection: take individuals front by front,
+    within a front prefer individuals with high crowding distance.
+
+    :param fitness: fitness matrix (individuals x objectives)
+    :type fitness: array-like
+    :param n: maximum number of selected individuals
+    :type n: int
+    :return: indices of selected individuals and all fronts (see :func:`non_dominated_fronts`)
+    :rtype: tuple(list of int, list of numpy arrays)
+    """
+    fitness = np.asarray(fitness, dtype=float)
+    fronts = non_dominated_fronts(fitness)
+    selected = []
+    for front in fronts:
+        if len(selected) >= n:
+            break
+        distance = crowding_distance(fitness[front])
+        # most isolated individuals first
+        front_order = front[np.argsort(-distance, kind='stable')]
+        selected += front_order[:n - len(selected)].tolist()
+    return selected, fronts
@@ -0,0 +1,132 @@
+"""Run a function with a wall clock and memory limit.
+
+*****
+Scope
+*****
+A single evaluation of the optimization may make the solver run for hours
+or use up all memory. To protect the worker processes of the optimization,
+an evaluation can be run in a separate process with limited resources.
+If the limit is exceeded, the process and all its children (e.g. the solver) are killed.
+The worker itself continues with the next evaluation.
+
+*******
+Concept
+*******
+The worker forks a child process, which becomes the leader of a new process group.
+The memory limit is set as the maximum address space of the child and is inherited
+by the solver processes it starts. The worker waits for the pickled result of the child
+on a pipe. When the time limit is reached, the whole process group is killed.
+
+Limits need `os.fork` and the `resource` module, which are only available on Unix.
+On other platforms, the function is called directly without limits.
+"""
+
+import os
+import pickle
+import select
+import signal
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# limits can be enforced on this platform
+LIMITS_SUPPORTED = hasattr(os, 'fork') and resource is not None
+
+
+def run_with_limits(func, args=(), timeout=None, memory_limit=None):
+    """Call func(\\*args) in a child process with limited resources.
+
+    :param func: function to call
+    :type func: function
+    :param args: arguments of the function
+    :type args: tuple
+    :param timeout: maximum wall clock time in seconds. Defaults to None (no limit)
+    :type timeout: number, optional
+    :param memory_limit: maximum memory (address space) in MB. Defaults to None (no limit)
+    :type memory_limit: number, optional
+    :return: status and return value of the function. Status is 'ok',
+        'timeout' (killed after *timeout*), 'memory' (*MemoryError* or killed
+        without result while *memory_limit* is set) or 'error' (any other exception,
+        the value is the error message)
+    :rtype: tuple(string, object)
+    """
+    if not LIMITS_SUPPORTED or (timeout is None and memory_limit is None):
+        try:
+            return 'ok', func(*args)
+        except MemoryError:
+            return 'memory', None
+        except Exception as e:
+            return 'error', str(e)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # child: own process group, so the solver is killed with it
+        os.close(read_fd)
+        status = 1
+        try:
+            os.setpgid(0, 0)
+            if memory_limit is not None:
+                limit = int(memory_limit * 1024 * 1024)
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            try:
+                result = ('ok', func(*args))
+            except MemoryError:
+                result = ('memory', None)
+            except Exception as e:
+                result = ('error', str(e))
+            data = pickle.dumps(result)
+            with os.fdopen(write_fd, 'wb') as pipe:
+                pipe.write(data)
+            status = 0
+        finally:
+            # never return into the caller's code
+            os._exit(status)
+
+    # parent: collect result until timeout
+    os.close(write_fd)
+    try:
+        # also set process group here, in case the child has not done it yet
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+    deadline = None if timeout is None else time.monotonic() + timeout
+    chunks = []
+    timed_out = False
+    with os.fdopen(read_fd, 'rb') as pipe:
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                break
+            readable, _, _ = select.select([pipe], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(pipe.fileno(), 1 << 16)
+            if not chunk:
+                # child finished writing
+                break
+            chunks.append(chunk)
+
+    if timed_out:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                # child already gone
+                pass
+    os.waitpid(pid, 0)
+    if timed_out:
+        return 'timeout', None
+    if not chunks:
+        # child died without result
+        if memory_limit is not None:
+            return 'memory', None
+        return 'error', 'evaluation process died'
+    return pickle.loads(b''.join(chunks))
@@ -0,0 +1,136 @@
+"""Compact storage of the simulation results of evaluated individuals.
+
+*****
+Scope
+*****
+With `SAVE_ALL_SMOOTH_RESULTS`, each individual of the optimization keeps the
+components returned by :func:`~smooth.framework.run_smooth.run_smooth`.
+These objects contain the simulation parameters, the input data of the components
+and all flows as Python lists. They are pickled from the worker to the main process
+and into the result file, so memory and file size grow with every evaluation.
+If a *result_dir* is given, the workers write the results to this directory instead
+and the individuals only keep a small handle (:class:`StoredResult`)
+that loads the results on demand.
+
+*******
+Concept
+*******
+The results of each individual are written to one compressed NumPy file (*.npz*),
+named by a hash of its attribute values. Each flow, state and time series result
+of each component is saved as an array of the chosen *dtype* (float64 or float32).
+Scalar results of the components and the KPIs of the individual are saved as a table
+(JSON string) together with the names of all arrays.
+
+Loading a result returns :class:`~smooth.framework.functions.result_file.StoredComponent`
+objects with the same *name*, *component*, *flows*, *states*, *results*
+and parameter attributes as the components, so objectives and evaluation scripts
+work the same way on stored results. The table has the same layout as the manifest of
+a result file (see :mod:`~smooth.framework.functions.result_file`).
+Names of flows are tuples of strings (labels of the oemof nodes).
+Missing values (e.g. of an aborted simulation) are stored as NaN.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# StoredComponent was defined here before, keep importable
+from smooth.framework.functions.result_file import (  # noqa: F401
+    StoredComponent, component_columns, load_component)
+
+
+def result_file_name(values):
+    """File name of the results of an individual
+
+    :param values: attribute values of the individual
+    :type values: list
+    :return: file name, unique for the attribute values
+    :rtype: string
+    """
+    digest = hashlib.sha1(str(list(values)).encode()).hexdigest()
+    return 'result_{}.npz'.format(digest[:20])
+
+
+class StoredResult:
+    """Handle of the results of an individual, as written by :func:`store_result`.
+    Only the file name is kept (and pickled), the results are loaded when accessed.
+
+    :param file_name: path of the result file
+    :type file_name: string
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+    def __repr__(self):
+        return 'StoredResult({!r})'.format(self.file_name)
+
+    def index(self):
+        """Load the table of the result file (without arrays)
+
+        :return: components with names of their arrays and scalar results, KPIs
+        :rtype: dict
+        """
+        with np.load(self.file_name, allow_pickle=False) as data:
+            return json.loads(str(data['index']))
+
+    @property
+    def kpis(self):
+        """KPIs of the individual, if computed"""
+        return self.index()['kpis']
+
+    def load(self):
+        """Load the results of all components
+
+        :return: results of each component
+        :rtype: list of :class:`~smooth.framework.functions.result_file.StoredComponent`
+        """
+        with np.load(self.file_name, allow_pickle=False) as data:
+            index = json.loads(str(data['index']))
+            return [load_component(entry, data.__getitem__) for entry in index['components']]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.index()['components'])
+
+    def __getitem__(self, idx):
+        return self.load()[idx]
+
+
+def store_result(directory, values, components, kpis=None, dtype='float64'):
+    """Write the results of an individual to a compressed result file
+
+    :param directory: directory of the result files
+    :type directory: string
+    :param values: attribute values of the individual (determine the file name)
+    :type values: list
+    :param components: components returned by `run_smooth`
+    :type components: list
+    :param kpis: key performance indicators of the individual. Defaults to None
+    :type kpis: dict, optional
+    :param dtype: data type of the arrays, e.g. 'float32'. Defaults to 'float64'
+    :type dtype: string, optional
+    :return: handle of the result
+    :rtype: :class:`StoredResult`
+    """
+    arrays = {}
+    index = {'components': [], 'kpis': kpis}
+
+    def add_array(series):
+        key = 'a{}'.format(len(arrays))
+        arrays[key] = np.array([np.nan if v is None else v for v in series], dtype=dtype)
+        return key
+
+    for component in components:
+        index['components'].append(component_columns(component, add_array))
+
+    file_name = os.path.join(directory, result_file_name(values))
+    # write to temporary file first: no broken file if worker is killed
+    tmp_file_name = file_name + '.tmp.npz'
+    np.savez_compressed(tmp_file_name, index=np.array(json.dumps(index, default=float)), **arrays)
+    os.replace(tmp_file_name, file_name)
+    return StoredResult(file_name)
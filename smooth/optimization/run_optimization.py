@@ -7,7 +7,7 @@ How to use
 **********
 To use, call run_optimization with a configuration dictionary and your smooth model.
 You will receive a list of :class:`Individual` in return. These individuals are
-pareto-optimal in regard to the given objective functions (limited to two functions).
+pareto-optimal in regard to the given objective functions (two or more functions).
 
 An example configuration can be seen in run_optimization_example in the
 `examples directory <https://github.com/rl-institut/smooth/tree/dev/smooth/examples>`_.
@@ -40,6 +40,11 @@ member of each individual contains the value returned by run_smooth.
     Using SAVE_ALL_SMOOTH_RESULTS and writing the result
     to a file will generally lead to a large file size.
 
+If a *result_dir* is given as well, the workers write the results of each individual
+to a compact file in this directory. The `smooth_result` member then only holds a
+:class:`~smooth.optimization.result_store.StoredResult`, which loads the flows,
+states and results of the components when accessed.
+
 **************
 Implementation
 **************
@@ -68,17 +73,41 @@ Selection
 We compute the fitness of all individuals in parallel.
 You must set `n_core` to specify how many threads should be active at the same time.
 This can be either a number or 'max' to use all virtual cores on your machine.
+The worker processes are started once at the beginning of the optimization and reused
+for all generations and the post-processing. On start, each worker receives the model,
+attribute variations and objective functions and imports oemof and the component classes
+of the model, so this is not repeated for every generation. For each evaluation,
+only the index and gene values of the individual are sent to a worker.
 The fitness evaluation follows these steps:
 
-#. change your smooth model according to the individual's component attribute values
+#. copy the component parameters of the worker's model and change them \
+according to the individual's component attribute values
 #. run smooth
 #. on success, compute the objective functions using the smooth result. \
 These are the fitness values. On failure, print the error
 #. update the master individual on the main thread with the fitness values
 #. update the reference in the dictionary containing all evaluated individuals
 
+With *evaluator* set to 'distributed', the evaluations are not computed by local
+worker processes, but by workers on any number of machines that connect to the
+optimization over the network (see :mod:`~smooth.optimization.distributed`).
+Tasks of lost workers are given to other workers. Each individual is only updated once,
+so a late duplicate result is ignored.
+The broker only listens on *localhost* unless *broker_address* is changed,
+and uses a random key (printed at start) unless *broker_authkey* is given.
+
+If an *archive_file* is given, all evaluations are saved in this file
+(see :mod:`~smooth.optimization.fitness_archive`). Individuals that are found
+in the archive are not simulated again, which allows to continue interrupted
+or repeated optimizations of the same model without losing work.
+Evaluations are only reused for the same model, varied attributes
+and source code of the objective functions. The model must only contain
+JSON values, not the objects of a model that has already been simulated.
+Optionally, additional *kpis* of each evaluation can be saved in the archive.
+
 After all individuals in the current generation have been evaluated,
-they are sorted into tiers by NSGA-II fast non-dominated sorting algorithm.
+they are sorted into tiers of non-dominated individuals
+(see :mod:`~smooth.optimization.non_dominated_sorting`).
 Only individuals on the pareto front are retained,
 depending on their distance to their neighbors.
 The parent individuals stay in the population, so they can appear in the pareto front again.
@@ -110,6 +139,133 @@ In case no individuals have a valid smooth result, an entirely new population is
 No plot will be shown.
 If only one individual is valid, the population is filled up with random individuals.
 
+Surrogate pre-screening
+-----------------------
+With *surrogate* set to True, a surrogate model
+(see :mod:`~smooth.optimization.surrogate`) is trained on all valid evaluations
+at the beginning of each generation. Crossover and mutation then generate
+`surrogate_candidates` times more children than needed. The surrogate predicts
+their fitness and only `population_size` of them are simulated:
+most are chosen by the rank and crowding distance of their predicted fitness,
+the rest (*surrogate_exploration*) are the candidates with the most uncertain prediction.
+The surrogate is only used when there are at least *surrogate_min_samples* valid evaluations.
+
+Multi-fidelity screening
+------------------------
+Instead of simulating all children over the full horizon, they can be screened
+with cheaper simulations first. Each entry of *fidelity* is a level with changed
+simulation parameters, ordered from cheapest to most expensive, e.g.::
+
+    'fidelity': [
+        {'sim_params': {'n_intervals': 24*7}},
+        {'sim_params': {'n_intervals': 24*7*4}, 'promote': 0.5},
+    ]
+
+All children of a generation are simulated at the first level.
+Only children that are non-dominated among them (or the best share given by *promote*,
+chosen by rank and crowding distance) go on to the next level.
+The children promoted by the last level are simulated with the full model.
+Variable costs and emissions are scaled to one year by the simulation time
+(see :func:`~smooth.framework.functions.update_annuities.update_annuities`),
+so the objectives of a shorter horizon are comparable.
+Screening simulations only compute the fitness: their KPIs and smooth results
+are neither computed nor saved (e.g. in *result_dir*).
+Rejected children are not simulated again. A coarser *interval_time*
+is only meaningful if all time series of the model match it.
+
+Early abort
+-----------
+Fixed costs and emissions are known before a simulation starts and variable costs
+and emissions only grow with every interval (as long as they are not negative).
+With *early_abort* set to a number of intervals, each evaluation checks
+this often during its simulation whether its provisional fitness (see
+:func:`~smooth.framework.simulation_hooks.provisional_results`)
+is already dominated by the pareto front of the previous generation.
+If so, the simulation is stopped and the individual is treated like a failed evaluation.
+As this depends on the front at that time, aborted individuals are not saved in the archive.
+This requires objectives that only get worse with growing costs and emissions,
+like the default objectives.
+
+Reuse of the dispatch
+---------------------
+Some attributes (e.g. *life_time* or *capex*) do not change the simulated dispatch,
+only the costs and emissions computed after the simulation.
+With *reuse_dispatch* set, each worker saves the components of its last
+*dispatch_cache_size* simulations. An individual that differs from one of them
+only in these cost-only attributes is not simulated again: only *generate_results*
+is called with its attribute values (see :mod:`~smooth.optimization.dispatch_cache`).
+Which attributes are cost-only can be set with *dispatch_invariant*
+of each attribute variation. Evaluations with resource limits (see below)
+can use saved simulations, but do not save their own.
+
+Batch evaluation
+----------------
+For small models, building the oemof model and starting the solver take most of the time
+of each interval. With *batch_size* set (experimental), :meth:`Optimization.compute_fitness`
+sends the individuals to the workers in batches of up to *batch_size* individuals.
+The models of a batch are stacked into one model with independent blocks,
+so each interval is solved in a single solver call
+(see :mod:`~smooth.optimization.batch_evaluation`). If the stacked simulation fails,
+the individuals of the batch are evaluated one by one. Early abort, resource limits
+and the reuse of the dispatch only apply to individual evaluations.
+The flow names of batched components are tuples of label strings instead of oemof nodes,
+so objectives and KPIs should look up flows by labels.
+
+Resource limits
+---------------
+A single evaluation may make the solver run for a very long time or use up all memory.
+With *evaluation_timeout* (seconds) or *evaluation_memory_limit* (MB) set,
+each evaluation runs in a separate process of the worker, which is killed
+together with its solver when a limit is exceeded
+(see :func:`~smooth.optimization.resource_limits.run_with_limits`).
+The individual is treated like a failed evaluation. The reason of each failed evaluation
+('error', 'aborted', 'timeout' or 'memory') is stored as *failure* of the individual
+and counted in the statistics of each generation. Individuals that exceeded a limit
+or were aborted early (see *early_abort*) are not written to the archive
+and are forgotten when resuming from a checkpoint, so they are evaluated again
+in a later run.
+
+Asynchronous evolution
+----------------------
+Simulations of different individuals can take very different times.
+As each generation waits for its slowest evaluation, many cores may idle.
+With *asynchronous* set to True, there are no generations.
+Instead, `n_core` evaluations are kept running all the time.
+Whenever an evaluation finishes, the individual is merged into the population,
+which is then reduced to `population_size` individuals by the same selection as above.
+A new child of the current population is submitted immediately.
+The total number of evaluations stays `n_generation` * `population_size`.
+Progress is recorded after every evaluation (`evaluation_stats`).
+Every `population_size` evaluations, the current front is printed and plotted
+and a checkpoint is written. The order of the results depends on the run times
+of the simulations, so asynchronous runs are not reproducible.
+
+Island model
+------------
+With many cores, the generation barrier gets expensive: all cores wait for the slowest
+evaluation of the whole population. With *n_islands* greater than one, the population
+is split into islands. Each island gets its share of `n_core` (its own worker processes)
+and of `population_size` and evolves on its own, without waiting for the other islands.
+Every *migration_interval* generations, the islands are synchronised:
+each island sends copies of its best *n_migrants* individuals
+(by rank and crowding distance) to the next island in a ring.
+The pareto front of all islands is then printed, plotted and saved in a checkpoint.
+All islands share the dictionary of evaluated individuals (and the archive),
+so no configuration is simulated twice, even on different islands.
+With the distributed evaluator, all islands share the broker.
+As the islands run at the same time, island runs are not reproducible.
+
+Checkpoints
+-----------
+If a *checkpoint_file* is given, the complete state of the optimization is written
+to this file after each generation and after each attribute of the gradient ascent:
+the population, all evaluated individuals, the current pareto front,
+the generation counter, the progress of the gradient ascent and the state of the
+random number generator. The file is replaced each time (written atomically).
+To continue an optimization that was stopped, give this file as *resume_from*.
+The optimization then continues at the saved state and produces the same
+sequence of individuals as the original run would have.
+
 Gradient ascent
 ---------------
 The solutions of the GA are pareto-optimal, but may not be at a local optimum.
@@ -138,6 +294,20 @@ to better utilize all cores and speed up the gradient ascent.
 After all solutions have found their optimum for this attribute,
 the next attribute is varied.
 
+Pattern search
+--------------
+The gradient ascent varies one attribute after the other and waits for all solutions
+after each step, so only few cores are busy for most of the time.
+With *post_processing* set to 'pattern_search', a parallel pattern search is run instead.
+In each iteration, all neighbours of all solutions that can still improve are evaluated at once:
+one *val_step* up and down for each attribute, and two combined directions:
+the last move repeated and the combination of all single steps
+that improved the solution in the last iteration.
+Neighbours that were already evaluated (by the GA or for another solution) are not simulated again.
+Each solution moves to a neighbour that dominates it
+(preferring the combined directions) and stops when no neighbour dominates it.
+Unlike the gradient ascent, this does not assume independent attributes.
+
 Plotting
 --------
 To visualize the current progress,
@@ -153,10 +323,15 @@ The process is started right at the end of the initialisation.
 It needs the attribute variations and objective names for hover info and axes labels.
 It also generates a multiprocessing event which checks if the process shall be stopped.
 
+Only compact arrays are sent (see :func:`progress_message`): the fitness and gene values
+of the shown individuals and the statistics of the last generation, never the individuals
+with their smooth results.
 In the main loop of the process, the pipe is checked for any new data.
 This incorporates a timeout to avoid high processor usage.
-If new data is available, the old plot is cleared
-(along with any annotations, labels and titles) and redrawn from scratch.
+If several messages are waiting, only the most recent one is shown.
+New data updates the existing points and title. As long as the axis limits fit,
+only these animated artists are redrawn on top of the saved background (blitting),
+so large fronts are shown without delay.
 In any case, the window listens for a short time for user input events like mouseover.
 Window close is a special event which stops the process,
 but not the computation (as this runs in the separate main process).
@@ -180,15 +355,35 @@ This blocks the process, so no new data is received, but user events are still p
 """
 
 import multiprocessing as mp
-from tkinter import TclError     # plotting window closed
 import random
-import matplotlib.pyplot as plt  # only needed when plot_progress is set
 import os                        # delete old result files
 from datetime import datetime    # get timestamp for filename
 import pickle                    # pickle intermediate results
+import queue                     # collect results of asynchronous evaluations
+import math
+import copy                      # copy model for each evaluation
+import time                      # measure duration of generations
+import threading                 # islands share evaluated individuals
+from concurrent.futures import ThreadPoolExecutor
 import dill                      # dump objective functions
+import numpy as np
 
 from smooth import run_smooth
+from smooth.framework import component_registry
+from smooth.framework.simulation_hooks import AbortHook
+from smooth.framework.exceptions import SimulationAbortedError
+from smooth.optimization.fitness_archive import FitnessArchive, function_source, model_hash
+from smooth.optimization import non_dominated_sorting as nds
+from smooth.optimization.surrogate import RBFSurrogate
+from smooth.optimization.distributed import Broker
+from smooth.optimization.resource_limits import run_with_limits
+from smooth.optimization.result_store import store_result
+from smooth.optimization.dispatch_cache import DispatchCache, SnapshotHook, finish_dispatch
+from smooth.optimization.batch_evaluation import stack_models, split_components
+
+# failures that depend on the machine or the state of the run, not on the configuration:
+# not saved in the archive and evaluated again after resuming from a checkpoint
+RETRY_FAILURES = ('aborted', 'timeout', 'memory')
 
 # import traceback
 # def tb(e):
@@ -208,6 +403,10 @@ class AttributeVariation:
     :type val_max: number
     :param val_step: step size of component attribute
     :type val_step: number, optional
+    :param dispatch_invariant: attribute only changes costs and emissions, not the dispatch
+        (see :mod:`~smooth.optimization.dispatch_cache`). Defaults to None (derived from
+        *comp_attribute*)
+    :type dispatch_invariant: boolean, optional
     :var num_steps: number of steps if *val_step* is set and not zero
     :type num_steps: int
     :raises: AssertionError when any non-optional parameter is missing or *val_step* is negative
@@ -215,6 +414,7 @@ class AttributeVariation:
 
     def __init__(self, iterable=(), **kwargs):
         self.val_step = None
+        self.dispatch_invariant = None
         self.__dict__.update(iterable, **kwargs)
         assert hasattr(self, "comp_name"), "comp_name missing"
         assert hasattr(self, "comp_attribute"), "{}: comp_attribute missing".format(self.comp_name)
@@ -240,6 +440,12 @@ class Individual:
     :var fitness: fitness values depending on objective functions
     :type fitness: tuple
     :var smooth_result: result from `run_smooth`
+        (:class:`~smooth.optimization.result_store.StoredResult` if written to *result_dir*)
+    :var kpis: key performance indicators, if set in :class:`Optimization`
+    :type kpis: dict
+    :var failure: reason of a failed evaluation: 'error', 'aborted' (early abort),
+        'timeout' or 'memory' (resource limits). None if successful or not evaluated
+    :type failure: string
     """
     class IndividualIterator:
         """Class to iterate over gene values.
@@ -261,6 +467,8 @@ class Individual:
     values = None           # list. Take care when copying.
     fitness = None          # tuple
     smooth_result = None    # result of run_smooth
+    kpis = None             # dict
+    failure = None          # string
 
     def __init__(self, values):
         self.values = values
@@ -287,13 +495,12 @@ class Individual:
 
         :param other: individual for comparison
         :type other: :class:`Individual`
-        :return: True if both fitness values are greater or
-            one is greater while the other is equal. False otherwise.
+        :return: True if all fitness values are greater or equal
+            and at least one is greater. False otherwise.
         :rtype: boolean
         """
-        return self.fitness is not None and (other.fitness is None or (
-            (self.fitness[0] >= other.fitness[0] and self.fitness[1] > other.fitness[1]) or
-            (self.fitness[0] > other.fitness[0] and self.fitness[1] >= other.fitness[1])))
+        return self.fitness is not None and (
+            other.fitness is None or nds.dominates(self.fitness, other.fitness))
 
 
 def sort_by_values(n, values):
@@ -310,52 +517,29 @@ def sort_by_values(n, values):
 
 
 def fast_non_dominated_sort(p):
-    """NSGA-II's fast non dominated sort
+    """Non dominated sort of individuals
 
-    :param p: values to sort
-    :type p: iterable
+    Individuals without fitness are dominated by all others and form the last front.
+    See :func:`~smooth.optimization.non_dominated_sorting.non_dominated_fronts`.
+
+    :param p: individuals to sort
+    :type p: list of :class:`Individual`
     :return: indices of values sorted into their domination ranks (only first element used)
     :rtype: list of lists of indices
     """
-    S = [[] for _ in p]  # which values dominate other?
-    front = [[]]         # group values by number of dominations
-    n = [0]*len(p)       # how many values does the value at this position dominate?
-    # rank = [0]*len(p)    # rank within domination tree (unused)
-
-    # compare all elements, see which ones dominate each other
-    for i in range(0, len(p)):
-        for j in range(0, len(p)):
-            if p[i].dominates(p[j]) and j not in S[i]:
-                S[i].append(j)
-            elif p[j].dominates(p[i]):
-                n[i] += 1
-        if n[i] == 0:
-            # element is not dominated: put in front
-            # rank[i] = 0
-            if i not in front[0]:
-                front[0].append(i)
-
-    i = 0
-    while(len(front[i]) > 0):
-        Q = []
-        for p in front[i]:
-            for q in S[p]:
-                n[q] -= 1
-                if n[q] == 0:
-                    # rank[q] = i+1
-                    if q not in Q:
-                        Q.append(q)
-        i = i+1
-        front.append(Q)
-
-    if len(front) > 1:
-        front.pop(len(front) - 1)
-
-    return front
+    valid = [i for i, ind in enumerate(p) if ind.fitness is not None]
+    invalid = [i for i, ind in enumerate(p) if ind.fitness is None]
+    fronts = [[valid[i] for i in front]
+              for front in nds.non_dominated_fronts([p[i].fitness for i in valid])]
+    if invalid or not fronts:
+        fronts.append(invalid)
+    return fronts
 
 
 def CDF(values1, values2, n):
-    """Calculate crowding distance
+    """Calculate crowding distance of two objectives
+
+    See :func:`~smooth.optimization.non_dominated_sorting.crowding_distance`.
 
     :param values1: values in first dimension
     :type values1: iterable
@@ -369,20 +553,9 @@ def CDF(values1, values2, n):
 
     if (n == 0 or len(values1) != n or len(values2) != n or
             max(values1) == min(values1) or max(values2) == min(values2)):
-        return [1e100]*n
-
-    distance = [0]*n
-    sorted1 = sort_by_values(n, values1)
-    sorted2 = sort_by_values(n, values2)
-    distance[0] = 1e100  # border
-    distance[-1] = 1e100
-    for k in range(1, n-1):
-        distance[k] = distance[k] + (values1[sorted1[k+1]] -
-                                     values2[sorted1[k-1]])/(max(values1)-min(values1))
-    for k in range(1, n-1):
-        distance[k] = distance[k] + (values1[sorted2[k+1]] -
-                                     values2[sorted2[k-1]])/(max(values2)-min(values2))
-    return distance
+        return [nds.BORDER_DISTANCE]*n
+
+    return nds.crowding_distance(list(zip(values1, values2))).tolist()
 
 
 def crossover(parent1, parent2):
@@ -442,13 +615,102 @@ def mutate(parent, attribute_variation):
     return child
 
 
+# state of an optimization worker process, set once by init_worker
+worker_state = {}
+
+
+def init_worker(model, attribute_variation, dill_objectives,
+                ignore_zero=False, save_results=False, dill_kpis=None, early_abort=None,
+                timeout=None, memory_limit=None, result_dir=None, result_dtype='float64',
+                reuse_dispatch=False, dispatch_cache_size=16):
+    """Prepare a worker process of the optimization.
+        Save all data that is the same for each evaluation in the worker,
+        so only gene values have to be sent for each evaluation (see :func:`evaluate_genes`).
+        Import oemof and the classes of all components in the model once,
+        so the first fitness evaluation of each generation does not have to.
+
+    :param model: smooth model
+    :type model: dict
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of :class:`AttributeVariation`
+    :param dill_objectives: objective functions
+    :type dill_objectives: tuple of lambda-functions pickled with dill
+    :param ignore_zero: ignore components with an attribute value of zero
+    :type ignore_zero: boolean
+    :param save_results: save smooth result in individual?
+    :type save_results: boolean
+    :param dill_kpis: functions to compute key performance indicators, None to skip
+    :type dill_kpis: dict of lambda-functions pickled with dill
+    :param early_abort: number of intervals between checks if an evaluation
+        is already dominated, None to disable
+    :type early_abort: int
+    :param timeout: maximum time of one evaluation in seconds, None for no limit
+    :type timeout: number
+    :param memory_limit: maximum memory of one evaluation in MB, None for no limit
+    :type memory_limit: number
+    :param result_dir: directory to write saved smooth results to, None to return them
+    :type result_dir: string
+    :param result_dtype: data type of the written flows and states
+    :type result_dtype: string
+    :param reuse_dispatch: reuse simulations for individuals that differ only
+        in cost-only attributes
+    :type reuse_dispatch: boolean
+    :param dispatch_cache_size: maximum number of simulations saved for reuse
+    :type dispatch_cache_size: int
+    """
+    worker_state.update({
+        'model': model,
+        'attribute_variation': attribute_variation,
+        'dill_objectives': dill_objectives,
+        'ignore_zero': ignore_zero,
+        'save_results': save_results,
+        'dill_kpis': dill_kpis,
+        'early_abort': early_abort,
+        'timeout': timeout,
+        'memory_limit': memory_limit,
+        'result_dir': result_dir,
+        'result_dtype': result_dtype,
+        'dispatch_cache': DispatchCache(attribute_variation, ignore_zero, dispatch_cache_size)
+        if reuse_dispatch else None,
+    })
+    try:
+        import smooth.framework.run_smooth  # noqa: F401
+        for component in model['components'].values():
+            component_registry.components.get(component['component'])
+    except Exception as e:
+        # do not break the worker: errors will show up again in fitness_function
+        print('Worker initialisation failed ({})'.format(str(e)))
+
+
+def set_genes(model, attribute_variation, genes, ignore_zero=False):
+    """Change the component attributes of a model to the gene values of an individual
+
+    :param model: smooth model, changed in place
+    :type model: dict
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of :class:`AttributeVariation`
+    :param genes: attribute values
+    :type genes: list or :class:`Individual`
+    :param ignore_zero: remove components with an attribute value of zero
+    :type ignore_zero: boolean
+    """
+    for i, av in enumerate(attribute_variation):
+        if ignore_zero and genes[i] == 0:
+            # remove component with zero value from model
+            # use pop instead of del in case component is removed multiple times
+            model['components'].pop(av.comp_name, None)
+        else:
+            model['components'][av.comp_name][av.comp_attribute] = genes[i]
+
+
 def fitness_function(
         index, individual,
         model,
         attribute_variation,
         dill_objectives,
         ignore_zero=False,
-        save_results=False):
+        save_results=False,
+        hooks=None):
     """Compute fitness for one individual
         Called async: copies of individual and model given
 
@@ -466,22 +728,18 @@ def fitness_function(
     :type ignore_zero: boolean
     :param save_results: save smooth result in individual?
     :type save_results: boolean
-    :return: index, modified individual with fitness (None if failed)
+    :param hooks: hooks for `run_smooth`, e.g. to stop hopeless evaluations early
+    :type hooks: list of :class:`~smooth.framework.simulation_hooks.SimulationHook`
+    :return: index, modified individual with fitness (None if failed or aborted)
         and smooth_result (none if not save_results) set
     :rtype: tuple(int, :class:`Individual`)
     """
     # update (copied) oemof model
-    for i, av in enumerate(attribute_variation):
-        if ignore_zero and individual[i] == 0:
-            # remove component with zero value from model
-            # use pop instead of del in case component is removed multiple times
-            model['components'].pop(av.comp_name, None)
-        else:
-            model['components'][av.comp_name][av.comp_attribute] = individual[i]
+    set_genes(model, attribute_variation, individual, ignore_zero)
 
     # Now that the model is updated according to the genes given by the GA, run smooth
     try:
-        smooth_result = run_smooth(model)[0]
+        smooth_result = run_smooth(model, hooks=hooks)[0]
         individual.smooth_result = smooth_result if save_results else None
         # update fitness with given objective functions
         objectives = dill.loads(dill_objectives)
@@ -489,19 +747,299 @@ def fitness_function(
 
     except Exception as e:
         # The smooth run failed.The fitness score remains None.
+        if isinstance(e, SimulationAbortedError):
+            individual.failure = 'aborted'
+        elif isinstance(e, MemoryError):
+            individual.failure = 'memory'
+        else:
+            individual.failure = 'error'
         print('Evaluation canceled ({})'.format(str(e)))
     return index, individual
 
 
+def fitness_from_dispatch(
+        index, individual,
+        components,
+        attribute_variation,
+        dill_objectives,
+        save_results=False):
+    """Compute fitness for one individual from a saved simulation
+        with the same dispatch (see :mod:`~smooth.optimization.dispatch_cache`)
+
+    :param index: index within population
+    :type index: int
+    :param individual: individual to evaluate
+    :type individual: :class:`Individual`
+    :param components: copied components of the simulation, before *generate_results*
+    :type components: list of :class:`~smooth.components.component.Component`
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of :class:`AttributeVariation`
+    :param dill_objectives: objective functions
+    :type dill_objectives: tuple of lambda-functions pickled with dill
+    :param save_results: save smooth result in individual?
+    :type save_results: boolean
+    :return: index, modified individual with fitness (None if failed)
+        and smooth_result (none if not save_results) set
+    :rtype: tuple(int, :class:`Individual`)
+    """
+    try:
+        smooth_result = finish_dispatch(components, attribute_variation, individual.values)
+        individual.smooth_result = smooth_result if save_results else None
+        objectives = dill.loads(dill_objectives)
+        individual.fitness = tuple(f(smooth_result) for f in objectives)
+    except Exception as e:
+        individual.failure = 'error'
+        print('Evaluation canceled ({})'.format(str(e)))
+    return index, individual
+
+
+def model_overlay(model, sim_params=None):
+    """Copy of model for a single evaluation.
+
+    Component parameters are copied, because they are changed by the genes and by run_smooth.
+    All other entries (simulation parameters, busses) are shared with the original model.
+
+    :param model: smooth model
+    :type model: dict
+    :param sim_params: simulation parameters to change for this evaluation. Defaults to None
+    :type sim_params: dict, optional
+    :return: model that can be changed without affecting the original components
+    :rtype: dict
+    """
+    overlay = dict(model)
+    overlay['components'] = copy.deepcopy(model['components'])
+    if sim_params:
+        overlay['sim_params'] = dict(model.get('sim_params', {}), **sim_params)
+    return overlay
+
+
+def count_failures(individuals):
+    """Count failed evaluations by reason.
+
+    :param individuals: evaluated individuals
+    :type individuals: list of :class:`Individual`
+    :return: number of failed evaluations by reason (e.g. 'timeout')
+    :rtype: dict
+    """
+    failures = {}
+    for ind in individuals:
+        if ind is not None and ind.failure is not None:
+            failures[ind.failure] = failures.get(ind.failure, 0) + 1
+    return failures
+
+
+def dominated_by(front, objectives):
+    """Predicate for :class:`~smooth.framework.simulation_hooks.AbortHook`:
+    are the objectives of the provisional results dominated by the front?
+
+    Assumes that the objectives can only get worse for the rest of the simulation,
+    e.g. negative costs and emissions when variable costs and emissions are not negative.
+
+    :param front: fitness of the current pareto front
+    :type front: list of tuples
+    :param objectives: objective functions
+    :type objectives: list of functions
+    :return: predicate that takes the provisional components
+    :rtype: function
+    """
+    def predicate(components):
+        try:
+            bound = tuple(f(components) for f in objectives)
+        except Exception:
+            # objectives can not be computed yet: continue simulation
+            return False
+        return any(nds.dominates(fitness, bound) for fitness in front)
+    return predicate
+
+
+def evaluate_genes(index, genes, sim_params=None, front=None, screening=False):
+    """Compute fitness for gene values in a worker process set up by :func:`init_worker`
+
+    :param index: index within population
+    :type index: int
+    :param genes: attribute values of the individual to evaluate
+    :type genes: list
+    :param sim_params: simulation parameters to change for this evaluation,
+        e.g. a shorter horizon for a low fidelity evaluation. Defaults to None
+    :type sim_params: dict, optional
+    :param front: fitness of the current pareto front. If given and *early_abort* is set,
+        the simulation is stopped as soon as its provisional fitness is dominated.
+        Defaults to None
+    :type front: list of tuples, optional
+    :param screening: low fidelity screening, only the fitness is needed:
+        no KPIs are computed and no smooth result is saved. Defaults to False
+    :type screening: boolean, optional
+    :return: index, fitness (None if failed), smooth_result (None if not saved),
+        KPIs (None if failed or not set) and reason of failure (None if successful)
+    :rtype: tuple(int, tuple, list, dict, string)
+    """
+    state = worker_state
+    # KPIs need the smooth result
+    keep_result = not screening and (state['save_results'] or state['dill_kpis'] is not None)
+    hooks = None
+    if front and state.get('early_abort'):
+        hooks = [AbortHook(dominated_by(front, dill.loads(state['dill_objectives'])),
+                           state['early_abort'])]
+    limited = state.get('timeout') is not None or state.get('memory_limit') is not None
+    cache = state.get('dispatch_cache')
+    individual = None
+    snapshot = None
+    if cache is not None:
+        key = cache.key(genes, sim_params)
+        components = cache.get(key)
+        if components is not None:
+            # same dispatch simulated before: only compute costs and emissions
+            _, individual = fitness_from_dispatch(
+                index, Individual(list(genes)), components,
+                state['attribute_variation'],
+                state['dill_objectives'],
+                keep_result)
+        elif not limited:
+            # save dispatch of this simulation
+            snapshot = SnapshotHook()
+            hooks = (hooks or []) + [snapshot]
+
+    if individual is None:
+        args = (
+            index, Individual(list(genes)),
+            model_overlay(state['model'], sim_params),
+            state['attribute_variation'],
+            state['dill_objectives'],
+            state['ignore_zero'],
+            keep_result,
+            hooks)
+        if not limited:
+            _, individual = fitness_function(*args)
+            if snapshot is not None and snapshot.components is not None \
+                    and individual.fitness is not None:
+                cache.put(key, snapshot.components)
+        else:
+            # run in separate process, which is killed when exceeding the limits
+            status, value = run_with_limits(
+                fitness_function, args, state['timeout'], state['memory_limit'])
+            if status == 'ok':
+                _, individual = value
+            else:
+                print('Evaluation canceled ({}: {})'.format(status, value))
+                individual = Individual(list(genes))
+                individual.failure = status
+    return evaluation_result(index, individual, screening)
+
+
+def evaluation_result(index, individual, screening=False):
+    """Result of an evaluation in a worker process set up by :func:`init_worker`.
+    Computes the KPIs and writes the smooth result to *result_dir*, if set.
+
+    :param index: index within population
+    :type index: int
+    :param individual: evaluated individual, with smooth_result if KPIs or results are needed
+    :type individual: :class:`Individual`
+    :param screening: low fidelity screening: only return the fitness. Defaults to False
+    :type screening: boolean, optional
+    :return: index, fitness, smooth_result, KPIs and reason of failure,
+        see :func:`evaluate_genes`
+    :rtype: tuple(int, tuple, list, dict, string)
+    """
+    state = worker_state
+    if screening:
+        # must not be mistaken for (or written as) the result at full fidelity
+        return index, individual.fitness, None, None, individual.failure
+    kpis = None
+    compute_kpis = state['dill_kpis'] is not None
+    if compute_kpis and individual.fitness is not None:
+        try:
+            kpis = {name: f(individual.smooth_result)
+                    for name, f in dill.loads(state['dill_kpis']).items()}
+        except Exception as e:
+            print('KPI computation failed ({})'.format(str(e)))
+    smooth_result = individual.smooth_result if state['save_results'] else None
+    if smooth_result is not None and state.get('result_dir'):
+        # only send handle of written result back
+        smooth_result = store_result(state['result_dir'], individual.values, smooth_result,
+                                     kpis, state['result_dtype'])
+    return index, individual.fitness, smooth_result, kpis, individual.failure
+
+
+def evaluate_batch(tasks, sim_params=None):
+    """Compute fitness for several gene values in one stacked simulation
+    (see :mod:`~smooth.optimization.batch_evaluation`)
+    in a worker process set up by :func:`init_worker`.
+
+    Each individual is evaluated on its own with :func:`evaluate_genes` instead
+    if there is only one task, resource limits are set or the stacked simulation fails.
+    Early abort and the reuse of the dispatch are not used for stacked simulations.
+
+    :param tasks: index and attribute values of each individual to evaluate
+    :type tasks: list of tuple(int, list)
+    :param sim_params: simulation parameters to change for these evaluations. Defaults to None
+    :type sim_params: dict, optional
+    :return: result of each individual, see :func:`evaluate_genes`
+    :rtype: list of tuples
+    """
+    state = worker_state
+    limited = state.get('timeout') is not None or state.get('memory_limit') is not None
+    if len(tasks) > 1 and not limited:
+        try:
+            models = []
+            for index, genes in tasks:
+                model = model_overlay(state['model'], sim_params)
+                set_genes(model, state['attribute_variation'], genes, state['ignore_zero'])
+                models.append(model)
+            blocks = split_components(run_smooth(stack_models(models))[0], len(tasks))
+        except Exception as e:
+            # e.g. one configuration is infeasible: find out which one
+            print('Stacked evaluation failed, evaluating separately ({})'.format(str(e)))
+        else:
+            objectives = dill.loads(state['dill_objectives'])
+            results = []
+            for (index, genes), components in zip(tasks, blocks):
+                individual = Individual(list(genes))
+                try:
+                    individual.fitness = tuple(f(components) for f in objectives)
+                    individual.smooth_result = components
+                except Exception as e:
+                    individual.failure = 'error'
+                    print('Evaluation canceled ({})'.format(str(e)))
+                results.append(evaluation_result(index, individual))
+            return results
+    return [evaluate_genes(index, genes, sim_params) for index, genes in tasks]
+
+
+def progress_message(title, individuals, stats=None):
+    """Compact message for the plotting process.
+    Only fitness and gene values are sent, not the individuals (with their smooth results).
+
+    :param title: title of the plot
+    :type title: string
+    :param individuals: individuals to show, e.g. the current pareto front
+    :type individuals: list of :class:`Individual`
+    :param stats: statistics of the last generation, shown below the title. Defaults to None
+    :type stats: dict, optional
+    :return: message with *title*, *fitness* (individuals x objectives),
+        *genes* (individuals x attributes) and *stats*
+    :rtype: dict
+    """
+    individuals = [ind for ind in individuals if ind.fitness is not None]
+    return {
+        'title': title,
+        'fitness': np.array([ind.fitness for ind in individuals], dtype=float),
+        'genes': np.array([ind.values for ind in individuals], dtype=float),
+        'stats': stats,
+    }
+
+
 class PlottingProcess(mp.Process):
     """Process for plotting the intermediate results
 
     Data is sent through (onedirectional) pipe.
-    It should be a dictionary containing "values" (array of :class:`Individual`)
-    and "gen" (current generation number, displayed in title).
+    It should be a dictionary as created by :func:`progress_message`.
     Send None to stop listening for new data and block the Process by showing the plot.
     After the user closes the plot, the process returns and can be joined.
 
+    The points and the title are animated artists: for new data,
+    only they are redrawn on top of the saved background (blitting).
+    The whole figure is only redrawn when the axis limits have to change.
+
     :param pipe: data transfer channel
     :type pipe: `multiprocessing pipe \
 <https://docs.python.org/3/library/multiprocessing.html#multiprocessing.Pipe>`_
@@ -512,7 +1050,9 @@ class PlottingProcess(mp.Process):
     :var exit_flag: Multiprocessing event signalling process should be stopped
     :var fig: figure for plotting
     :var ax: current graphic axis for plotting
-    :var points: plotted results or None
+    :var points: plotted results
+    :var title: title of the plot
+    :var background: saved figure without animated artists, None if not drawn yet
     :var annot: current annotation or None
     """
 
@@ -526,41 +1066,27 @@ class PlottingProcess(mp.Process):
         Loops while exit_flag is not set and user has not closed window.
         Checks periodically for new data to be displayed.
         """
-
-        # start of main loop: no results yet
-        plt.title("Waiting for first results...")
+        # only needed when plot_progress is set: import in plotting process
+        import matplotlib.pyplot as plt
+        from tkinter import TclError  # plotting window closed
 
         # loop until exit signal
         while not self.exit_flag.is_set():
             # poll with timeout (like time.sleep)
-            while self.pipe.poll(0.1):
-                # something in pipe
-                data = self.pipe.recv()
-                if data is None:
-                    # special case
-                    plt.title("Finished!")
+            if self.pipe.poll(0.1):
+                # something in pipe: only show most recent data
+                data, finished = self.receive()
+                if data is not None:
+                    self.update_plot(data)
+                if finished:
+                    self.title.set_text("Finished!")
+                    self.fig.canvas.draw()
                     # block process until user closes window
                     plt.show()
                     # exit process
                     return
-                else:
-                    # process sent data
-                    # save sent results to show in annotation later
-                    self.values = data["values"]
-                    # use abs(r[]) to display positive values
-                    f1_vals = [r.fitness[0] for r in data["values"]]
-                    f2_vals = [r.fitness[1] for r in data["values"]]
-                    # reset figure
-                    self.ax.clear()
-                    # redraw plot with new data
-                    self.points, = self.ax.plot(f1_vals, f2_vals, '.b')
-                    # new title and labels
-                    plt.title(data.get("title", "Pareto front"), {'zorder': 1})
-                    plt.xlabel(self.objective_names[0])
-                    plt.ylabel(self.objective_names[1])
-                    self.fig.canvas.draw()
             try:
-                # redraw plot, capture events
+                # capture events
                 plt.pause(0.1)
             except TclError:
                 # window may have been closed: exit process
@@ -568,6 +1094,93 @@ class PlottingProcess(mp.Process):
         # exit signal sent: stop process
         return
 
+    def receive(self):
+        """Read all pending messages from the pipe
+
+        :return: most recent data (None if no data is pending)
+            and whether the optimization has finished (message None)
+        :rtype: tuple
+        """
+        latest = None
+        finished = False
+        while self.pipe.poll():
+            data = self.pipe.recv()
+            if data is None:
+                finished = True
+                break
+            latest = data
+        return latest, finished
+
+    def setup_plot(self):
+        """Create figure and the (animated) artists that are updated with new data"""
+        import matplotlib.pyplot as plt
+        self.fig, self.ax = plt.subplots()
+        self.points, = self.ax.plot([], [], '.b', animated=True)
+        self.title = self.ax.set_title("Waiting for first results...", animated=True)
+        self.ax.set_xlabel(self.objective_names[0])
+        self.ax.set_ylabel(self.objective_names[1])
+        self.fitness = np.zeros((0, 2))
+        self.genes = np.zeros((0, len(self.attribute_variation)))
+        self.background = None
+        self.annot = None
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        """Called after the whole figure was drawn.
+        Save background for blitting and draw animated artists on top.
+        """
+        canvas = self.fig.canvas
+        self.background = canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.points)
+        self.ax.draw_artist(self.title)
+
+    def update_plot(self, data):
+        """Show new data. Only redraw the whole figure if the axis limits change.
+
+        :param data: message created by :func:`progress_message`
+        :type data: dict
+        """
+        self.fitness = data['fitness'].reshape(-1, len(self.objective_names))
+        self.genes = data['genes']
+        self.points.set_data(self.fitness[:, 0], self.fitness[:, 1])
+        title = data.get('title', "Pareto front")
+        stats = data.get('stats')
+        if stats:
+            title += "\n{} valid, {} evaluated, {:.1f} s".format(
+                stats.get('n_valid'), stats.get('n_evaluated'), stats.get('time', 0))
+        self.title.set_text(title)
+
+        if self.rescale() or self.background is None:
+            # complete redraw (saves new background)
+            self.fig.canvas.draw()
+        else:
+            # blitting: only redraw animated artists
+            canvas = self.fig.canvas
+            canvas.restore_region(self.background)
+            self.ax.draw_artist(self.points)
+            self.ax.draw_artist(self.title)
+            canvas.blit(self.fig.bbox)
+
+    def rescale(self):
+        """Adapt axis limits if points are outside or fill only a small part of the axes
+
+        :return: True if limits were changed
+        :rtype: boolean
+        """
+        if len(self.fitness) == 0:
+            return False
+        changed = False
+        for idx, (get_lim, set_lim) in enumerate([
+                (self.ax.get_xlim, self.ax.set_xlim), (self.ax.get_ylim, self.ax.set_ylim)]):
+            low, high = self.fitness[:, idx].min(), self.fitness[:, idx].max()
+            lim_low, lim_high = get_lim()
+            outside = low < lim_low or high > lim_high
+            if outside or (high - low) < 0.5 * (lim_high - lim_low):
+                margin = 0.05 * (high - low) or 0.05 * abs(high) or 1
+                set_lim(low - margin, high + margin)
+                changed = True
+        return changed
+
     def handle_close(self, event):
         """Called when user closes window
 
@@ -582,7 +1195,7 @@ class PlottingProcess(mp.Process):
         create new one with relevant info from all Indivdiuals corresponding to this point.
         If user does not hover over point, remove annotation, if any.
         """
-        if self.points and event.inaxes == self.ax:
+        if len(self.fitness) and event.inaxes == self.ax:
             # results shown, mouse within plot: get event info
             # cont: any points hovered?
             # ind:  list of points hovered
@@ -603,14 +1216,14 @@ class PlottingProcess(mp.Process):
                         line = "{}.{}: {}\n".format(
                             av.comp_name,
                             av.comp_attribute,
-                            self.values[idx][av_idx])
+                            self.genes[idx][av_idx])
                         ind_text += line
                         max_line_len = max(max_line_len, len(line))
                     # separator line
                     ind_text += '-'*max_line_len + "\n"
                     # list all objectives with name and value
                     for obj_idx, obj in enumerate(self.objective_names):
-                        ind_text += "{}: {}\n".format(obj, self.values[idx].fitness[obj_idx])
+                        ind_text += "{}: {}\n".format(obj, self.fitness[idx][obj_idx])
                     text.append(ind_text)
                 text = "\n".join(text)
 
@@ -643,9 +1256,7 @@ class PlottingProcess(mp.Process):
         self.pipe = pipe
         self.attribute_variation = attribute_variation
         self.objective_names = objective_names
-        self.fig, self.ax = plt.subplots()
-        self.points = None
-        self.annot = None
+        self.setup_plot()
         self.fig.canvas.mpl_connect('close_event', self.handle_close)
         self.fig.canvas.mpl_connect("motion_notify_event", self.hover)
         self.main()
@@ -675,8 +1286,9 @@ class Optimization:
     :param objective_names: descriptive names for optimization functions.
         Defaults to ('costs', 'emissions')
     :type objective_names: 2-tuple of strings, optional
-    :param post_processing: improve GA solution with gradient ascent. Defaults to False
-    :type post_processing: boolean, optional
+    :param post_processing: improve GA solution with gradient ascent (True)
+        or with a parallel pattern search ('pattern_search'). Defaults to False
+    :type post_processing: boolean or string, optional
     :param plot_progress: plot current pareto front. Defaults to False
     :type plot_progress: boolean, optional
     :param ignore_zero: ignore components with an attribute value of zero. Defaults to False
@@ -689,10 +1301,108 @@ class Optimization:
         **Warning!** When writing the result to file,
         this may greatly increase the file size. Defaults to False
     :type SAVE_ALL_SMOOTH_RESULTS: boolean, optional
+    :param result_dir: with `SAVE_ALL_SMOOTH_RESULTS`, write the results of each
+        individual to a compact file in this directory and only keep a handle
+        in the individual (see :mod:`~smooth.optimization.result_store`).
+        Must be reachable by all workers. Defaults to None (keep results in individuals)
+    :type result_dir: string, optional
+    :param result_dtype: data type of the stored flows and states,
+        'float64' or 'float32'. Defaults to 'float64'
+    :type result_dtype: string, optional
+    :param archive_file: SQLite file to save all evaluations in and to look up
+        evaluations of previous runs with the same model. Defaults to None (no archive)
+    :type archive_file: string, optional
+    :param checkpoint_file: file to save the state of the optimization in,
+        after each generation and each attribute of the gradient ascent. Defaults to None
+    :type checkpoint_file: string, optional
+    :param resume_from: checkpoint file to continue a previous optimization from.
+        Defaults to None (start new optimization)
+    :type resume_from: string, optional
+    :param asynchronous: asynchronous steady-state evolution instead of generations:
+        merge each result into the population as soon as it is available
+        and start a new evaluation immediately. Defaults to False
+    :type asynchronous: boolean, optional
+    :param n_islands: number of sub-populations that evolve on separate workers
+        (generational mode only). Defaults to 1 (single population)
+    :type n_islands: int, optional
+    :param migration_interval: number of generations between migrations of islands.
+        Defaults to 5
+    :type migration_interval: int, optional
+    :param n_migrants: number of best individuals each island sends to the next island.
+        Defaults to 2
+    :type n_migrants: int, optional
+    :param surrogate: pre-screen children with a surrogate model of the fitness
+        (generational mode only). Defaults to False
+    :type surrogate: boolean, optional
+    :param surrogate_candidates: number of candidates generated per simulated child
+        when using the surrogate. Defaults to 4
+    :type surrogate_candidates: int, optional
+    :param surrogate_exploration: share of simulated children chosen by uncertainty
+        instead of predicted fitness. Defaults to 0.25
+    :type surrogate_exploration: number, optional
+    :param surrogate_min_samples: number of valid evaluations before the surrogate is used.
+        Defaults to `population_size`
+    :type surrogate_min_samples: int, optional
+    :param fidelity: multi-fidelity screening of children before the full simulation
+        (generational mode only). List of levels from cheapest to most expensive,
+        each a dict with *sim_params* (simulation parameters to change,
+        e.g. a shorter *n_intervals*) and optional *promote* (share of children
+        promoted to the next level; default: only non-dominated children).
+        Defaults to None (no screening)
+    :type fidelity: list of dicts, optional
+    :param early_abort: stop evaluations that are already dominated by the current front.
+        Number of intervals between checks. Only valid if variable costs and emissions
+        are never negative. Defaults to None (no early abort)
+    :type early_abort: int, optional
+    :param evaluator: where to evaluate individuals: 'local' (worker processes on this machine),
+        'distributed' (remote workers connect to a broker, see
+        :mod:`~smooth.optimization.distributed`) or a function that takes
+        `n_core`, initializer and initializer arguments and returns an object
+        with the interface of a multiprocessing pool. Defaults to 'local'
+    :type evaluator: string or function, optional
+    :param broker_address: (host, port) the broker listens on for the distributed evaluator.
+        Use ('', 6000) to accept workers from other machines (trusted networks only).
+        Defaults to ('localhost', 6000)
+    :type broker_address: tuple, optional
+    :param broker_authkey: key workers need to connect to the broker.
+        Defaults to None (random key, printed when the broker starts)
+    :type broker_authkey: bytes, optional
+    :param reuse_dispatch: reuse the simulation of an individual that differs
+        only in cost-only attributes (see :mod:`~smooth.optimization.dispatch_cache`)
+        and only compute costs and emissions again. Defaults to False
+    :type reuse_dispatch: boolean, optional
+    :param dispatch_cache_size: maximum number of simulations saved for reuse
+        in each worker. Defaults to 16
+    :type dispatch_cache_size: int, optional
+    :param batch_size: experimental: simulate up to this many individuals together
+        in one stacked model, with one solver call per interval
+        (see :mod:`~smooth.optimization.batch_evaluation`). Defaults to None (no stacking)
+    :type batch_size: int, optional
+    :param evaluation_timeout: maximum time of one evaluation in seconds.
+        The evaluation is killed when exceeding it. Defaults to None (no limit)
+    :type evaluation_timeout: number, optional
+    :param evaluation_memory_limit: maximum memory of one evaluation in MB.
+        Defaults to None (no limit)
+    :type evaluation_memory_limit: number, optional
+    :param kpis: additional values to compute for each evaluation and save in the archive.
+        Key is the name of the value, the function takes the result from `run_smooth`.
+        Defaults to None
+    :type kpis: dict of lambda functions, optional
     :var population: current individuals
     :type population: list of Individual
     :var evaluated: keeps track of evaluated individuals to avoid double computation
     :type evaluated: dict with fingerprint of individual->:class:`Individual`
+    :var archive: archive of evaluations, None if no *archive_file* is given
+    :type archive: :class:`~smooth.optimization.fitness_archive.FitnessArchive`
+    :var pool: evaluator for fitness evaluation, None if not started
+    :type pool: multiprocessing Pool or :class:`~smooth.optimization.distributed.Broker`
+    :var generation_stats: statistics of each finished generation
+        (*generation*, *n_evaluated*, *n_valid*, *time* in seconds,
+        *failures*: number of failed evaluations by reason)
+    :type generation_stats: list of dicts
+    :var evaluation_stats: statistics after each evaluation in asynchronous mode
+        (*evaluation*, *time* since start in seconds, *valid*, *front_size*)
+    :type evaluation_stats: list of dicts
     :var ax: current figure handle for plotting
     :type ax: pyplot Axes
     :raises: `AttributeError` or `AssertionError` when required argument is missing or wrong
@@ -706,6 +1416,30 @@ class Optimization:
         self.ignore_zero = False
         self.save_intermediate_results = False
         self.SAVE_ALL_SMOOTH_RESULTS = False
+        self.result_dir = None
+        self.result_dtype = 'float64'
+        self.reuse_dispatch = False
+        self.dispatch_cache_size = 16
+        self.batch_size = None
+        self.archive_file = None
+        self.kpis = None
+        self.checkpoint_file = None
+        self.resume_from = None
+        self.asynchronous = False
+        self.n_islands = 1
+        self.migration_interval = 5
+        self.n_migrants = 2
+        self.surrogate = False
+        self.surrogate_candidates = 4
+        self.surrogate_exploration = 0.25
+        self.surrogate_min_samples = None
+        self.fidelity = None
+        self.early_abort = None
+        self.evaluator = 'local'
+        self.evaluation_timeout = None
+        self.evaluation_memory_limit = None
+        self.broker_address = ('localhost', 6000)
+        self.broker_authkey = None
 
         # objective functions: tuple with lambdas
         # negative sign for minimizing
@@ -756,13 +1490,39 @@ class Optimization:
             raise AssertionError("No model given.")
 
         # objectives
-        assert len(self.objectives) == 2, "Need exactly two objective functions"
+        assert len(self.objectives) >= 2, "Need at least two objective functions"
         assert len(self.objectives) == len(
             self.objective_names), "Objective names don't match objective functions"
 
+        # surrogate is trained after first generation by default
+        if self.surrogate_min_samples is None:
+            self.surrogate_min_samples = self.population_size
+
         # Init population with random values between attribute variation (val_max inclusive)
         self.population = []
         self.evaluated = {}
+        # islands generate children at the same time
+        self.evaluated_lock = threading.Lock()
+        self.pool = None
+        self.generation_stats = []
+        self.evaluation_stats = []
+        # fitness of current pareto front (for early abort)
+        self.front_fitness = []
+
+        if self.result_dir:
+            # workers may run in other working directories
+            self.result_dir = os.path.abspath(self.result_dir)
+            os.makedirs(self.result_dir, exist_ok=True)
+
+        # persistent archive of evaluations
+        self.archive = None
+        if self.archive_file:
+            # everything besides the genes that changes the fitness
+            self.archive = FitnessArchive(self.archive_file, model_hash(
+                self.model,
+                [[av.comp_name, av.comp_attribute] for av in self.attribute_variation],
+                [function_source(f) for f in self.objectives],
+                self.ignore_zero))
 
         # save intermediate results?
         if self.save_intermediate_results:
@@ -790,31 +1550,709 @@ class Optimization:
         """Async success callback
         Update master individual in population and `evaluated` dictionary
 
-        :param result: result from fitness_function
-        :type result: tuple(index, :class:`Individual`)
+        :param result: result from evaluate_genes
+        :type result: tuple(index, fitness, smooth_result, kpis, failure)
         """
-        self.population[result[0]] = result[1]
-        self.evaluated[str(result[1])] = result[1]
+        index = result[0]
+        self.update_individual(self.population[index], *result[1:])
+
+    def set_batch_fitness(self, results):
+        """Async success callback of a batch evaluation
+
+        :param results: results from :func:`evaluate_batch`
+        :type results: list of tuples, see :meth:`set_fitness`
+        """
+        for result in results:
+            self.set_fitness(result)
+
+    def update_individual(self, individual, fitness, smooth_result=None, kpis=None,
+                          failure=None):
+        """Save evaluation result in individual, `evaluated` dictionary and archive
+
+        :param individual: evaluated individual
+        :type individual: :class:`Individual`
+        :param fitness: fitness values, None if evaluation failed
+        :type fitness: tuple
+        :param smooth_result: result of `run_smooth`, if saved
+        :type smooth_result: list
+        :param kpis: key performance indicators, if set
+        :type kpis: dict
+        :param failure: reason of failed evaluation
+        :type failure: string
+        """
+        individual.fitness = fitness
+        individual.smooth_result = smooth_result
+        individual.kpis = kpis
+        individual.failure = failure
+        self.evaluated[str(individual)] = individual
+        # evaluate again in next run, see RETRY_FAILURES
+        if self.archive is not None and failure not in RETRY_FAILURES:
+            self.archive.put(individual.values, fitness, kpis)
+
+    def worker_args(self):
+        """Arguments for :func:`init_worker`
+
+        :return: model, attribute variations, pickled objectives, ignore_zero, save_results,
+            pickled KPIs, early_abort, evaluation_timeout, evaluation_memory_limit,
+            result_dir, result_dtype, reuse_dispatch, dispatch_cache_size
+        :rtype: tuple
+        """
+        return (self.model, self.attribute_variation, dill.dumps(self.objectives),
+                self.ignore_zero, self.SAVE_ALL_SMOOTH_RESULTS,
+                None if self.kpis is None else dill.dumps(self.kpis), self.early_abort,
+                self.evaluation_timeout, self.evaluation_memory_limit,
+                self.result_dir, self.result_dtype,
+                self.reuse_dispatch, self.dispatch_cache_size)
+
+    def ipc_bytes_per_evaluation(self):
+        """Size of the data sent to a worker for one evaluation.
+
+        :return: pickled size of the task in bytes and, for comparison,
+            the size if the full model was sent with every task
+        :rtype: tuple(int, int)
+        """
+        genes = [av.val_max for av in self.attribute_variation]
+        task_bytes = len(pickle.dumps((0, genes)))
+        full_bytes = len(pickle.dumps((0, Individual(genes)) + self.worker_args()))
+        return task_bytes, full_bytes
+
+    def task_args(self, index, genes):
+        """Arguments for :func:`evaluate_genes`.
+        With *early_abort*, the fitness of the current front is sent along.
+
+        :param index: index or ID of the evaluation
+        :type index: int
+        :param genes: gene values to evaluate
+        :type genes: list
+        :return: arguments
+        :rtype: tuple
+        """
+        if self.early_abort and self.front_fitness:
+            return index, genes, None, self.front_fitness
+        return index, genes
+
+    def start_pool(self):
+        """Start the evaluator, if not already running:
+        `n_core` local worker processes or a broker for remote workers (see *evaluator*).
+        """
+        if self.pool is not None:
+            return
+        if self.evaluator == 'local':
+            self.pool = mp.Pool(
+                processes=self.n_core, initializer=init_worker, initargs=self.worker_args())
+        elif self.evaluator == 'distributed':
+            self.pool = Broker(self.broker_address, self.broker_authkey,
+                               initializer=init_worker, initargs=self.worker_args())
+            print("Waiting for workers at {}:{} with authkey {}".format(
+                self.pool.address[0], self.pool.address[1], self.pool.authkey.decode()))
+        else:
+            # custom evaluator
+            self.pool = self.evaluator(self.n_core, init_worker, self.worker_args())
+
+    def close_pool(self):
+        """Stop all worker processes, if running.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def new_child(self):
+        """Generate a new individual from two random parents of the population.
+        If there are less than two parents (initial generation), generate a random configuration.
+
+        :return: new individual (not evaluated yet, may have been seen before)
+        :rtype: :class:`Individual`
+        """
+        # get random parents from pop_size best results
+        try:
+            [parent1, parent2] = random.sample(self.population, 2)
+            # crossover and mutate parents
+            return mutate(crossover(parent1, parent2), self.attribute_variation)
+        except ValueError:
+            # not enough parents left / initial generation:
+            # generate random configuration
+            individual = []
+            for av in self.attribute_variation:
+                if av.val_step:
+                    value = random.randrange(0, av.num_steps) * av.val_step + av.val_min
+                else:
+                    value = random.uniform(av.val_min, av.val_max)
+                individual.append(value)
+            return Individual(individual)
+
+    def surrogate_model(self):
+        """Fit surrogate model to all valid evaluations.
+
+        :return: fitted surrogate or None if there are less than
+            `surrogate_min_samples` valid evaluations
+        :rtype: :class:`~smooth.optimization.surrogate.RBFSurrogate`
+        """
+        # copy first: other islands may add evaluations
+        known = [ind for ind in list(self.evaluated.values())
+                 if ind is not None and ind.fitness is not None]
+        if len(known) < max(self.surrogate_min_samples, 2):
+            return None
+        model = RBFSurrogate(
+            [av.val_min for av in self.attribute_variation],
+            [av.val_max for av in self.attribute_variation])
+        return model.fit([ind.values for ind in known], [ind.fitness for ind in known])
+
+    def prescreen(self, candidates, surrogate):
+        """Select children to simulate with the surrogate model.
+
+        Most children are chosen by rank and crowding distance of their predicted fitness
+        together with the current population. The remaining share (`surrogate_exploration`)
+        are the candidates furthest away from all evaluated individuals.
+        Rejected candidates may be generated again later.
+
+        :param candidates: new children, not evaluated yet
+        :type candidates: list of :class:`Individual`
+        :param surrogate: fitted surrogate, see :func:`surrogate_model`
+        :type surrogate: :class:`~smooth.optimization.surrogate.RBFSurrogate`
+        :return: `population_size` children to simulate
+        :rtype: list of :class:`Individual`
+        """
+        n = self.population_size
+        if len(candidates) <= n:
+            return candidates
+        prediction, uncertainty = surrogate.predict([child.values for child in candidates])
+
+        # promising: good predicted rank compared to current population
+        n_pop = len(self.population)
+        fitness = [ind.fitness for ind in self.population] + prediction.tolist()
+        order, _ = nds.select_by_rank_and_crowding(fitness, len(fitness))
+        promising = [i - n_pop for i in order if i >= n_pop]
+        n_explore = int(round(n * self.surrogate_exploration))
+        selected = promising[:n - n_explore]
+        # uncertain: far away from all evaluated individuals
+        for i in sorted(promising[n - n_explore:], key=lambda i: -uncertainty[i])[:n_explore]:
+            selected.append(i)
+
+        for i in set(range(len(candidates))) - set(selected):
+            # not simulated: allow again
+            del self.evaluated[str(candidates[i])]
+        print("Surrogate selected {} of {} candidates".format(len(selected), len(candidates)))
+        return [candidates[i] for i in sorted(selected)]
+
+    def compute_screening_fitness(self, candidates, sim_params):
+        """Compute fitness of candidates with changed simulation parameters
+        with `n_core` worker threads. Results are not saved in the candidates
+        and no KPIs or smooth results are computed (screening, see :func:`evaluate_genes`).
+
+        :param candidates: individuals to evaluate
+        :type candidates: list of :class:`Individual`
+        :param sim_params: simulation parameters to change
+        :type sim_params: dict
+        :return: fitness of successfully evaluated candidates by index in *candidates*
+        :rtype: dict
+        """
+        self.start_pool()
+        tasks = [self.pool.apply_async(
+            evaluate_genes, (idx, child.values, sim_params, None, True),
+            error_callback=self.err_callback) for idx, child in enumerate(candidates)]
+        fitness = {}
+        for task in tasks:
+            try:
+                idx, low_fitness = task.get()[:2]
+            except Exception:
+                # already reported by error callback
+                continue
+            if low_fitness is not None:
+                fitness[idx] = low_fitness
+        return fitness
+
+    def screen(self, children):
+        """Multi-fidelity screening of new children.
+
+        The children are simulated with the simulation parameters of each `fidelity` level
+        in turn. After each level, only the promoted children take part in the next level.
+        Children found in the archive skip the screening.
+        Rejected children are not simulated at full fidelity and stay blocked in `evaluated`.
+
+        :param children: new children, not evaluated yet
+        :type children: list of :class:`Individual`
+        :return: children to simulate with the full model
+        :rtype: list of :class:`Individual`
+        """
+        promoted = []
+        candidates = []
+        for child in children:
+            archived = None if self.archive is None else self.archive.get(child.values)
+            if archived is None:
+                candidates.append(child)
+            else:
+                # known full fidelity result: no need to screen
+                child.fitness, child.kpis = archived
+                self.evaluated[str(child)] = child
+                promoted.append(child)
+
+        n_children = len(candidates)
+        for level in self.fidelity:
+            if len(candidates) <= 1:
+                break
+            fitness = self.compute_screening_fitness(candidates, level['sim_params'])
+            # children that fail at low fidelity are rejected
+            valid = sorted(fitness)
+            if level.get('promote') is None:
+                # non-dominated children only
+                fronts = nds.non_dominated_fronts([fitness[idx] for idx in valid])
+                selected = fronts[0].tolist() if fronts else []
+            else:
+                n_promote = int(math.ceil(level['promote'] * len(candidates)))
+                selected, _ = nds.select_by_rank_and_crowding(
+                    [fitness[idx] for idx in valid], n_promote)
+            keep = set(valid[i] for i in selected)
+            for idx, child in enumerate(candidates):
+                if idx not in keep:
+                    # stay blocked, so rejected configuration is not generated again
+                    self.evaluated[str(child)] = child
+            candidates = [child for idx, child in enumerate(candidates) if idx in keep]
+
+        print("Multi-fidelity screening: {} of {} children promoted".format(
+            len(candidates), n_children))
+        return promoted + candidates
 
     def compute_fitness(self):
         """Compute fitness of every individual in `population` with `n_core` worker threads.
         Remove invalid individuals from `population`
+
+        The worker processes are started if needed and stay alive afterwards.
+        Individuals found in the archive are not simulated again.
+        With *batch_size*, the individuals are sent to the workers in batches
+        (see :func:`evaluate_batch`).
+
+        :return: number of simulated individuals
+        :rtype: int
         """
-        # open n_core worker threads
-        pool = mp.Pool(processes=self.n_core)
-        # set objective functions for each worker
-        dill_objectives = dill.dumps(self.objectives)
+        self.start_pool()
+        tasks = []
+        batched = []
         for idx, ind in enumerate(self.population):
-            if ind.fitness is None:  # not evaluated yet
-                pool.apply_async(
-                    fitness_function,
-                    (idx, ind, self.model, self.attribute_variation,
-                        dill_objectives, self.ignore_zero, self.SAVE_ALL_SMOOTH_RESULTS),
+            if ind.fitness is None and self.archive is not None:
+                # evaluated in previous run?
+                archived = self.archive.get(ind.values)
+                if archived is not None:
+                    ind.fitness, ind.kpis = archived
+                    self.evaluated[str(ind)] = ind
+                    continue
+            if ind.fitness is None and self.batch_size and self.batch_size > 1:
+                batched.append((idx, ind.values))
+            elif ind.fitness is None:  # not evaluated yet
+                # model and objectives are already known to the workers: only send genes
+                tasks.append(self.pool.apply_async(
+                    evaluate_genes,
+                    self.task_args(idx, ind.values),
                     callback=self.set_fitness,
                     error_callback=self.err_callback  # tb
-                )
-        pool.close()
-        pool.join()
+                ))
+        n_simulated = len(tasks) + len(batched)
+        if batched:
+            # at most batch_size per batch, but keep all workers busy
+            n_batches = max(math.ceil(len(batched) / self.batch_size),
+                            min(self.n_core, len(batched)))
+            for batch_idx in range(n_batches):
+                tasks.append(self.pool.apply_async(
+                    evaluate_batch,
+                    (batched[batch_idx::n_batches],),
+                    callback=self.set_batch_fitness,
+                    error_callback=self.err_callback))
+        # wait for all evaluations (callbacks are done before task is ready)
+        for task in tasks:
+            task.wait()
+        return n_simulated
+
+    def submit_evaluation(self, task_id, genes):
+        """Start evaluation of gene values in the worker pool (asynchronous mode).
+        The result of :func:`evaluate_genes` is put into `async_results` as soon as it is ready.
+
+        :param task_id: identifier of this evaluation, returned with the result
+        :type task_id: int
+        :param genes: attribute values of the individual to evaluate
+        :type genes: list
+        """
+        def on_error(err_msg):
+            self.err_callback(err_msg)
+            # report failed evaluation, so it is not waited for forever
+            self.async_results.put((task_id, None, None, None, 'error'))
+
+        self.start_pool()
+        self.pool.apply_async(
+            evaluate_genes,
+            self.task_args(task_id, genes),
+            callback=self.async_results.put,
+            error_callback=on_error)
+
+    def steady_state(self, result, start_gen):
+        """Asynchronous steady-state evolution.
+
+        Keeps `n_core` evaluations running at all times. As soon as one evaluation is finished,
+        its individual is merged into the population, the population is reduced to
+        `population_size` by non-dominated sorting and crowding distance
+        and a new child of the current population is submitted.
+        The number of evaluations is the same as for the generational GA
+        (`population_size` evaluations per generation).
+        Every `population_size` evaluations count as one generation
+        for statistics, plots, intermediate results and checkpoints.
+
+        :param result: current pareto front
+        :type result: list of :class:`Individual`
+        :param start_gen: number of finished generations
+        :type start_gen: int
+        :return: pareto front and number of finished generations
+        :rtype: tuple(list of :class:`Individual`, int)
+        """
+        self.async_results = queue.Queue()
+        # remaining number of evaluations
+        budget = (self.n_generation - start_gen) * self.population_size
+        # running evaluations: task ID -> individual
+        pending = {}
+        n_submitted = 0
+        n_done = 0
+        n_finished = start_gen
+        n_simulated = 0
+        # failed evaluations of current virtual generation by reason
+        failures = {}
+        start_time = gen_start = time.perf_counter()
+
+        while True:
+            # keep all workers busy
+            new_children = []
+            while len(pending) + len(new_children) < self.n_core and n_submitted < budget:
+                # only children not seen before allowed in population
+                for tries in range(1000 * self.population_size):
+                    child = self.new_child()
+                    if str(child) not in self.evaluated:
+                        break
+                else:
+                    print("Warning: number of retries exceeded. No new configuration found.")
+                    break
+                # block, so not in population again
+                self.evaluated[str(child)] = None
+                n_submitted += 1
+                archived = None if self.archive is None else self.archive.get(child.values)
+                if archived is None:
+                    # model and objectives are already known to the workers: only send genes
+                    pending[n_submitted] = child
+                    self.submit_evaluation(n_submitted, child.values)
+                else:
+                    # evaluated in previous run
+                    child.fitness, child.kpis = archived
+                    self.evaluated[str(child)] = child
+                    new_children.append(child)
+
+            if not new_children:
+                if not pending:
+                    # budget used up or no new children could be generated
+                    break
+                # wait for next finished evaluation
+                finished = self.async_results.get()
+                child = pending.pop(finished[0])
+                self.update_individual(child, *finished[1:])
+                new_children.append(child)
+                n_simulated += 1
+                if child.failure is not None:
+                    failures[child.failure] = failures.get(child.failure, 0) + 1
+
+            for child in new_children:
+                n_done += 1
+                if child.fitness is not None:
+                    # merge into population, keep best individuals
+                    self.population.append(child)
+                    pop_idx, fronts = nds.select_by_rank_and_crowding(
+                        [ind.fitness for ind in self.population], self.population_size)
+                    result = [self.population[i] for i in fronts[0]]
+                    self.front_fitness = [ind.fitness for ind in result]
+                    self.population = [self.population[i] for i in pop_idx]
+
+                self.evaluation_stats.append({
+                    'evaluation': start_gen * self.population_size + n_done,
+                    'time': time.perf_counter() - start_time,
+                    'valid': child.fitness is not None,
+                    'front_size': len(result),
+                })
+
+                if n_done % self.population_size == 0:
+                    # status update every population_size evaluations
+                    n_finished += 1
+                    self.generation_stats.append({
+                        'generation': n_finished,
+                        'n_evaluated': n_simulated,
+                        'n_valid': len(self.population),
+                        'time': time.perf_counter() - gen_start,
+                        'failures': failures,
+                    })
+                    if failures:
+                        print("Failed evaluations: {}".format(failures))
+                    gen_start = time.perf_counter()
+                    n_simulated = 0
+                    failures = {}
+
+                    print("The best front after {} evaluations (generation # {} / {}) is".format(
+                        n_finished * self.population_size, n_finished, self.n_generation))
+                    for i, v in enumerate(result):
+                        print(i, v, v.fitness)
+                    print("\n")
+
+                    if self.save_intermediate_results:
+                        self.save_intermediate_result(result)
+                    self.send_progress('Front after {} evaluations'.format(
+                        n_finished * self.population_size), result)
+                    # running evaluations are repeated after resume
+                    self.save_checkpoint('ga', result, n_finished)
+
+        if n_done < budget:
+            print("Aborting after {} evaluations.".format(n_done))
+        return result, n_finished
+
+    def next_generation(self, gen):
+        """Generate children of the population, evaluate them
+        and select the individuals of the next generation.
+
+        :param gen: index of this generation
+        :type gen: int
+        :return: pareto front of the new population (empty if no individual is valid),
+            None if no new children could be generated
+        :rtype: list of :class:`Individual`
+        """
+        gen_start = time.perf_counter()
+
+        # generate offspring
+        children = []
+
+        # with surrogate: generate more candidates, simulate only the best
+        surrogate = self.surrogate_model() if self.surrogate else None
+        n_children = self.population_size
+        if surrogate is not None:
+            n_children *= self.surrogate_candidates
+
+        # only children not seen before allowed in population
+        # set upper bound for maximum number of generated children
+        # population may not be pop_size big (invalid individuals)
+        for tries in range(1000 * self.population_size):
+            if (len(children) == n_children):
+                # population full (pop_size new individuals)
+                break
+
+            child = self.new_child()
+
+            # check if child configuration has been seen before
+            # (other islands may generate children at the same time)
+            fingerprint = str(child)
+            with self.evaluated_lock:
+                if fingerprint not in self.evaluated:
+                    # child config not seen so far
+                    children.append(child)
+                    # block, so not in population again
+                    self.evaluated[fingerprint] = None
+        else:
+            print("Warning: number of retries exceeded. "
+                  "{} new configurations generated.".format(len(children)))
+
+        if len(children) == 0:
+            return None
+
+        if surrogate is not None:
+            children = self.prescreen(children, surrogate)
+
+        if self.fidelity:
+            # simulate only children that are promising at low fidelity
+            children = self.screen(children)
+
+        # New population generated (parents + children)
+        self.population += children
+
+        # evaluate generated population
+        n_evaluated = self.compute_fitness()
+        failures = count_failures(self.population)
+
+        # filter out individuals with invalid fitness values
+        self.population = list(filter(
+            lambda ind: ind is not None and ind.fitness is not None, self.population))
+
+        self.generation_stats.append({
+            'generation': gen + 1,
+            'n_evaluated': n_evaluated,
+            'n_valid': len(self.population),
+            'time': time.perf_counter() - gen_start,
+            'failures': failures,
+        })
+        if failures:
+            print("Failed evaluations: {}".format(failures))
+
+        if len(self.population) == 0:
+            return []
+
+        # sort population by fitness into fronts
+        # select individuals on pareto front, depending on fitness and distance
+        pop_idx, fronts = nds.select_by_rank_and_crowding(
+            [ind.fitness for ind in self.population], self.population_size)
+
+        # save pareto front
+        # values/fitness tuples for all non-dominated individuals
+        front = [self.population[i] for i in fronts[0]]
+        self.front_fitness = [ind.fitness for ind in front]
+        self.population = [self.population[i] for i in pop_idx]
+        return front
+
+    def make_islands(self):
+        """Split the optimization into `n_islands` islands.
+
+        Each island is a shallow copy of this optimization with its own population,
+        statistics and workers. The cores and the children per generation are divided
+        among the islands. All islands share the `evaluated` dictionary and the archive.
+        The current population is dealt out to the islands.
+
+        :return: islands
+        :rtype: list of :class:`Optimization`
+        """
+        islands = []
+        for idx in range(self.n_islands):
+            island = copy.copy(self)
+            island.n_core = self.n_core // self.n_islands + (idx < self.n_core % self.n_islands)
+            island.n_core = max(island.n_core, 1)
+            island.population_size = max(self.population_size // self.n_islands, 2)
+            island.population = self.population[idx::self.n_islands]
+            island.generation_stats = []
+            island.front_fitness = []
+            # one broker for all islands, otherwise own worker group
+            island.pool = self.pool if self.evaluator == 'distributed' else None
+            # progress is only reported by the main optimization
+            island.plot_progress = False
+            island.save_intermediate_results = False
+            island.checkpoint_file = None
+            islands.append(island)
+        return islands
+
+    def evolve(self, start_gen, n_gen):
+        """Evolve the population of an island for some generations.
+
+        :param start_gen: number of finished generations
+        :type start_gen: int
+        :param n_gen: number of generations to run
+        :type n_gen: int
+        :return: False if no new children could be generated, True otherwise
+        :rtype: boolean
+        """
+        for gen in range(start_gen, start_gen + n_gen):
+            if self.next_generation(gen) is None:
+                return False
+        return True
+
+    def migrate(self, islands):
+        """Copy the best `n_migrants` individuals of each island to the next island (ring).
+
+        The migrants are selected by rank and crowding distance before any island
+        receives new individuals. Individuals already in the population of the
+        receiving island are not added again.
+
+        :param islands: islands, see :meth:`make_islands`
+        :type islands: list of :class:`Optimization`
+        """
+        migrants = []
+        for island in islands:
+            if island.population and self.n_migrants > 0:
+                pop_idx, _ = nds.select_by_rank_and_crowding(
+                    [ind.fitness for ind in island.population], self.n_migrants)
+                migrants.append([island.population[i] for i in pop_idx])
+            else:
+                migrants.append([])
+        for idx, island in enumerate(islands):
+            known = set(str(ind) for ind in island.population)
+            for ind in migrants[idx - 1]:
+                if str(ind) not in known:
+                    island.population.append(ind)
+
+    def run_islands(self, result, start_gen):
+        """Evolve `n_islands` sub-populations in parallel (island model).
+
+        Each island runs `migration_interval` generations on its own workers
+        without waiting for the others. Then, the best individuals migrate
+        to the next island (see :meth:`migrate`) and the pareto front of all islands
+        is reported like a generation: statistics, plots, intermediate results and checkpoints.
+
+        :param result: current pareto front
+        :type result: list of :class:`Individual`
+        :param start_gen: number of finished generations
+        :type start_gen: int
+        :return: pareto front and number of finished generations
+        :rtype: tuple(list of :class:`Individual`, int)
+        """
+        islands = self.make_islands()
+        n_finished = start_gen
+        active = list(islands)
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_islands) as executor:
+                while n_finished < self.n_generation and active:
+                    n_gen = min(self.migration_interval, self.n_generation - n_finished)
+                    futures = [executor.submit(island.evolve, n_finished, n_gen)
+                               for island in active]
+                    # re-raises errors of islands
+                    active = [island for island, future in zip(active, futures)
+                              if future.result()]
+                    if not active:
+                        print("Aborting.")
+
+                    # one entry per generation, islands run at the same time
+                    for gen in range(n_finished, n_finished + n_gen):
+                        stats = [s for island in islands for s in island.generation_stats
+                                 if s['generation'] == gen + 1]
+                        if not stats:
+                            continue
+                        failures = {}
+                        for s in stats:
+                            for reason, count in s['failures'].items():
+                                failures[reason] = failures.get(reason, 0) + count
+                        self.generation_stats.append({
+                            'generation': gen + 1,
+                            'n_evaluated': sum(s['n_evaluated'] for s in stats),
+                            'n_valid': sum(s['n_valid'] for s in stats),
+                            'time': max(s['time'] for s in stats),
+                            'failures': failures,
+                        })
+                        n_finished = gen + 1
+
+                    self.migrate(islands)
+                    # same individual may be on several islands
+                    self.population = list({
+                        str(ind): ind for island in islands for ind in island.population}.values())
+                    if not self.population:
+                        print("No individuals left. Building new population.")
+                        self.save_checkpoint('ga', result, n_finished)
+                        continue
+
+                    fronts = nds.non_dominated_fronts([ind.fitness for ind in self.population])
+                    result = [self.population[i] for i in fronts[0]]
+                    self.front_fitness = [ind.fitness for ind in result]
+
+                    print("The best front of {} islands after generation # {} / {} is".format(
+                        self.n_islands, n_finished, self.n_generation))
+                    for i, v in enumerate(result):
+                        print(i, v, v.fitness)
+                    print("\n")
+
+                    if self.save_intermediate_results:
+                        self.save_intermediate_result(result)
+                    self.send_progress('Front for Generation #{}'.format(n_finished), result)
+                    # population of all islands, dealt out again on resume
+                    self.save_checkpoint('ga', result, n_finished)
+        finally:
+            for island in islands:
+                if island.pool is not self.pool:
+                    island.close_pool()
+        return result, n_finished
+
+    def send_progress(self, title, individuals):
+        """Show individuals in the progress plot (if *plot_progress* is set)
+
+        :param title: title of the plot
+        :type title: string
+        :param individuals: individuals to show, e.g. the current pareto front
+        :type individuals: list of :class:`Individual`
+        """
+        if self.plot_progress and self.plot_process.is_alive():
+            stats = self.generation_stats[-1] if self.generation_stats else None
+            self.plot_pipe_tx.send(progress_message(title, individuals, stats))
 
     def save_intermediate_result(self, result):
         """Dump result into pickle file in current working directory.
@@ -841,7 +2279,69 @@ class Optimization:
         self.current_result_file_name = new_result_file_name
         print("Save intermediate results in {}".format(new_result_file_name))
 
-    def gradient_ascent(self, result):
+    def save_checkpoint(self, phase, result, generation, av_idx=0, search_state=None):
+        """Save the state of the optimization to `checkpoint_file` (if set).
+
+        :param phase: current phase, 'ga', 'gradient_ascent', 'pattern_search' or 'finished'
+        :type phase: string
+        :param result: current pareto front
+        :type result: list of :class:`Individual`
+        :param generation: number of finished generations
+        :type generation: int
+        :param av_idx: index of next attribute of gradient ascent
+        :type av_idx: int
+        :param search_state: state of each solution of the pattern search
+        :type search_state: list of dicts
+        """
+        if not self.checkpoint_file:
+            return
+        state = {
+            'phase': phase,
+            'generation': generation,
+            'av_idx': av_idx,
+            'search_state': search_state,
+            'result': result,
+            'population': self.population,
+            'evaluated': self.evaluated,
+            'generation_stats': self.generation_stats,
+            'evaluation_stats': self.evaluation_stats,
+            'random_state': random.getstate(),
+            'attribute_variation': [
+                [av.comp_name, av.comp_attribute] for av in self.attribute_variation],
+        }
+        # write to temporary file first, so a crash never leaves a broken checkpoint
+        tmp_file_name = self.checkpoint_file + '.tmp'
+        with open(tmp_file_name, 'wb') as checkpoint:
+            pickle.dump(state, checkpoint)
+        os.replace(tmp_file_name, self.checkpoint_file)
+
+    def load_checkpoint(self, file_name):
+        """Restore the state of the optimization from a checkpoint file.
+
+        :param file_name: checkpoint file written by :func:`save_checkpoint`
+        :type file_name: string
+        :return: saved state (phase, result, generation, av_idx)
+        :rtype: dict
+        :raises: `AssertionError` if the attribute variations do not match the checkpoint
+        """
+        with open(file_name, 'rb') as checkpoint:
+            state = pickle.load(checkpoint)
+        assert state['attribute_variation'] == [
+            [av.comp_name, av.comp_attribute] for av in self.attribute_variation], \
+            "Attribute variations don't match checkpoint"
+        self.population = state['population']
+        # individuals without entry were still being evaluated (asynchronous mode),
+        # individuals with RETRY_FAILURES are evaluated again
+        self.evaluated = {k: v for k, v in state['evaluated'].items()
+                          if v is not None and v.failure not in RETRY_FAILURES}
+        self.generation_stats = state['generation_stats']
+        self.evaluation_stats = state.get('evaluation_stats', [])
+        random.setstate(state['random_state'])
+        print("Resume from {} ({}, generation {})".format(
+            file_name, state['phase'], state['generation']))
+        return state
+
+    def gradient_ascent(self, result, generation=None, start_av_idx=0):
         """Try to fine-tune result(s) with gradient ascent
 
         Attributes are assumed to be independent and varied separately.
@@ -849,6 +2349,10 @@ class Optimization:
 
         :param result: result from GA
         :type result: list of :class:`Individual`
+        :param generation: number of generations of the GA, saved in checkpoints
+        :type generation: int, optional
+        :param start_av_idx: index of the first attribute to vary (to resume). Defaults to 0
+        :type start_av_idx: int, optional
         :return: improved result
         :rtype: list of :class:`Individual`
         """
@@ -869,6 +2373,9 @@ class Optimization:
         num_results = len(new_result)
 
         for av_idx, av in enumerate(self.attribute_variation):
+            if av_idx < start_av_idx:
+                # already done before checkpoint
+                continue
             # iterate attribute variations (assumed to be independent)
             print("Gradient descending {} / {}".format(av_idx+1, len(self.attribute_variation)))
             step_size = av.val_step or 1.0  # required for ascent
@@ -991,27 +2498,139 @@ class Optimization:
                 step = new_step
 
                 # show current result in plot
-                if self.plot_progress and self.plot_process.is_alive():
-                    self.plot_pipe_tx.send({
-                        'title': 'Gradient descending AV #{}'.format(av_idx+1),
-                        'values': new_result
-                    })
+                self.send_progress('Gradient descending AV #{}'.format(av_idx+1), new_result)
 
             # no more changes in any solution for this AV: give status update
             if self.save_intermediate_results:
                 self.save_intermediate_result(new_result)
+            self.save_checkpoint('gradient_ascent', new_result, generation, av_idx + 1)
 
             # show current result in plot
-            if self.plot_progress and self.plot_process.is_alive():
-                self.plot_pipe_tx.send({
-                    'title': 'Front after gradient descending AV #{}'.format(av_idx+1),
-                    'values': new_result
-                })
+            self.send_progress(
+                'Front after gradient descending AV #{}'.format(av_idx+1), new_result)
 
             # change next AV
 
         return new_result
 
+    def pattern_neighbours(self, parent, patterns=()):
+        """Neighbours of a solution for the pattern search
+
+        :param parent: current solution
+        :type parent: :class:`Individual`
+        :param patterns: combined directions (change of each gene) to try first
+        :type patterns: list of tuples
+        :return: direction and neighbour, without duplicates and neighbours equal to parent
+        :rtype: list of tuple(tuple, :class:`Individual`)
+        """
+        directions = list(patterns)
+        for av_idx, av in enumerate(self.attribute_variation):
+            # one step in each direction of each attribute
+            for sign in [1, -1]:
+                direction = [0] * len(self.attribute_variation)
+                direction[av_idx] = sign * (av.val_step or 1.0)
+                directions.append(tuple(direction))
+
+        neighbours = []
+        seen = {str(parent)}
+        for direction in directions:
+            child = Individual([
+                min(max(gene + delta, av.val_min), av.val_max)
+                for gene, delta, av in zip(parent, direction, self.attribute_variation)])
+            fingerprint = str(child)
+            if fingerprint in seen:
+                # clipped to same configuration
+                continue
+            seen.add(fingerprint)
+            neighbours.append((direction, child))
+        return neighbours
+
+    def pattern_search(self, result, generation=None, search_state=None):
+        """Try to fine-tune result(s) with a parallel pattern search
+
+        All neighbours of all active solutions are evaluated at once.
+        Solutions with the same fitness are ignored.
+
+        :param result: result from GA
+        :type result: list of :class:`Individual`
+        :param generation: number of generations of the GA, saved in checkpoints
+        :type generation: int, optional
+        :param search_state: state of each solution to resume from (see :meth:`save_checkpoint`)
+        :type search_state: list of dicts, optional
+        :return: improved result
+        :rtype: list of :class:`Individual`
+        """
+        if search_state is None:
+            new_result = []
+            # ignore solutions with identical fitness
+            for ind in result:
+                if not any(ind.fitness == other.fitness for other in new_result):
+                    new_result.append(ind)
+            # active: solution may still improve. patterns: combined directions to try
+            search_state = [{'active': True, 'patterns': []} for _ in new_result]
+        else:
+            new_result = list(result)
+
+        iteration = 0
+        while any(s['active'] for s in search_state):
+            iteration += 1
+            print("Pattern search iteration {} ({} / {} solutions active)".format(
+                iteration, sum(s['active'] for s in search_state), len(new_result)))
+
+            # neighbours of all active solutions, evaluated together
+            neighbours = {}
+            batch = {}
+            for i, parent in enumerate(new_result):
+                if not search_state[i]['active']:
+                    continue
+                neighbours[i] = []
+                for direction, child in self.pattern_neighbours(
+                        parent, search_state[i]['patterns']):
+                    fingerprint = str(child)
+                    # take evaluated if exists, evaluate shared neighbours only once
+                    if self.evaluated.get(fingerprint) is not None:
+                        child = self.evaluated[fingerprint]
+                    else:
+                        child = batch.setdefault(fingerprint, child)
+                    neighbours[i].append((direction, child))
+            self.population = list(batch.values())
+            self.compute_fitness()
+
+            for i, family in neighbours.items():
+                parent = new_result[i]
+                better = [(d, child) for d, child in family if child.dominates(parent)]
+                if not better:
+                    # local optimum: no neighbour dominates
+                    search_state[i] = {'active': False, 'patterns': []}
+                    continue
+                # first neighbour (combined directions first) not dominated by other neighbours
+                move, best = next(
+                    (d, child) for d, child in better
+                    if not any(other.dominates(child) for _, other in better))
+                # combine improving steps of single attributes (first one of each attribute)
+                combined = [0] * len(move)
+                for direction, _ in better:
+                    changed = [j for j, delta in enumerate(direction) if delta]
+                    if len(changed) == 1 and not combined[changed[0]]:
+                        combined[changed[0]] = direction[changed[0]]
+                # next iteration: repeat move and try combined direction from old position
+                patterns = [move, tuple(c - m for c, m in zip(combined, move))]
+                new_result[i] = best
+                search_state[i] = {
+                    'active': True,
+                    'patterns': [d for d in patterns if any(d)],
+                }
+
+            if self.save_intermediate_results:
+                self.save_intermediate_result(new_result)
+            self.save_checkpoint('pattern_search', new_result, generation,
+                                 search_state=search_state)
+
+            # show current result in plot
+            self.send_progress('Pattern search iteration #{}'.format(iteration), new_result)
+
+        return new_result
+
     def run(self):
         """Main GA function
 
@@ -1019,124 +2638,102 @@ class Optimization:
         :rtype: list of :class:`Individual`
         """
 
-        random.seed()  # init RNG
+        state = None
+        if self.resume_from:
+            # restores population, evaluated individuals and RNG
+            state = self.load_checkpoint(self.resume_from)
+        else:
+            random.seed()  # init RNG
 
         print('\n+++++++ START GENETIC ALGORITHM +++++++')
         print('The optimization parameters chosen are:')
         print('  population_size: {}'.format(self.population_size))
         print('  n_generation:    {}'.format(self.n_generation))
         print('  n_core:          {}'.format(self.n_core))
+        print('  bytes sent per evaluation: {} (full model: {})'.format(
+            *self.ipc_bytes_per_evaluation()))
         print('+++++++++++++++++++++++++++++++++++++++\n')
 
-        result = []
-
-        for gen in range(self.n_generation):
-
-            # generate offspring
-            children = []
-
-            # only children not seen before allowed in population
-            # set upper bound for maximum number of generated children
-            # population may not be pop_size big (invalid individuals)
-            for tries in range(1000 * self.population_size):
-                if (len(children) == self.population_size):
-                    # population full (pop_size new individuals)
-                    break
-
-                # get random parents from pop_size best results
-                try:
-                    [parent1, parent2] = random.sample(self.population, 2)
-                    # crossover and mutate parents
-                    child = mutate(crossover(parent1, parent2), self.attribute_variation)
-                except ValueError:
-                    # not enough parents left / initial generation: generate random configuration
-                    individual = []
-                    for av in self.attribute_variation:
-                        if av.val_step:
-                            value = random.randrange(0, av.num_steps) * av.val_step + av.val_min
-                        else:
-                            value = random.uniform(av.val_min, av.val_max)
-                        individual.append(value)
-                    child = Individual(individual)
-
-                # check if child configuration has been seen before
-                fingerprint = str(child)
-                if fingerprint not in self.evaluated:
-                    # child config not seen so far
-                    children.append(child)
-                    # block, so not in population again
-                    self.evaluated[fingerprint] = None
-            else:
-                print("Warning: number of retries exceeded. \
-{} new configurations generated.".format(len(children)))
-
-            if len(children) == 0:
-                # no new children could be generated
-                print("Aborting.")
-                break
-
-            # New population generated (parents + children)
-            self.population += children
-
-            # evaluate generated population
-            self.compute_fitness()
-
-            # filter out individuals with invalid fitness values
-            self.population = list(
-                filter(lambda ind: ind is not None and ind.fitness is not None, self.population))
-
-            if len(self.population) == 0:
-                # no configuration  was successful
-                print("No individuals left. Building new population.")
-                continue
-
-            # sort population by fitness
-            f1_vals2 = [i.fitness[0] for i in self.population]
-            f2_vals2 = [i.fitness[1] for i in self.population]
-            FNDS = fast_non_dominated_sort(self.population)
-            CDF_values = [CDF(f1_vals2, f2_vals2, len(NDS)) for NDS in FNDS]
-
-            # select individuals on pareto front, depending on fitness and distance
-            pop_idx = []
-            for i in range(0, len(FNDS)):
-                FNDS2 = [FNDS[i].index(FNDS[i][j]) for j in range(0, len(FNDS[i]))]
-                front22 = sort_by_values(len(FNDS2), CDF_values[i])
-                front = [FNDS[i][front22[j]] for j in range(0, len(FNDS[i]))]
-                front.reverse()
-                pop_idx += [v for v in front[:self.population_size-len(pop_idx)]]
-                if (len(pop_idx) == self.population_size):
+        # worker processes are kept alive for all generations and the post processing
+        # (local islands start their own workers)
+        if self.n_islands == 1 or self.evaluator == 'distributed':
+            self.start_pool()
+        try:
+            result = [] if state is None else state['result']
+            self.front_fitness = [ind.fitness for ind in result]
+            # number of finished generations
+            n_finished = 0 if state is None else state['generation']
+            start_gen = n_finished
+            if state is not None and state['phase'] != 'ga':
+                # GA already finished
+                start_gen = self.n_generation
+
+            if self.asynchronous and start_gen < self.n_generation:
+                # no generations: evolve population with every finished evaluation
+                result, n_finished = self.steady_state(result, start_gen)
+                start_gen = self.n_generation
+
+            if self.n_islands > 1 and start_gen < self.n_generation:
+                # sub-populations with their own workers, exchange best individuals
+                result, n_finished = self.run_islands(result, start_gen)
+                start_gen = self.n_generation
+
+            for gen in range(start_gen, self.n_generation):
+                front = self.next_generation(gen)
+
+                if front is None:
+                    # no new children could be generated
+                    print("Aborting.")
                     break
 
-            # save pareto front
-            # values/fitness tuples for all non-dominated individuals
-            result = [self.population[i] for i in FNDS[0]]
-
-            # print info of current pareto front
-            print("The best front for Generation # {} / {} is".format(
-                gen+1, self.n_generation))
-            for i, v in enumerate(FNDS[0]):
-                print(i, self.population[v], self.population[v].fitness)
-            print("\n")
-
-            # save result to file
-            if self.save_intermediate_results:
-                self.save_intermediate_result(result)
-
-            # show current pareto front in plot
-            if self.plot_progress and self.plot_process.is_alive():
-                self.plot_pipe_tx.send({
-                    'title': 'Front for Generation #{}'.format(gen + 1),
-                    'values': result
-                })
-
-            self.population = [self.population[i] for i in pop_idx]
-
-            # next generation
-
-        result.sort(key=lambda v: -v.fitness[0])
-
-        if self.post_processing:
-            result = self.gradient_ascent(result)
+                if len(front) == 0:
+                    # no configuration  was successful
+                    print("No individuals left. Building new population.")
+                    n_finished = gen + 1
+                    self.save_checkpoint('ga', result, n_finished)
+                    continue
+
+                result = front
+
+                # print info of current pareto front
+                print("The best front for Generation # {} / {} ({:.1f} s) is".format(
+                    gen+1, self.n_generation, self.generation_stats[-1]['time']))
+                for i, v in enumerate(result):
+                    print(i, v, v.fitness)
+                print("\n")
+
+                # save result to file
+                if self.save_intermediate_results:
+                    self.save_intermediate_result(result)
+
+                # show current pareto front in plot
+                self.send_progress('Front for Generation #{}'.format(gen + 1), result)
+
+                n_finished = gen + 1
+                self.save_checkpoint('ga', result, n_finished)
+
+                # next generation
+
+            result.sort(key=lambda v: -v.fitness[0])
+
+            if self.post_processing == 'pattern_search' and (
+                    state is None or state['phase'] != 'finished'):
+                search_state = None
+                if state is not None and state['phase'] == 'pattern_search':
+                    search_state = state['search_state']
+                result = self.pattern_search(result, n_finished, search_state)
+            elif self.post_processing and (state is None or state['phase'] != 'finished'):
+                start_av_idx = 0
+                if state is not None and state['phase'] == 'gradient_ascent':
+                    start_av_idx = state['av_idx']
+                result = self.gradient_ascent(result, n_finished, start_av_idx)
+            # post processing may change the order
+            result.sort(key=lambda v: -v.fitness[0])
+            self.save_checkpoint('finished', result, n_finished)
+        finally:
+            self.close_pool()
+            if self.archive is not None:
+                self.archive.close()
 
         print('\n+++++++ GENETIC ALGORITHM FINISHED +++++++')
         for i, attr in enumerate(self.attribute_variation):
@@ -1145,6 +2742,9 @@ class Optimization:
 
         for i, v in enumerate(result):
             print(i, v.values, " -> ", dict(zip(self.objective_names, v.fitness)))
+        if self.archive is not None:
+            print('{} evaluations taken from archive {}'.format(
+                self.archive.hits, self.archive_file))
         print('+++++++++++++++++++++++++++++++++++++++++++\n')
 
         if self.plot_progress and self.plot_process.is_alive():
@@ -0,0 +1,519 @@
+"""Parameter sweeps (design of experiments) over component attributes.
+
+*****
+Scope
+*****
+Sensitivity studies evaluate a model for many given combinations of component attributes,
+e.g. to see how the costs depend on the size of a storage and a PV plant.
+Unlike the genetic algorithm of :mod:`~smooth.optimization.run_optimization`,
+a sweep evaluates a fixed set of configurations (the design), all of them in parallel.
+
+*******
+Concept
+*******
+The varied attributes are described like the attribute variations of the optimization
+(see :class:`~smooth.optimization.run_optimization.AttributeVariation`).
+The design is one of:
+
+* *full_factorial*: all combinations of the values of all attributes.
+  Attributes with *val_step* take all steps from *val_min* to *val_max*,
+  other attributes take *levels* equally spaced values
+* *latin_hypercube*: *n_samples* random points. The range of each attribute is divided
+  into *n_samples* intervals and each interval is used by exactly one point
+* *sobol*: the first *n_samples* points of a Sobol sequence (up to 21 attributes),
+  a deterministic low-discrepancy sequence that fills the space evenly
+
+Points of *latin_hypercube* and *sobol* designs are rounded to the *val_step* of
+an attribute if given. Points with the same values are only evaluated once.
+
+The design is evaluated on a pool of worker processes, which get the model only once
+(see :func:`~smooth.optimization.run_optimization.init_worker`).
+Evaluations can be cached in an *archive_file*, shared with other sweeps
+of the same model and KPIs (see :mod:`~smooth.optimization.fitness_archive`).
+A point whose worker process dies during its evaluation (e.g. killed by the operating
+system when out of memory) fails with reason *lost*, the sweep continues with the other points.
+With *evaluation_timeout* or *evaluation_memory_limit*, each evaluation runs in its own process
+like in the optimization
+(see :func:`~smooth.optimization.resource_limits.run_with_limits`).
+Each finished point is written as one row to the CSV *output_file* immediately:
+the index of the point in the design, the attribute values, the KPIs and
+the reason of a failure (empty if successful). With *resume* set, points already
+in the output file are not evaluated again, so a stopped sweep can be continued.
+
+Example::
+
+    sweep_config = {
+        'design': 'latin_hypercube',
+        'n_samples': 100,
+        'attribute_variation': [
+            {'comp_name': 'h2_storage', 'comp_attribute': 'storage_capacity',
+             'val_min': 0, 'val_max': 1000, 'val_step': 10},
+            {'comp_name': 'pv', 'comp_attribute': 'nominal_value', 'val_min': 0, 'val_max': 5e5},
+        ],
+        'kpis': {'costs': lambda x: sum(c.results['annuity_total'] for c in x)},
+        'output_file': 'sweep.csv',
+    }
+    rows = run_sweep(sweep_config, mymodel)
+"""
+
+import csv
+import itertools
+import math
+import multiprocessing as mp
+import os
+import queue
+
+import dill
+import numpy as np
+
+from smooth.optimization.fitness_archive import FitnessArchive, function_source, model_hash
+from smooth.optimization.run_optimization import AttributeVariation, evaluate_genes, init_worker
+
+# seconds between checks for lost evaluations
+LIVENESS_INTERVAL = 1
+
+# shared with the worker processes of a sweep: process id of the worker of each started point
+started_by = None
+
+
+def init_sweep_worker(started, *args):
+    """Prepare a worker process of a sweep
+
+    :param started: shared array for the process id of the worker of each point
+    :type started: `multiprocessing.Array`
+    :param args: arguments of :func:`~smooth.optimization.run_optimization.init_worker`
+    """
+    global started_by
+    started_by = started
+    init_worker(*args)
+
+
+def evaluate_point(position, idx, values):
+    """Evaluate a point of a sweep in a worker process
+
+    :param position: position of the point in the evaluated points
+    :type position: int
+    :param idx: index of the point in the design
+    :type idx: int
+    :param values: attribute values
+    :type values: list
+    :return: result of :func:`~smooth.optimization.run_optimization.evaluate_genes`
+    :rtype: tuple
+    """
+    # tell the sweep which process evaluates this point
+    started_by[position] = os.getpid()
+    return evaluate_genes(idx, values)
+
+
+# primitive polynomials (degree, coefficients) and initial direction numbers
+# of the Sobol sequence for dimensions 2 to 21 (Joe and Kuo)
+SOBOL_DIRECTIONS = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+    (5, 11, [1, 1, 5, 1, 1]),
+    (5, 13, [1, 1, 1, 3, 11]),
+    (5, 14, [1, 3, 5, 5, 31]),
+    (6, 1, [1, 3, 3, 9, 7, 49]),
+    (6, 13, [1, 1, 1, 15, 21, 21]),
+    (6, 16, [1, 3, 1, 13, 27, 49]),
+    (6, 19, [1, 1, 1, 15, 7, 5]),
+    (6, 22, [1, 3, 1, 15, 13, 25]),
+    (6, 25, [1, 1, 5, 5, 19, 61]),
+    (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+    (7, 4, [1, 3, 7, 13, 13, 15, 69]),
+]
+
+
+def sobol_points(n_samples, n_dim, bits=32):
+    """First points of the Sobol sequence in the unit cube (without scrambling).
+
+    :param n_samples: number of points
+    :type n_samples: int
+    :param n_dim: number of dimensions (at most 21)
+    :type n_dim: int
+    :param bits: precision of the points in bits. Defaults to 32
+    :type bits: int, optional
+    :return: points (n_samples x n_dim)
+    :rtype: numpy array
+    :raises: *ValueError* if there are too many dimensions
+    """
+    if n_dim > len(SOBOL_DIRECTIONS) + 1:
+        raise ValueError("Sobol design supports at most {} attributes".format(
+            len(SOBOL_DIRECTIONS) + 1))
+    directions = np.zeros((n_dim, bits), dtype=np.uint64)
+    # first dimension: van der Corput sequence
+    directions[0] = [1 << (bits - 1 - i) for i in range(bits)]
+    for dim in range(1, n_dim):
+        degree, coefficients, initial = SOBOL_DIRECTIONS[dim - 1]
+        m = list(initial)
+        for i in range(degree, bits):
+            value = m[i - degree] ^ (m[i - degree] << degree)
+            for k in range(1, degree):
+                if (coefficients >> (degree - 1 - k)) & 1:
+                    value ^= m[i - k] << k
+            m.append(value)
+        directions[dim] = [m[i] << (bits - 1 - i) for i in range(bits)]
+
+    points = np.zeros((n_samples, n_dim))
+    state = np.zeros(n_dim, dtype=np.uint64)
+    for i in range(n_samples):
+        points[i] = state / 2.0 ** bits
+        # gray code: flip direction of lowest zero bit of i
+        lowest_zero = ((~i) & (i + 1)).bit_length() - 1
+        state ^= directions[:, lowest_zero]
+    return points
+
+
+def latin_hypercube_points(n_samples, n_dim, seed=None):
+    """Random points in the unit cube, stratified in each dimension.
+
+    :param n_samples: number of points
+    :type n_samples: int
+    :param n_dim: number of dimensions
+    :type n_dim: int
+    :param seed: seed of the random number generator. Defaults to None
+    :type seed: int, optional
+    :return: points (n_samples x n_dim)
+    :rtype: numpy array
+    """
+    rng = np.random.RandomState(seed)
+    points = np.zeros((n_samples, n_dim))
+    for dim in range(n_dim):
+        # one random point within each interval, intervals in random order
+        points[:, dim] = (rng.permutation(n_samples) + rng.uniform(size=n_samples)) / n_samples
+    return points
+
+
+def scale_point(point, attribute_variation):
+    """Scale a point of the unit cube to attribute values
+
+    :param point: coordinates in [0, 1) for each attribute
+    :type point: list of numbers
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of :class:`AttributeVariation`
+    :return: attribute values, on the *val_step* grid if given
+    :rtype: list
+    """
+    values = []
+    for u, av in zip(point, attribute_variation):
+        if av.val_step:
+            step = min(int(u * av.num_steps), av.num_steps - 1)
+            values.append(av.val_min + step * av.val_step)
+        else:
+            values.append(float(av.val_min + u * (av.val_max - av.val_min)))
+    return values
+
+
+def create_design(design, attribute_variation, n_samples=None, levels=5, seed=None):
+    """Generate the points of a design
+
+    :param design: type of design: 'full_factorial', 'latin_hypercube' or 'sobol'
+    :type design: string
+    :param attribute_variation: attribute variations
+    :type attribute_variation: list of :class:`AttributeVariation`
+    :param n_samples: number of points (not for full_factorial)
+    :type n_samples: int
+    :param levels: number of values of attributes without *val_step* (full_factorial).
+        Defaults to 5
+    :type levels: int, optional
+    :param seed: seed of the latin hypercube. Defaults to None
+    :type seed: int, optional
+    :return: attribute values of each point
+    :rtype: list of lists
+    :raises: *ValueError* for unknown designs
+    """
+    if design == 'full_factorial':
+        axes = []
+        for av in attribute_variation:
+            if av.val_step:
+                axes.append([av.val_min + i * av.val_step for i in range(av.num_steps)])
+            else:
+                axes.append(np.linspace(av.val_min, av.val_max, levels).tolist())
+        return [list(values) for values in itertools.product(*axes)]
+    if design == 'latin_hypercube':
+        points = latin_hypercube_points(n_samples, len(attribute_variation), seed)
+    elif design == 'sobol':
+        points = sobol_points(n_samples, len(attribute_variation))
+    else:
+        raise ValueError("Unknown design {}".format(design))
+    return [scale_point(point, attribute_variation) for point in points]
+
+
+class Sweep:
+    """Parameter sweep over component attributes
+
+    :param attribute_variation: attributes to vary
+    :type attribute_variation: list of dicts, see
+        :class:`~smooth.optimization.run_optimization.AttributeVariation`
+    :param model: smooth model
+    :type model: dict
+    :param design: 'full_factorial', 'latin_hypercube' or 'sobol'. Defaults to 'full_factorial'
+    :type design: string, optional
+    :param n_samples: number of points of latin_hypercube and sobol designs
+    :type n_samples: int, optional
+    :param levels: number of values of attributes without *val_step* in a full_factorial design.
+        Defaults to 5
+    :type levels: int, optional
+    :param seed: seed of the latin hypercube design. Defaults to 0
+    :type seed: int, optional
+    :param kpis: key performance indicators, computed from the result of `run_smooth`.
+        Defaults to annual costs and emissions
+    :type kpis: dict of functions, optional
+    :param n_core: number of worker processes. Defaults to all cores
+    :type n_core: int, optional
+    :param ignore_zero: ignore components with an attribute value of zero. Defaults to False
+    :type ignore_zero: boolean, optional
+    :param output_file: CSV file the rows are written to. Defaults to 'sweep.csv'
+    :type output_file: string, optional
+    :param resume: skip points already in *output_file*. Defaults to False (overwrite)
+    :type resume: boolean, optional
+    :param archive_file: SQLite file to look up and save evaluations.
+        Defaults to None (no archive)
+    :type archive_file: string, optional
+    :param evaluation_timeout: maximum time of one evaluation in seconds.
+        Defaults to None (no limit)
+    :type evaluation_timeout: number, optional
+    :param evaluation_memory_limit: maximum memory of one evaluation in MB.
+        Defaults to None (no limit)
+    :type evaluation_memory_limit: number, optional
+    :var points: attribute values of each point of the design
+    :type points: list of lists
+    :var columns: columns of the output file
+    :type columns: list of strings
+    :raises: `AssertionError` when a required argument is missing
+    """
+
+    def __init__(self, iterable=(), **kwargs):
+        # set defaults
+        self.design = 'full_factorial'
+        self.n_samples = None
+        self.levels = 5
+        self.seed = 0
+        self.n_core = None
+        self.ignore_zero = False
+        self.output_file = 'sweep.csv'
+        self.resume = False
+        self.archive_file = None
+        self.evaluation_timeout = None
+        self.evaluation_memory_limit = None
+        self.kpis = {
+            'costs': lambda x: sum([c.results["annuity_total"] for c in x]),
+            'emissions': lambda x: sum([c.results["annual_total_emissions"] for c in x]),
+        }
+        self.__dict__.update(iterable, **kwargs)
+
+        assert getattr(self, 'model', None), "No model given."
+        assert getattr(self, 'attribute_variation', None), "No attribute variation given."
+        self.attribute_variation = [AttributeVariation(av) for av in self.attribute_variation]
+        if self.design != 'full_factorial':
+            assert self.n_samples, "n_samples missing for {} design".format(self.design)
+        self.n_core = self.n_core or mp.cpu_count()
+
+        self.points = create_design(
+            self.design, self.attribute_variation, self.n_samples, self.levels, self.seed)
+        self.columns = (
+            ['point']
+            + ['{}.{}'.format(av.comp_name, av.comp_attribute) for av in self.attribute_variation]
+            + list(self.kpis) + ['failure'])
+
+        # opened while running
+        self.archive = None
+
+    def open_archive(self):
+        """Open the archive file
+
+        :return: archive, None if no *archive_file* is set
+        :rtype: :class:`~smooth.optimization.fitness_archive.FitnessArchive`
+        """
+        if not self.archive_file:
+            return None
+        # no objectives: fitness is always empty, KPIs are the result
+        return FitnessArchive(self.archive_file, model_hash(
+            self.model,
+            [[av.comp_name, av.comp_attribute] for av in self.attribute_variation],
+            sorted([name, function_source(f)] for name, f in self.kpis.items()),
+            self.ignore_zero))
+
+    def read_finished(self):
+        """Read rows of a previous run from the output file
+
+        :return: rows by point index
+        :rtype: dict
+        :raises: *ValueError* if the file does not belong to this design
+        """
+        finished = {}
+        if not os.path.exists(self.output_file):
+            return finished
+        with open(self.output_file, newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            if reader.fieldnames != self.columns:
+                raise ValueError("{} has other columns than this sweep".format(self.output_file))
+            for row in reader:
+                idx = int(row['point'])
+                values = [float(row[c]) for c in self.columns[1:len(self.points[0]) + 1]]
+                if idx >= len(self.points) or not np.allclose(values, self.points[idx]):
+                    raise ValueError("{} belongs to another design".format(self.output_file))
+                finished[idx] = self.parse_row(row)
+        return finished
+
+    def parse_row(self, row):
+        """Convert values of a row read from the output file
+
+        :param row: row as strings
+        :type row: dict
+        :return: row with numbers, None for missing values
+        :rtype: dict
+        """
+        parsed = {}
+        for column, value in row.items():
+            if column == 'failure':
+                parsed[column] = value or None
+            elif column == 'point':
+                parsed[column] = int(value)
+            else:
+                parsed[column] = float(value) if value != '' else None
+        return parsed
+
+    def make_row(self, idx, kpis, failure):
+        """Row of the output table
+
+        :param idx: index of the point
+        :type idx: int
+        :param kpis: KPIs of the point, None if failed
+        :type kpis: dict
+        :param failure: reason of failure, None if successful
+        :type failure: string
+        :return: row
+        :rtype: dict
+        """
+        row = {'point': idx}
+        row.update(zip(self.columns[1:], self.points[idx]))
+        for name in self.kpis:
+            row[name] = None if kpis is None else kpis.get(name)
+        if kpis is None and failure is None:
+            failure = 'error'
+        row['failure'] = failure
+        return row
+
+    def evaluate(self, points):
+        """Evaluate points on a pool of worker processes
+
+        :param points: index and attribute values of each point
+        :type points: list of tuples
+        :return: index, KPIs (None if failed) and reason of failure of each point,
+            in the order the evaluations finish
+        :rtype: generator of tuples
+        """
+        results = queue.Queue()
+        started = mp.Array('i', len(points), lock=False)
+        pool = mp.Pool(
+            processes=self.n_core, initializer=init_sweep_worker,
+            initargs=(started, self.model, self.attribute_variation, dill.dumps(()),
+                      self.ignore_zero, False, dill.dumps(self.kpis), None,
+                      self.evaluation_timeout, self.evaluation_memory_limit))
+        try:
+            # position in points -> index in design
+            pending = {}
+            for position, (idx, values) in enumerate(points):
+                pending[position] = idx
+                pool.apply_async(
+                    evaluate_point, (position, idx, values),
+                    callback=lambda result, position=position: results.put(
+                        (position, result[3], result[4])),
+                    error_callback=lambda err, position=position: results.put(
+                        (position, None, 'error')))
+            # started by a dead worker at the last check
+            suspects = set()
+            while pending:
+                try:
+                    position, kpis, failure = results.get(timeout=LIVENESS_INTERVAL)
+                except queue.Empty:
+                    # a pool loses the task of a dead worker: its callback is never called.
+                    # Lost if still missing at the next check (result may be on its way)
+                    alive = set(process.pid for process in mp.active_children())
+                    dead = set(position for position in pending
+                               if started[position] and started[position] not in alive)
+                    for position in dead & suspects:
+                        print("Sweep: worker of point {} died".format(pending[position]))
+                        results.put((position, None, 'lost'))
+                    suspects = dead - suspects
+                    continue
+                if position in pending:
+                    yield pending.pop(position), kpis, failure
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def run(self):
+        """Evaluate all points of the design
+
+        :return: one row per point (sorted by point), with attribute values, KPIs and failure
+        :rtype: list of dicts
+        """
+        self.archive = self.open_archive()
+        try:
+            finished = self.read_finished() if self.resume else {}
+            print("Sweep: {} design with {} points, {} finished before".format(
+                self.design, len(self.points), len(finished)))
+
+            mode = 'a' if finished else 'w'
+            with open(self.output_file, mode, newline='') as csv_file:
+                writer = csv.DictWriter(csv_file, self.columns)
+                if not finished:
+                    writer.writeheader()
+
+                def write(row):
+                    finished[row['point']] = row
+                    writer.writerow(row)
+                    # rows are on disk even if the sweep is stopped
+                    csv_file.flush()
+
+                # points with the same values are only evaluated once
+                todo = {}
+                for idx, values in enumerate(self.points):
+                    if idx in finished:
+                        continue
+                    archived = self.archive.get(values) if self.archive is not None else None
+                    if archived is not None:
+                        write(self.make_row(idx, archived[1], None))
+                    else:
+                        todo.setdefault(str(values), []).append(idx)
+
+                points = [(indices[0], self.points[indices[0]]) for indices in todo.values()]
+                for n_done, (idx, kpis, failure) in enumerate(self.evaluate(points)):
+                    if self.archive is not None and failure is None and kpis is not None:
+                        self.archive.put(self.points[idx], (), kpis)
+                    for same_idx in todo[str(self.points[idx])]:
+                        write(self.make_row(same_idx, kpis, failure))
+                    if (n_done + 1) % max(1, int(math.ceil(len(points) / 10))) == 0:
+                        print("Sweep: {} / {} evaluated".format(n_done + 1, len(points)))
+        finally:
+            if self.archive is not None:
+                self.archive.close()
+                self.archive = None
+
+        return [finished[idx] for idx in sorted(finished)]
+
+
+def run_sweep(sweep_config, model):
+    """Entry point for parameter sweeps
+
+    :param sweep_config: sweep parameters, see :class:`Sweep`
+    :type sweep_config: dict
+    :param model: smooth model
+    :type model: dict or list (legacy)
+    :return: one row per point of the design with attribute values, KPIs and failure
+    :rtype: list of dicts
+    """
+    if isinstance(model["components"], list):
+        # instead of components array, have dict with component names as key
+        names = [c.pop("name") for c in model["components"]]
+        model.update({'components': dict(zip(names, model["components"]))})
+    return Sweep(sweep_config, model=model).run()
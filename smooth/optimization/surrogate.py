@@ -0,0 +1,111 @@
+"""Surrogate model to pre-screen children of the genetic algorithm.
+
+*****
+Scope
+*****
+Each fitness evaluation of the optimization is a complete smooth run,
+but many children produced by crossover and mutation are clearly dominated.
+A surrogate model trained on all evaluated individuals predicts the fitness
+of candidate children, so only the most promising or most uncertain
+candidates need to be simulated.
+
+*******
+Concept
+*******
+The surrogate is a radial basis function (RBF) interpolation with a Gaussian kernel,
+built with NumPy only. Gene values are normalized to the range of their attribute variation
+and the fitness values of each objective are standardized before fitting.
+The kernel width is derived from the mean distance between neighbouring training points.
+
+Besides the predicted fitness, the surrogate returns the (normalized) distance of each candidate
+to the nearest evaluated individual. Candidates far away from all evaluated individuals
+have an uncertain prediction and are worth simulating to explore the search space.
+"""
+
+import numpy as np
+
+# maximum number of (most recent) samples used for fitting. Fitting is cubic in samples
+MAX_SAMPLES = 1000
+
+
+class RBFSurrogate:
+    """Gaussian RBF interpolation of fitness values over gene values
+
+    :param val_min: minimum value of each gene
+    :type val_min: list of numbers
+    :param val_max: maximum value of each gene
+    :type val_max: list of numbers
+    :param smoothing: regularization of the interpolation (relative to kernel values).
+        Defaults to 1e-6
+    :type smoothing: number, optional
+    :var width: kernel width in normalized gene space, set by :meth:`fit`
+    :type width: float
+    """
+
+    def __init__(self, val_min, val_max, smoothing=1e-6):
+        self.val_min = np.asarray(val_min, dtype=float)
+        val_range = np.asarray(val_max, dtype=float) - self.val_min
+        # constant attributes: avoid division by zero
+        self.val_range = np.where(val_range > 0, val_range, 1)
+        self.smoothing = smoothing
+        self.width = None
+
+    def normalize(self, genes):
+        """Scale gene values to [0, 1]
+
+        :param genes: gene values (individuals x genes)
+        :type genes: array-like
+        :return: normalized gene values
+        :rtype: numpy array
+        """
+        return (np.asarray(genes, dtype=float) - self.val_min) / self.val_range
+
+    def kernel(self, points1, points2):
+        """Gaussian kernel and distance matrix between two sets of normalized points
+
+        :return: kernel values and distances (points1 x points2)
+        :rtype: tuple(numpy array, numpy array)
+        """
+        distance = np.sqrt(((points1[:, None, :] - points2[None, :, :]) ** 2).sum(axis=2))
+        return np.exp(-(distance / self.width) ** 2), distance
+
+    def fit(self, genes, fitness):
+        """Fit surrogate to evaluated individuals
+
+        :param genes: gene values of evaluated individuals (individuals x genes)
+        :type genes: array-like
+        :param fitness: fitness values of evaluated individuals (individuals x objectives)
+        :type fitness: array-like
+        :return: fitted surrogate (self)
+        :rtype: :class:`RBFSurrogate`
+        """
+        self.points = self.normalize(genes)[-MAX_SAMPLES:]
+        fitness = np.asarray(fitness, dtype=float)[-MAX_SAMPLES:]
+        self.mean = fitness.mean(axis=0)
+        std = fitness.std(axis=0)
+        self.std = np.where(std > 0, std, 1)
+
+        # kernel width: twice the mean distance to the nearest neighbour
+        self.width = 1.0
+        _, distance = self.kernel(self.points, self.points)
+        if len(self.points) > 1:
+            np.fill_diagonal(distance, np.inf)
+            self.width = max(2 * distance.min(axis=1).mean(), 1e-6)
+
+        kernel, _ = self.kernel(self.points, self.points)
+        kernel += self.smoothing * np.eye(len(self.points))
+        self.weights = np.linalg.solve(kernel, (fitness - self.mean) / self.std)
+        return self
+
+    def predict(self, genes):
+        """Predict fitness of new individuals
+
+        :param genes: gene values (individuals x genes)
+        :type genes: array-like
+        :return: predicted fitness (individuals x objectives) and normalized distance
+            of each individual to the nearest evaluated individual (uncertainty)
+        :rtype: tuple(numpy array, numpy array)
+        """
+        kernel, distance = self.kernel(self.normalize(genes), self.points)
+        fitness = kernel.dot(self.weights) * self.std + self.mean
+        return fitness, distance.min(axis=1)
@@ -0,0 +1,374 @@
+import json
+import subprocess
+import sys
+import zipfile
+
+import numpy as np
+import pytest
+
+from smooth import load_results, save_results
+from smooth.framework import component_registry, typical_periods
+from smooth.framework.exceptions import UnsupportedResultDataError
+from smooth.framework.functions import downsample, functions, result_file
+from smooth.framework.functions.functions import read_data_file
+from smooth.framework.functions.update_annuities import weighted_sum
+from smooth.framework.simulation_hooks import (
+    SimulationHook, PrintProgressHook, AbortHook, provisional_results)
+from smooth.framework.simulation_parameters import SimulationParameters
+
+
+class TestHooks:
+    def test_default_hook(self):
+        hook = SimulationHook()
+        # default hook never requests a stop
+        assert not hook.on_interval_end(0, None, [])
+
+    def test_print_progress(self, capsys):
+        sim_params = SimulationParameters({"n_intervals": 3})
+        hook = PrintProgressHook()
+        for i in range(sim_params.n_intervals):
+            hook.on_interval_start(i, sim_params)
+        assert capsys.readouterr().out.count("Simulating interval") == 3
+
+        # throttled: only first and last interval are printed
+        hook = PrintProgressHook(min_time=1e6)
+        for i in range(sim_params.n_intervals):
+            hook.on_interval_start(i, sim_params)
+        out = capsys.readouterr().out
+        assert "1/3" in out and "2/3" not in out and "3/3" in out
+
+
+class CostComponent:
+    # minimal component: annual costs are fixed costs plus variable costs so far
+    def __init__(self, fix_costs, variable_costs):
+        self.results = {"variable_costs": variable_costs}
+        self.capex = {"cost": fix_costs}
+        self.opex = {}
+        self.fix_emissions = {}
+        self.op_emissions = {}
+
+    def generate_results(self):
+        self.capex["done"] = True
+        self.results["annuity_total"] = self.capex["cost"] + sum(self.results["variable_costs"])
+
+
+class TestAbortHook:
+    def test_provisional_results(self):
+        component = CostComponent(10, [1, 2, 0, 0])
+        provisional = provisional_results([component])
+        assert provisional[0].results["annuity_total"] == 13
+        # original component not changed
+        assert "annuity_total" not in component.results
+        assert "done" not in component.capex
+
+    def test_abort(self):
+        sim_params = SimulationParameters({"n_intervals": 6})
+        component = CostComponent(10, [0] * 6)
+        hook = AbortHook(lambda c: c[0].results["annuity_total"] > 12, check_every=2)
+        stops = []
+        for i in range(sim_params.n_intervals):
+            component.results["variable_costs"][i] = 1
+            stops.append(hook.on_interval_end(i, sim_params, [component]))
+        # checked after intervals 2 and 4 only
+        assert stops == [False, False, False, True, False, False]
+
+
+def test_lazy_import():
+    # heavy and optional packages must not be loaded by "import smooth"
+    lazy = ['oemof', 'matplotlib', 'dill', 'seaborn', 'bokeh', 'tkinter']
+    code = "import sys, smooth; print(' '.join(m for m in {} if m in sys.modules))".format(lazy)
+    out = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    assert out.strip() == ''
+
+
+class TestComponentRegistry:
+    def test_registry(self):
+        registry = component_registry.ComponentRegistry(
+            'smooth.components.external_component_', 'smooth.test_components',
+            component_registry.external_component_class_name, r'[a-z0-9_]+')
+
+        # invalid and unknown names
+        with pytest.raises(ValueError):
+            registry.get('Foo')
+        with pytest.raises(ValueError):
+            registry.get('foo')
+
+        # lookup by naming convention is cached
+        cls = registry.get('h2_dispenser')
+        assert cls.__name__ == 'H2Dispenser'
+        assert registry.classes['h2_dispenser'] is cls
+
+        # register by hand
+        class Foo:
+            pass
+        registry.register('foo', Foo)
+        assert registry.get('foo') is Foo
+
+    def test_class_names(self):
+        assert component_registry.component_class_name('energy_demand_from_csv') == \
+            'EnergyDemandFromCsv'
+        assert component_registry.external_component_class_name('h2_dispenser') == 'H2Dispenser'
+        assert component_registry.external_component_class_name('FOO') == 'FOO'
+
+
+class TestTypicalPeriods:
+    def test_k_medoids(self):
+        features = np.array([[0.0], [0.1], [5.0], [5.2], [5.1], [10.0]])
+        medoids, labels = typical_periods.k_medoids(features, 3)
+        assert medoids == [0, 4, 5] or medoids == [1, 4, 5]
+        assert labels.tolist() == [0, 0, 1, 1, 1, 2]
+        # more clusters than items: every item is a medoid
+        medoids, labels = typical_periods.k_medoids(features, 10)
+        assert medoids == list(range(6))
+
+    def test_aggregate_model(self, tmp_path):
+        # four days: two sunny, two cloudy
+        sunny = [0, 5, 10, 5]
+        cloudy = [0, 1, 2, 1]
+        with open(str(tmp_path / "pv.csv"), "w") as f:
+            f.write("pv;other\n")
+            for value in sunny + cloudy + cloudy + sunny + [7]:
+                f.write("{};0\n".format(value))
+        model = {
+            "components": {
+                "pv": {"component": "energy_source_from_csv", "path": str(tmp_path),
+                       "csv_filename": "pv.csv", "csv_separator": ";", "column_title": "pv"},
+                "grid": {"component": "supply"},
+            },
+            "busses": ["bel"],
+            "sim_params": {"n_intervals": 17, "interval_time": 60, "n_typical_periods": 2,
+                           "typical_period_length": 4},
+        }
+        aggregated, periods = typical_periods.aggregate_model(
+            model, 2, 4, directory=str(tmp_path))
+        assert periods == [(0, 2), (1, 2)]
+        assert aggregated["sim_params"]["n_intervals"] == 8
+        assert aggregated["sim_params"]["interval_weights"] == [2] * 8
+        assert aggregated["sim_params"]["n_typical_periods"] is None
+        # original model unchanged
+        assert model["components"]["pv"]["csv_filename"] == "pv.csv"
+
+        pv = aggregated["components"]["pv"]
+        data = read_data_file(pv["path"], pv["csv_filename"], pv["csv_separator"],
+                              pv["column_title"])
+        assert data["value"].tolist() == sunny + cloudy
+
+        # weighted time span: four days of original simulation
+        sim_params = SimulationParameters(aggregated["sim_params"])
+        assert sim_params.sim_time_span == 16 * 60
+
+    def test_weighted_sum(self):
+        assert weighted_sum([1, 2, 3]) == 6
+        assert weighted_sum([1, 2, 3], [3, 2, 1]) == 10
+
+
+class ResultComponent:
+    # simulated component with all kinds of results
+    def __init__(self, name):
+        self.name = name
+        self.component = "electrolyzer"
+        self.power_max = np.int64(100)
+        self.dependency_flow_costs = ("bel", name)
+        self.data = object()
+        self.sim_params = SimulationParameters({"n_intervals": 3})
+        self.flows = {("bel", name): [1, 2, None]}
+        self.states = {"temperature": [20, 21, 22]}
+        self.results = {"annuity_total": 5, "variable_costs": [1, 2, 3], "solver": object()}
+
+
+class TestResultFile:
+    def test_components(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        file_name = save_results("run", [ResultComponent("ely"), ResultComponent("ely2")])
+        assert file_name.endswith("_run.zip")
+
+        ely = load_results(file_name)[0]
+        assert isinstance(ely, result_file.StoredComponent)
+        assert (ely.name, ely.component, ely.power_max) == ("ely", "electrolyzer", 100)
+        assert ely.dependency_flow_costs == ["bel", "ely"]
+        assert not hasattr(ely, "data")
+        np.testing.assert_array_equal(ely.flows[("bel", "ely")], [1, 2, np.nan])
+        assert ely.states["temperature"].tolist() == [20, 21, 22]
+        assert ely.results["annuity_total"] == 5
+        assert ely.results["variable_costs"].tolist() == [1, 2, 3]
+        assert "solver" not in ely.results
+        assert len(ely.sim_params.date_time_index) == 3
+
+        # only scalar results of one component
+        [ely2] = load_results(file_name, components=["ely2"], columns=["results"])
+        assert ely2.name == "ely2"
+        assert ely2.results == {"annuity_total": 5}
+        assert ely2.flows == {} and not hasattr(ely2, "power_max")
+
+        # memory-mapped time series
+        ely = load_results(file_name, mmap=True)[0]
+        assert isinstance(ely.states["temperature"], np.memmap)
+        assert ely.states["temperature"].tolist() == [20, 21, 22]
+
+    def test_individuals(self, tmp_path):
+        file_name = str(tmp_path / "optimization.zip")
+        individuals = [
+            result_file.StoredIndividual([1, 2], (-5, 0), {"lcoh": 3}, None,
+                                         [ResultComponent("ely")]),
+            result_file.StoredIndividual([0, 0], None, None, "timeout"),
+        ]
+        result_file.save_result_file(file_name, individuals, dtype="float32")
+        loaded = load_results(file_name, columns=["results"])
+        assert [ind.values for ind in loaded] == [[1, 2], [0, 0]]
+        assert [ind.fitness for ind in loaded] == [(-5, 0), None]
+        assert loaded[0].kpis == {"lcoh": 3}
+        assert loaded[1].failure == "timeout" and loaded[1].smooth_result is None
+        assert loaded[0].smooth_result[0].results == {"annuity_total": 5}
+        ely = load_results(file_name)[0].smooth_result[0]
+        assert ely.flows[("bel", "ely")].dtype == np.float32
+
+    def test_version(self, tmp_path):
+        # file of a newer version with unknown and without optional entries
+        file_name = str(tmp_path / "future.zip")
+        with zipfile.ZipFile(file_name, "w") as archive:
+            archive.writestr(result_file.MANIFEST_NAME, json.dumps({
+                "version": result_file.FORMAT_VERSION + 1,
+                "kind": "components",
+                "sim_params": {"n_intervals": 2, "new_parameter": 1},
+                "components": [{"name": "ely", "new_column": []}],
+            }))
+        with pytest.warns(UserWarning):
+            [ely] = load_results(file_name)
+        assert ely.name == "ely" and ely.component is None and ely.flows == {}
+        assert ely.sim_params.n_intervals == 2
+
+    def test_pickle(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        file_name = save_results("run", [1, 2], file_format="pickle")
+        assert file_name.endswith("_run.pickle")
+        assert load_results(file_name) == [1, 2]
+        # neither components nor individuals
+        file_name = save_results("other", {"foo": 1})
+        assert file_name.endswith("_other.pickle")
+        assert load_results(file_name) == {"foo": 1}
+        file_name = save_results("numbers", [1, 2])
+        assert file_name.endswith("_numbers.pickle")
+
+    def test_unsupported(self, tmp_path):
+        file_name = str(tmp_path / "mixed.zip")
+        with pytest.raises(UnsupportedResultDataError):
+            result_file.save_result_file(file_name, [ResultComponent("ely"), 1])
+        # KPI that can not be written as JSON: no partial file is left
+        individuals = [result_file.StoredIndividual([1], (0,), {"lcoh": object()}, None)]
+        with pytest.raises(TypeError):
+            result_file.save_result_file(file_name, individuals)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_array_kpis(self, tmp_path):
+        file_name = str(tmp_path / "optimization.zip")
+        individuals = [result_file.StoredIndividual(
+            [1], (0,), {"lcoh": np.float64(3), "costs": np.array([1, 2])}, None)]
+        result_file.save_result_file(file_name, individuals)
+        assert load_results(file_name)[0].kpis == {"lcoh": 3, "costs": [1, 2]}
+
+
+class FlowComponent:
+    def __init__(self, name, flows, states=None):
+        self.name = name
+        self.flows = flows
+        self.states = states or {}
+        self.sim_params = SimulationParameters({"n_intervals": 3})
+
+
+class TestResultFrame:
+    components = [
+        FlowComponent("ely", {("bel", "ely"): [1, 2, 3], ("ely", "bh2"): [4, 5, 6]},
+                      {"temperature": [20, 21, 22]}),
+        # component with two oemof models
+        FlowComponent("chp", {("chp_electric", "bel"): [1, 1, 1],
+                              ("chp_thermal", "bth"): [2, 2, 2],
+                              ("bgas", "chp_electric"): [3, 3, None]}),
+    ]
+
+    def test_to_frame(self):
+        frame = functions.to_frame(self.components)
+        assert list(frame.columns) == [
+            ("ely", "flow", "bel", "ely"), ("ely", "flow", "ely", "bh2"),
+            ("ely", "state", "temperature", ""), ("chp", "flow", "chp_electric", "bel"),
+            ("chp", "flow", "chp_thermal", "bth"), ("chp", "flow", "bgas", "chp_electric")]
+        assert (frame.index == self.components[0].sim_params.date_time_index).all()
+        assert frame[("ely", "state", "temperature", "")].tolist() == [20, 21, 22]
+        assert np.isnan(frame.iloc[2, 5])
+        assert frame["chp"].shape == (3, 3)
+
+        assert functions.to_frame([]).empty
+
+    def test_bus_balance(self):
+        balance = functions.bus_balance(functions.to_frame(self.components))
+        assert list(balance.columns) == [
+            ("bel", "ely"), ("bh2", "ely"), ("bel", "chp"), ("bth", "chp"), ("bgas", "chp")]
+        assert balance[("bel", "ely")].tolist() == [-1, -2, -3]
+        # net flow of each bus
+        assert balance["bel"].sum(axis=1).tolist() == [0, -1, -2]
+
+    def test_extract_flow_per_bus(self, capsys):
+        busses = functions.extract_flow_per_bus(self.components, {"ely": "Electrolyzer"})
+        assert busses == {
+            "bel": {"Electrolyzer": [-1, -2, -3], "chp": [1, 1, 1]},
+            "bh2": {"Electrolyzer": [4, 5, 6]},
+            "bth": {"chp": [2, 2, 2]},
+            "bgas": {"chp": [-3, -3]},
+        }
+        out = capsys.readouterr().out
+        assert "chp: is not defined" in out
+        assert "1 trailing None" in out
+
+
+class TestDownsample:
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    # single spike
+    y[421] = 5
+
+    def test_lttb(self):
+        indices = downsample.lttb_indices(self.y, 100, self.x)
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert (np.diff(indices) > 0).all()
+        assert 421 in indices
+        # nothing to remove
+        assert downsample.lttb_indices(self.y[:50], 100).tolist() == list(range(50))
+
+    def test_min_max(self):
+        indices = downsample.min_max_indices(self.y, 100)
+        assert len(indices) <= 100
+        assert (np.diff(indices) > 0).all()
+        assert np.argmin(self.y) in indices
+        assert 421 in indices
+
+    def test_downsample(self):
+        x, y = downsample.downsample(self.x, self.y, 200, method='min_max')
+        assert len(x) == len(y) <= 200
+        assert y.max() == 5
+        assert (y == self.y[x.astype(int)]).all()
+        with pytest.raises(ValueError):
+            downsample.downsample(self.x, self.y, 200, method='mean')
+
+    def test_detail_levels(self):
+        levels = downsample.detail_levels(self.x, self.y, 50)
+        assert [len(x) for x, y in levels] == [50, 200, 800, 1000]
+        assert (levels[-1][1] == self.y).all()
+        # overview and one finer level only
+        levels = downsample.detail_levels(self.x, self.y, 50, n_levels=2, full=False)
+        assert [len(x) for x, y in levels] == [50, 200]
+        levels = downsample.detail_levels(self.x, self.y, 2000, n_levels=1, full=False)
+        assert [len(x) for x, y in levels] == [1000]
+
+    def test_plot(self, monkeypatch):
+        plt = pytest.importorskip("matplotlib.pyplot")
+        from smooth.framework.functions.plot_results import plot_smooth_results
+        monkeypatch.setattr(plt, "show", lambda: None)
+        plt.figure()
+        components = [FlowComponent("ely", {("bel", "ely"): list(self.y)})]
+        components[0].sim_params = SimulationParameters({"n_intervals": 1000})
+        plot_smooth_results(components, {}, max_points=100)
+        line = plt.gca().lines[0]
+        assert len(line.get_xdata()) == 100
+        # flow out of bus is negative, spike is kept
+        assert min(line.get_ydata()) == -5
+        plt.close("all")
@@ -1,5 +1,24 @@
 import smooth.optimization.run_optimization as opt
+from smooth.optimization import distributed, non_dominated_sorting as nds, resource_limits
+from smooth.optimization.fitness_archive import (
+    FitnessArchive, function_source, model_hash, quantize_genes)
+from smooth.optimization.result_store import StoredResult, store_result
+from smooth.optimization import run_sweep, dispatch_cache, batch_evaluation
+from smooth.optimization.surrogate import RBFSurrogate
 
+from multiprocessing import AuthenticationError, Pipe
+from multiprocessing.connection import Client
+import copy
+import os
+import pickle
+import random
+import shutil
+import sqlite3
+import sys
+import time
+
+import dill
+import numpy as np
 import pytest
 
 
@@ -226,6 +245,24 @@ class TestGA:
         opt.fitness_function(idx, ind, model, av, None, ignore_zero=True, save_results=False)
         assert {"bar"} == model["components"].keys()
 
+    def test_evaluate_genes(self):
+        model = {"components": {"foo": {"bar": 0}, "bar": {"foo": 0}}, "sim_params": {}}
+        av = [opt.AttributeVariation(self.av_dict)]
+        opt.init_worker(model, av, dill.dumps(()), ignore_zero=True, save_results=False)
+
+        # smooth throws error: no fitness or result
+        assert opt.evaluate_genes(3, [0]) == (3, None, None, None, 'error')
+        # worker model is not changed by evaluation
+        assert model == {"components": {"foo": {"bar": 0}, "bar": {"foo": 0}}, "sim_params": {}}
+
+    def test_model_overlay(self):
+        model = {"components": {"foo": {"bar": {"baz": 0}}}, "busses": ["b"]}
+        overlay = opt.model_overlay(model)
+        overlay["components"]["foo"]["bar"]["baz"] = 1
+        overlay["components"].pop("foo")
+        assert model["components"]["foo"]["bar"]["baz"] == 0
+        assert overlay["busses"] is model["busses"]
+
     def test_optimization(self):
         o = opt.Optimization({
             "population_size": 10,
@@ -235,3 +272,1082 @@ class TestGA:
         })
         # smooth error: no result
         assert len(o.run()) == 0
+
+
+class TestArchive:
+    def test_archive(self, tmp_path):
+        path = str(tmp_path / "archive.sqlite")
+        key = model_hash({"components": {}}, ["foo", "bar"])
+        archive = FitnessArchive(path, key)
+        assert len(archive) == 0
+        assert archive.get([1, 2]) is None
+
+        archive.put([1, 2], (-3.5, 0), {"foo": 1})
+        archive.put([2, 2], None)
+        assert archive.get([1, 2]) == ((-3.5, 0), {"foo": 1})
+        # failed evaluation is known
+        assert archive.get([2, 2]) == (None, None)
+        assert archive.hits == 2
+        archive.close()
+
+        # persistent: reopen
+        archive = FitnessArchive(path, key)
+        assert len(archive) == 2
+        assert archive.get([1.0, 2.0]) == ((-3.5, 0), {"foo": 1})
+        archive.close()
+
+        # other model: not known
+        archive = FitnessArchive(path, model_hash({"components": {"foo": {}}}, ["foo", "bar"]))
+        assert archive.get([1, 2]) is None
+        archive.close()
+
+    def test_model_hash(self):
+        def objectives():
+            return (lambda x: -x,
+                    lambda x: x)
+
+        # same source code, other function objects
+        assert model_hash([function_source(f) for f in objectives()]) == model_hash(
+            [function_source(f) for f in objectives()])
+        assert function_source(objectives()[0]) != function_source(objectives()[1])
+        assert model_hash({"n": np.int64(1)}) == model_hash({"n": 1})
+        # simulated model: no hash with memory address
+        with pytest.raises(TypeError):
+            model_hash({"sim_params": object()})
+
+    def test_closed(self, tmp_path):
+        o = LocalOptimization({
+            "population_size": 4,
+            "n_generation": 1,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+            "archive_file": str(tmp_path / "archive.sqlite"),
+        })
+        o.run()
+        with pytest.raises(sqlite3.ProgrammingError):
+            len(o.archive)
+
+    def test_quantize(self):
+        assert quantize_genes([1, 2.0]) == quantize_genes([1.0, 2])
+        assert quantize_genes([0.1 + 0.2]) == quantize_genes([0.3])
+        assert quantize_genes([1e5]) != quantize_genes([1e5 + 1])
+
+
+class LocalOptimization(opt.Optimization):
+    # evaluate in main process with a simple fitness function instead of smooth.
+    # Each evaluation method logs its name and number of individuals in calls.
+    def __init__(self, iterable=(), **kwargs):
+        self.calls = []
+        super().__init__(iterable, **kwargs)
+
+    def fitness(self, genes):
+        return (-abs(genes[0] - 3), -abs(genes[1] - genes[0]))
+
+    def failure_of(self, genes):
+        # reason of failure of an evaluation (replace to test failures)
+        return None
+
+    def call_sizes(self, name):
+        return [size for call, size in self.calls if call == name]
+
+    def compute_fitness(self):
+        self.calls.append(('compute_fitness', len(self.population)))
+        n_evaluated = 0
+        for idx, ind in enumerate(self.population):
+            if ind.fitness is None and ind.failure is None:
+                failure = self.failure_of(ind.values)
+                fitness = None if failure else self.fitness(ind.values)
+                self.set_fitness((idx, fitness, None, None, failure))
+                n_evaluated += 1
+        return n_evaluated
+
+    def submit_evaluation(self, task_id, genes):
+        # steady-state evolution: results arrive with delay
+        self.calls.append(('submit_evaluation', 1))
+        self.async_results.put((task_id, self.fitness(genes), None, None, None))
+
+    def compute_screening_fitness(self, candidates, sim_params):
+        # low fidelity: fitness with offset
+        self.calls.append(('compute_screening_fitness', len(candidates)))
+        return {idx: (self.fitness(ind.values)[0] + sim_params["n_intervals"],
+                      self.fitness(ind.values)[1])
+                for idx, ind in enumerate(candidates)}
+
+    def save_checkpoint(self, phase, result, generation, av_idx=0, search_state=None):
+        super().save_checkpoint(phase, result, generation, av_idx, search_state)
+        # keep copy of checkpoint after second generation
+        if self.checkpoint_file and phase == 'ga' and generation == 2:
+            shutil.copy(self.checkpoint_file, self.checkpoint_file + '.gen2')
+
+
+class TestPatternSearch:
+    def test_neighbours(self):
+        o = LocalOptimization({
+            "population_size": 4,
+            "n_generation": 1,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+        })
+        neighbours = o.pattern_neighbours(opt.Individual([0, 5]), [(1, 1), (-1, 0)])
+        # combined direction first, clipped duplicates removed
+        assert [n.values for _, n in neighbours] == [[1, 6], [1, 5], [0, 6], [0, 4]]
+        assert neighbours[0][0] == (1, 1)
+
+    def test_pattern_search(self, tmp_path):
+        checkpoint_file = str(tmp_path / "checkpoint.pickle")
+        config = {
+            "population_size": 4,
+            "n_generation": 2,
+            "n_core": 1,
+            "post_processing": "pattern_search",
+            "checkpoint_file": checkpoint_file,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+        }
+        o = LocalOptimization(config)
+        start = opt.Individual([9, 0])
+        o.population = [start]
+        o.compute_fitness()
+        result = o.pattern_search([start, start])
+        # identical solutions only searched once, optimum of coupled attributes found
+        assert [ind.values for ind in result] == [[3, 3]]
+        assert result[0].fitness == (0, 0)
+        # all neighbours of an iteration evaluated at once, no neighbour evaluated twice
+        batches = o.call_sizes('compute_fitness')
+        assert batches[1] == 3
+        assert sum(batches) == len(o.evaluated)
+
+        # full run: each solution is a local optimum
+        result = LocalOptimization(config).run()
+        for ind in result:
+            for _, neighbour in o.pattern_neighbours(ind):
+                neighbour.fitness = (-abs(neighbour[0] - 3), -abs(neighbour[1] - neighbour[0]))
+                assert not neighbour.dominates(ind)
+
+        # resume finished run: nothing to compute
+        config["resume_from"] = checkpoint_file
+        o = LocalOptimization(config)
+        assert [ind.values for ind in o.run()] == [ind.values for ind in result]
+        assert o.calls == []
+
+
+class TestCheckpoint:
+    av = [
+        {"comp_name": "foo", "comp_attribute": "bar", "val_min": 0, "val_max": 10, "val_step": 1},
+        {"comp_name": "foo", "comp_attribute": "baz", "val_min": 0, "val_max": 10},
+    ]
+
+    def test_resume(self, tmp_path):
+        checkpoint_file = str(tmp_path / "checkpoint.pickle")
+        config = {
+            "population_size": 4,
+            "n_generation": 4,
+            "n_core": 1,
+            "attribute_variation": self.av,
+            "model": {"components": {}},
+            "checkpoint_file": checkpoint_file,
+        }
+        full_result = LocalOptimization(config).run()
+        assert os.path.exists(checkpoint_file + '.gen2')
+
+        # continue from generation 2: same result as uninterrupted run
+        config["resume_from"] = checkpoint_file + '.gen2'
+        o = LocalOptimization(config)
+        resumed_result = o.run()
+        assert len(o.generation_stats) == 4
+        assert [i.values for i in resumed_result] == [i.values for i in full_result]
+        assert [i.fitness for i in resumed_result] == [i.fitness for i in full_result]
+
+        # resume finished run: nothing to compute
+        config["resume_from"] = checkpoint_file
+        o = LocalOptimization(config)
+        assert [i.values for i in o.run()] == [i.values for i in full_result]
+        assert len(o.generation_stats) == 4
+
+        # other attribute variation
+        config["attribute_variation"] = self.av[:1]
+        with pytest.raises(AssertionError):
+            LocalOptimization(config).run()
+
+
+class TestNonDominatedSorting:
+    def brute_force_fronts(self, fitness):
+        # peel off non-dominated individuals one front at a time
+        remaining = list(range(len(fitness)))
+        fronts = []
+        while remaining:
+            front = [i for i in remaining if not any(
+                nds.dominates(fitness[j], fitness[i]) for j in remaining)]
+            fronts.append(front)
+            remaining = [i for i in remaining if i not in front]
+        return fronts
+
+    def test_fronts(self):
+        assert nds.non_dominated_fronts([]) == []
+        random.seed(42)
+        for n_objectives in [1, 2, 3, 5]:
+            # few distinct values: many duplicates and ties
+            fitness = [[random.randint(0, 4) for _ in range(n_objectives)] for _ in range(60)]
+            fronts = [front.tolist() for front in nds.non_dominated_fronts(fitness)]
+            assert fronts == self.brute_force_fronts(fitness)
+
+    def test_individual_domination(self):
+        i1 = opt.Individual([])
+        i2 = opt.Individual([])
+        i1.fitness = (1, 1, 1)
+        i2.fitness = (1, 1, 0)
+        assert i1.dominates(i2)
+        assert not i2.dominates(i1)
+        i2.fitness = (1, 2, 0)
+        assert not i1.dominates(i2)
+        assert not i2.dominates(i1)
+
+    def test_crowding_distance(self):
+        d = nds.crowding_distance([[0, 0], [1, 1], [2, 2], [4, 4]])
+        assert d.tolist() == [nds.BORDER_DISTANCE, 1, 1.5, nds.BORDER_DISTANCE]
+        # objective without spread is ignored
+        d = nds.crowding_distance([[0, 1], [1, 1], [2, 1], [4, 1]])
+        assert d.tolist() == [nds.BORDER_DISTANCE, 0.5, 0.75, nds.BORDER_DISTANCE]
+        # less than three individuals: all on border
+        assert nds.crowding_distance([[0, 1], [1, 0]]).tolist() == [nds.BORDER_DISTANCE] * 2
+
+    def test_selection(self):
+        fitness = [[0, 0], [1, 0], [0, 1], [3, 0], [2, 2], [0, 3]]
+        selected, fronts = nds.select_by_rank_and_crowding(fitness, 4)
+        assert [front.tolist() for front in fronts] == [[3, 4, 5], [1, 2], [0]]
+        # complete first front, then one of second front
+        assert sorted(selected[:3]) == [3, 4, 5]
+        assert selected[3] in [1, 2]
+        assert len(selected) == 4
+
+
+class TestAsynchronous:
+    av = TestCheckpoint.av
+
+    def test_steady_state(self, tmp_path):
+        config = {
+            "population_size": 4,
+            "n_generation": 3,
+            "n_core": 3,
+            "asynchronous": True,
+            "attribute_variation": self.av,
+            "model": {"components": {}},
+            "checkpoint_file": str(tmp_path / "checkpoint.pickle"),
+        }
+        o = LocalOptimization(config)
+        result = o.run()
+        # same number of evaluations as generational GA
+        assert len(o.evaluation_stats) == 12
+        assert [s["evaluation"] for s in o.evaluation_stats] == list(range(1, 13))
+        assert len(o.generation_stats) == 3
+        assert len(o.population) <= 4
+        assert len(result) > 0
+        for ind in result:
+            assert not any(other.dominates(ind) for other in o.population)
+        assert os.path.exists(str(tmp_path / "checkpoint.pickle.gen2"))
+
+        # resume: only remaining evaluations
+        config["resume_from"] = str(tmp_path / "checkpoint.pickle.gen2")
+        o = LocalOptimization(config)
+        o.run()
+        assert len(o.evaluation_stats) == 12
+        assert len(o.generation_stats) == 3
+
+    def test_pool(self):
+        o = opt.Optimization({
+            "population_size": 4,
+            "n_generation": 1,
+            "n_core": 2,
+            "asynchronous": True,
+            "attribute_variation": [TestGA.av_dict],
+            "model": {None}
+        })
+        # worker error: no result, but run finishes
+        assert len(o.run()) == 0
+        assert len(o.evaluation_stats) == 4
+
+
+class TestSurrogate:
+    def test_rbf(self):
+        genes = [[0, 0], [10, 0], [0, 10], [10, 10], [5, 5]]
+        fitness = [[g[0] + g[1], -g[0] * g[1]] for g in genes]
+        model = RBFSurrogate([0, 0], [10, 10]).fit(genes, fitness)
+        # interpolates training points
+        prediction, uncertainty = model.predict(genes)
+        assert prediction.ravel().tolist() == pytest.approx(sum(fitness, []), abs=1e-3)
+        assert uncertainty.tolist() == [0] * 5
+        # uncertainty grows with distance
+        _, uncertainty = model.predict([[5, 6], [5, 8]])
+        assert 0 < uncertainty[0] < uncertainty[1]
+
+    def test_prescreen(self):
+        o = LocalOptimization({
+            "population_size": 4,
+            "n_generation": 4,
+            "n_core": 1,
+            "surrogate": True,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+        })
+        o.run()
+        # first generation without surrogate, same number of simulations
+        assert [s["n_evaluated"] for s in o.generation_stats] == [4] * 4
+        # rejected candidates are not blocked
+        assert None not in o.evaluated.values()
+
+
+class TestFidelity:
+    def test_model_overlay(self):
+        model = {"components": {}, "sim_params": {"n_intervals": 10, "interval_time": 60}}
+        overlay = opt.model_overlay(model, {"n_intervals": 2})
+        assert overlay["sim_params"] == {"n_intervals": 2, "interval_time": 60}
+        assert model["sim_params"]["n_intervals"] == 10
+
+    def test_screen(self):
+        o = LocalOptimization({
+            "population_size": 8,
+            "n_generation": 3,
+            "n_core": 1,
+            "fidelity": [
+                {"sim_params": {"n_intervals": 1}, "promote": 0.5},
+                {"sim_params": {"n_intervals": 2}},
+            ],
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+        })
+        o.run()
+        # all children at first level, half at second level
+        assert o.call_sizes('compute_screening_fitness')[:2] == [8, 4]
+        # only non-dominated children simulated with full model
+        for stats in o.generation_stats:
+            assert 0 < stats["n_evaluated"] <= 4
+        # rejected children stay blocked
+        assert len(o.evaluated) == 24
+
+    def test_screening_artifacts(self, tmp_path):
+        avs = TestDispatchCache.avs
+        model = {"components": {"foo": {}}, "sim_params": {}}
+        objectives = (lambda x: -sum(c.results["annuity_total"] for c in x),)
+        kpis = {"annuity": lambda x: x[0].results["annuity_total"]}
+        opt.init_worker(model, avs, dill.dumps(objectives), save_results=True,
+                        dill_kpis=dill.dumps(kpis), result_dir=str(tmp_path),
+                        reuse_dispatch=True)
+        cache = opt.worker_state["dispatch_cache"]
+        low = {"n_intervals": 1}
+        cache.put(cache.key([5, 2, 0.5], low), [DispatchComponent("foo")])
+        # screening: only fitness, nothing written to result_dir
+        assert opt.evaluate_genes(1, [20, 2, 0.1], low, None, True) == (
+            1, (-11,), None, None, None)
+        assert os.listdir(str(tmp_path)) == []
+
+        # screening tasks of the optimization
+        calls = []
+
+        class RecordingPool:
+            def apply_async(self, func, args, callback=None, error_callback=None):
+                calls.append((func, args))
+                return self
+
+            def get(self):
+                return (0, (-11,), None, None, None)
+
+        o = opt.Optimization({
+            "population_size": 2,
+            "n_generation": 1,
+            "n_core": 1,
+            "evaluator": lambda n_core, initializer, initargs: RecordingPool(),
+            "attribute_variation": [TestGA.av_dict],
+            "model": model,
+        })
+        assert o.compute_screening_fitness([opt.Individual([1])], low) == {0: (-11,)}
+        assert calls == [(opt.evaluate_genes, (0, [1], low, None, True))]
+
+
+class TestEarlyAbort:
+    def test_dominated_by(self):
+        objectives = [lambda c: -c[0], lambda c: -c[1]]
+        predicate = opt.dominated_by([(-5, -5), (-2, -8)], objectives)
+        assert predicate([6, 6])
+        assert not predicate([1, 9])
+        # objectives not computable: continue
+        assert not predicate([])
+
+    def test_task_args(self):
+        o = opt.Optimization({
+            "population_size": 2,
+            "n_generation": 1,
+            "attribute_variation": [TestGA.av_dict],
+            "model": {"components": {}},
+        })
+        o.front_fitness = [(1, 2)]
+        assert o.task_args(0, [1]) == (0, [1])
+        o.early_abort = 24
+        assert o.task_args(0, [1]) == (0, [1], None, [(1, 2)])
+        assert o.worker_args()[-7] == 24
+
+
+class TestDistributed:
+    def test_broker(self):
+        broker = distributed.Broker(heartbeat_timeout=5)
+        workers = distributed.start_local_workers(
+            broker.address, 2, broker.authkey, heartbeat_interval=0.1)
+        results = []
+        tasks = [broker.apply_async(divmod, (i, 3), callback=results.append) for i in range(10)]
+        assert [task.get(timeout=30) for task in tasks] == [divmod(i, 3) for i in range(10)]
+        assert sorted(results) == sorted(divmod(i, 3) for i in range(10))
+
+        errors = []
+        task = broker.apply_async(divmod, (1, 0), error_callback=errors.append)
+        with pytest.raises(distributed.RemoteError):
+            task.get(timeout=30)
+        assert len(errors) == 1
+
+        # task exits: reported as error, worker keeps running
+        task = broker.apply_async(sys.exit, (3,))
+        with pytest.raises(distributed.RemoteError, match="SystemExit"):
+            task.get(timeout=30)
+        assert broker.apply_async(divmod, (7, 2)).get(timeout=30) == (3, 1)
+        assert all(worker.is_alive() for worker in workers)
+
+        broker.close()
+        broker.join()
+        for worker in workers:
+            worker.join(timeout=30)
+            assert not worker.is_alive()
+
+    def test_requeue(self):
+        broker = distributed.Broker(heartbeat_timeout=0.5)
+        task = broker.apply_async(divmod, (7, 2))
+        # first worker disappears while computing
+        lost = Client(broker.address, authkey=broker.authkey)
+        assert lost.recv()[0] == 'init'
+        assert lost.recv()[0] == 'task'
+        lost.close()
+        # second worker stops sending heartbeats
+        silent = Client(broker.address, authkey=broker.authkey)
+        assert silent.recv()[0] == 'init'
+        assert silent.recv()[0] == 'task'
+        workers = distributed.start_local_workers(broker.address, 1, broker.authkey)
+        assert task.get(timeout=30) == (3, 1)
+        assert broker.n_requeued == 2
+        # late result is ignored
+        assert not task.finish(value=None)
+        assert task.get() == (3, 1)
+        silent.close()
+        broker.close()
+        broker.join()
+        workers[0].join(timeout=30)
+
+    def test_authkey(self):
+        broker = distributed.Broker()
+        # random key, only reachable from this machine
+        assert broker.address[0] == '127.0.0.1'
+        assert len(broker.authkey) == 32
+        with pytest.raises(AuthenticationError):
+            Client(broker.address, authkey=b'smooth')
+        broker.close()
+        broker.join()
+        broker = distributed.Broker(authkey=b'key')
+        assert broker.authkey == b'key'
+        broker.close()
+        broker.join()
+
+    def test_optimization(self):
+        def evaluator(n_core, initializer, initargs):
+            broker = distributed.Broker(initializer=initializer, initargs=initargs)
+            distributed.start_local_workers(broker.address, n_core, broker.authkey)
+            return broker
+
+        o = opt.Optimization({
+            "population_size": 4,
+            "n_generation": 1,
+            "n_core": 2,
+            "evaluator": evaluator,
+            "attribute_variation": [TestGA.av_dict],
+            "model": {None}
+        })
+        # smooth error: no result
+        assert len(o.run()) == 0
+        assert o.pool is None
+
+
+@pytest.mark.skipif(not resource_limits.LIMITS_SUPPORTED, reason="needs fork and resource")
+class TestResourceLimits:
+    def test_run_with_limits(self):
+        assert resource_limits.run_with_limits(divmod, (7, 2), timeout=10) == ('ok', (3, 1))
+        status, message = resource_limits.run_with_limits(divmod, (1, 0), timeout=10)
+        assert status == 'error' and 'division' in message
+        # child is killed after timeout
+        start = time.monotonic()
+        assert resource_limits.run_with_limits(time.sleep, (30,), timeout=0.5) == ('timeout', None)
+        assert time.monotonic() - start < 10
+        # allocation above memory limit
+        assert resource_limits.run_with_limits(
+            bytearray, (1 << 30,), memory_limit=256) == ('memory', None)
+        # without limits: called directly
+        assert resource_limits.run_with_limits(divmod, (7, 2)) == ('ok', (3, 1))
+
+    def test_evaluate_genes(self):
+        model = {"components": {"foo": {"bar": 0}}, "sim_params": {}}
+        av = [opt.AttributeVariation(TestGA.av_dict)]
+        opt.init_worker(model, av, dill.dumps(()), timeout=10)
+        # smooth error inside limited process
+        assert opt.evaluate_genes(3, [0]) == (3, None, None, None, 'error')
+
+    def test_failures(self):
+        o = LocalOptimization({
+            "population_size": 6,
+            "n_generation": 3,
+            "n_core": 1,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+        })
+        # individuals with odd first gene exceed the time limit
+        o.failure_of = lambda genes: 'timeout' if genes[0] % 2 else None
+        # run() seeds the RNG: make sure at least one evaluation fails
+        o.population = [opt.Individual([1, 0])]
+        result = o.run()
+        assert all(ind[0] % 2 == 0 for ind in result)
+        n_failed = sum(stats["failures"].get("timeout", 0) for stats in o.generation_stats)
+        assert n_failed == sum(1 for ind in o.evaluated.values() if ind.failure == "timeout")
+        assert n_failed > 0
+        assert opt.count_failures([None, opt.Individual([0])]) == {}
+
+    def test_retry_failures(self, tmp_path):
+        config = {
+            "population_size": 4,
+            "n_generation": 1,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {}},
+            "archive_file": str(tmp_path / "archive.sqlite"),
+            "checkpoint_file": str(tmp_path / "checkpoint.pickle"),
+        }
+        o = LocalOptimization(config)
+        for value, failure in enumerate(["error", "aborted", "timeout", "memory"]):
+            o.update_individual(opt.Individual([value, 0]), None, failure=failure)
+        # only the failure that depends on the configuration is saved
+        assert len(o.archive) == 1
+        o.save_checkpoint('ga', [], 1)
+        o.archive.close()
+
+        o = LocalOptimization(config)
+        o.load_checkpoint(config["checkpoint_file"])
+        assert list(o.evaluated) == [str(opt.Individual([0, 0]))]
+        o.archive.close()
+
+
+class TestResultStore:
+    class Component:
+        # minimal component with results like after run_smooth
+        def __init__(self, name):
+            self.name = name
+            self.component = "test"
+            self.sim_params = object()
+            self.flows = {("bel", name): [1.5, None, 3.0]}
+            self.states = {"level": [0.1, 0.2, 0.3]}
+            self.results = {"annuity_total": 12, "variable_costs": [1, 2, 3], "other": object()}
+
+    def test_store_result(self, tmp_path):
+        components = [self.Component("foo"), self.Component("bar")]
+        stored = store_result(str(tmp_path), [1, 2], components, kpis={"lcoe": 0.5})
+        assert stored.kpis == {"lcoe": 0.5}
+        assert len(stored) == 2
+        # only handle is pickled
+        assert len(pickle.dumps(stored)) < 200
+
+        foo = pickle.loads(pickle.dumps(stored))[0]
+        assert (foo.name, foo.component) == ("foo", "test")
+        assert foo.flows[("bel", "foo")].tolist()[::2] == [1.5, 3.0]
+        assert str(foo.flows[("bel", "foo")][1]) == "nan"
+        assert foo.states["level"].dtype == "float64"
+        assert foo.results["annuity_total"] == 12
+        assert foo.results["variable_costs"].tolist() == [1, 2, 3]
+        assert "other" not in foo.results
+        # objectives work on stored results
+        assert sum(c.results["annuity_total"] for c in stored) == 24
+
+        # same values: same file
+        stored32 = store_result(str(tmp_path), [1, 2], components, dtype="float32")
+        assert stored32.file_name == stored.file_name
+        assert stored32[1].states["level"].dtype == "float32"
+        assert stored32.kpis is None
+        assert os.listdir(str(tmp_path)) == [os.path.basename(stored.file_name)]
+
+    def test_worker_args(self, tmp_path):
+        o = opt.Optimization({
+            "population_size": 2,
+            "n_generation": 1,
+            "attribute_variation": [TestGA.av_dict],
+            "model": {"components": {}},
+            "result_dir": str(tmp_path / "results"),
+            "result_dtype": "float32",
+        })
+        assert os.path.isdir(str(tmp_path / "results"))
+        assert o.worker_args()[-4:-2] == (str(tmp_path / "results"), "float32")
+        ind = opt.Individual([0])
+        o.update_individual(ind, (1, 2), StoredResult("foo.npz"))
+        assert ind.smooth_result.file_name == "foo.npz"
+
+
+class TestPlotting:
+    def test_progress_message(self):
+        front = [opt.Individual([i, 2 * i]) for i in range(3)]
+        for ind in front:
+            ind.fitness = (-ind[0], ind[1])
+            ind.smooth_result = [list(range(1000))]
+        front.append(opt.Individual([5, 5]))
+        message = opt.progress_message("Front", front, {"n_valid": 3})
+        assert message["fitness"].tolist() == [[0, 0], [-1, 2], [-2, 4]]
+        assert message["genes"].tolist() == [[0, 0], [1, 2], [2, 4]]
+        assert message["stats"] == {"n_valid": 3}
+        # smooth results are not sent
+        assert len(pickle.dumps(message)) < len(pickle.dumps(front)) / 10
+
+    def test_receive(self):
+        plotter = opt.PlottingProcess()
+        plotter.pipe, sender = Pipe(False)
+        assert plotter.receive() == (None, False)
+        for message in [{"title": "1"}, {"title": "2"}, None]:
+            sender.send(message)
+        # last front is shown before finishing
+        assert plotter.receive() == ({"title": "2"}, True)
+
+    def test_update_plot(self):
+        matplotlib = pytest.importorskip("matplotlib")
+        matplotlib.use("Agg")
+        plotter = opt.PlottingProcess()
+        plotter.attribute_variation = [opt.AttributeVariation(TestGA.av_dict)] * 2
+        plotter.objective_names = ("costs", "emissions")
+        plotter.setup_plot()
+        full_draws = []
+        plotter.fig.canvas.mpl_connect("draw_event", full_draws.append)
+
+        front = [opt.Individual([i, i]) for i in range(100)]
+        for ind in front:
+            ind.fitness = (-ind[0], -100 + ind[1])
+        plotter.update_plot(opt.progress_message("Generation 1", front))
+        assert len(full_draws) == 1
+        assert plotter.background is not None
+
+        # points within limits: only blitting
+        for ind in front:
+            ind.fitness = (ind.fitness[0] - 1, ind.fitness[1] + 1)
+        stats = {"n_valid": 100, "n_evaluated": 10, "time": 1.5}
+        plotter.update_plot(opt.progress_message("Generation 2", front, stats))
+        assert len(full_draws) == 1
+        assert plotter.points.get_data()[0][0] == -1
+        assert plotter.title.get_text() == "Generation 2\n100 valid, 10 evaluated, 1.5 s"
+
+        # front moved outside: new limits, complete redraw
+        plotter.update_plot(opt.progress_message("Generation 3", front[:1]))
+        assert len(full_draws) == 2
+        assert plotter.genes.tolist() == [[0, 0]]
+
+
+class LocalSweep(run_sweep.Sweep):
+    # evaluate in main process with simple KPIs instead of smooth,
+    # indices of evaluated points are logged in evaluated
+    def __init__(self, iterable=(), **kwargs):
+        self.evaluated = []
+        super().__init__(iterable, **kwargs)
+
+    def evaluate(self, points):
+        for idx, values in points:
+            self.evaluated.append(idx)
+            if values[0] < 0:
+                yield idx, None, 'error'
+            else:
+                yield idx, {"sum": values[0] + values[1], "prod": values[0] * values[1]}, None
+
+
+class TestSweep:
+    av = [
+        {"comp_name": "foo", "comp_attribute": "bar", "val_min": -1, "val_max": 2, "val_step": 1},
+        {"comp_name": "foo", "comp_attribute": "baz", "val_min": 0, "val_max": 1},
+    ]
+    kpis = {"sum": None, "prod": None}
+
+    def test_designs(self):
+        avs = [opt.AttributeVariation(av) for av in self.av]
+        points = run_sweep.create_design("full_factorial", avs, levels=3)
+        assert len(points) == 4 * 3
+        assert points[:3] == [[-1, 0], [-1, 0.5], [-1, 1]]
+
+        # first points of the Sobol sequence
+        sobol = run_sweep.sobol_points(4, 3)
+        assert sobol.tolist() == [[0, 0, 0], [.5, .5, .5], [.75, .25, .25], [.25, .75, .75]]
+        # each dimension of each design is stratified
+        for points in [run_sweep.sobol_points(32, 21), run_sweep.latin_hypercube_points(32, 5, 1)]:
+            for dim in range(points.shape[1]):
+                assert sorted((points[:, dim] * 32).astype(int)) == list(range(32))
+        with pytest.raises(ValueError):
+            run_sweep.sobol_points(4, 22)
+
+        points = run_sweep.create_design("latin_hypercube", avs, n_samples=8, seed=3)
+        assert sorted(set(p[0] for p in points)) == [-1, 0, 1, 2]
+        assert points == run_sweep.create_design("latin_hypercube", avs, n_samples=8, seed=3)
+        with pytest.raises(ValueError):
+            run_sweep.create_design("foo", avs, n_samples=8)
+
+    def test_sweep(self, tmp_path):
+        output_file = str(tmp_path / "sweep.csv")
+        config = {
+            "design": "sobol",
+            "n_samples": 16,
+            "attribute_variation": self.av,
+            "model": {"components": {}},
+            "kpis": self.kpis,
+            "output_file": output_file,
+        }
+        sweep = LocalSweep(config)
+        rows = sweep.run()
+        assert [row["point"] for row in rows] == list(range(16))
+        # same stepped value: evaluated once
+        assert len(sweep.evaluated) == len(set(
+            (row["foo.bar"], row["foo.baz"]) for row in rows))
+        for row in rows:
+            if row["foo.bar"] < 0:
+                assert row["sum"] is None and row["failure"] == "error"
+            else:
+                assert row["sum"] == row["foo.bar"] + row["foo.baz"]
+                assert row["failure"] is None
+
+        # stopped sweep: continue with missing rows
+        with open(output_file) as csv_file:
+            lines = csv_file.readlines()
+        assert lines[0].strip() == "point,foo.bar,foo.baz,sum,prod,failure"
+        with open(output_file, "w") as csv_file:
+            csv_file.writelines(lines[:6])
+        config["resume"] = True
+        sweep = LocalSweep(config)
+        resumed = sweep.run()
+        assert len(sweep.evaluated) < 16
+        assert [(r["point"], r["sum"], r["failure"]) for r in resumed] == \
+            [(r["point"], r["sum"], r["failure"]) for r in rows]
+
+        # other design in output file
+        config["seed"] = 2
+        config["design"] = "latin_hypercube"
+        with pytest.raises(ValueError):
+            LocalSweep(config).run()
+
+    def test_archive(self, tmp_path):
+        # full factorial of 4 x 2 points
+        config = {
+            "attribute_variation": [self.av[0], dict(self.av[1], val_step=1)],
+            "model": {"components": {}},
+            "kpis": self.kpis,
+            "output_file": str(tmp_path / "sweep.csv"),
+            "archive_file": str(tmp_path / "archive.sqlite"),
+        }
+        sweep = LocalSweep(config)
+        rows = sweep.run()
+        assert len(sweep.evaluated) == 8
+        sweep = LocalSweep(config)
+        assert sweep.run() == rows
+        # only failed evaluations repeated
+        assert len(sweep.evaluated) == 2
+        # archive is closed after the run
+        assert sweep.archive is None
+
+    def test_pool(self, tmp_path):
+        rows = run_sweep.run_sweep({
+            "design": "latin_hypercube",
+            "n_samples": 4,
+            "n_core": 2,
+            "attribute_variation": self.av,
+            "output_file": str(tmp_path / "sweep.csv"),
+        }, {"components": []})
+        # smooth error: no KPIs
+        assert [row["failure"] for row in rows] == ["error"] * 4
+        assert list(rows[0]) == ["point", "foo.bar", "foo.baz", "costs", "emissions", "failure"]
+
+    def test_lost_worker(self, tmp_path, monkeypatch):
+        def evaluate_genes(idx, values):
+            if values[0] == 0:
+                # worker killed during evaluation
+                os._exit(1)
+            return idx, (), None, {"sum": values[0] + values[1], "prod": 0}, None
+
+        # forked workers use the patched functions
+        monkeypatch.setattr(run_sweep, "init_worker", lambda *args: None)
+        monkeypatch.setattr(run_sweep, "evaluate_genes", evaluate_genes)
+        monkeypatch.setattr(run_sweep, "LIVENESS_INTERVAL", 0.1)
+        rows = run_sweep.Sweep({
+            "n_core": 2,
+            "attribute_variation": [self.av[0], dict(self.av[1], val_step=1)],
+            "model": {"components": {}},
+            "kpis": self.kpis,
+            "output_file": str(tmp_path / "sweep.csv"),
+        }).run()
+        assert len(rows) == 8
+        for row in rows:
+            if row["foo.bar"] == 0:
+                assert row["failure"] == "lost"
+            else:
+                assert row["sum"] == row["foo.bar"] + row["foo.baz"]
+
+
+class DispatchComponent:
+    # component after dispatch: results only depend on capex and life_time
+    def __init__(self, name):
+        self.name = name
+        self.life_time = 10
+        self.results = {"variable_costs": [1, 2, 3]}
+        self.capex = {"cost": 100}
+        self.opex = {}
+        self.fix_emissions = {}
+        self.op_emissions = {}
+        self.flows = {("a", "b"): [0, 1, 2]}
+
+    def check_validity(self):
+        if self.capex and self.life_time <= 0:
+            raise ValueError("life_time not greater than zero")
+
+    def generate_results(self):
+        self.capex["annuity"] = self.capex["cost"] / self.life_time
+        self.results["annuity_total"] = self.capex["annuity"] + sum(self.results["variable_costs"])
+
+
+class TestDispatchCache:
+    avs = [
+        opt.AttributeVariation(comp_name="foo", comp_attribute="life_time", val_min=1, val_max=20),
+        opt.AttributeVariation(comp_name="foo", comp_attribute="power", val_min=0, val_max=10),
+        opt.AttributeVariation(
+            comp_name="foo", comp_attribute="eta", val_min=0, val_max=1, dispatch_invariant=True),
+    ]
+
+    def test_key(self):
+        assert [dispatch_cache.is_dispatch_invariant(av) for av in self.avs] == [True, False, True]
+        cache = dispatch_cache.DispatchCache(self.avs)
+        assert cache.key([5, 2, 0.5]) == cache.key([10, 2, 0])
+        assert cache.key([5, 2, 0.5]) != cache.key([5, 3, 0.5])
+        assert cache.key([5, 2, 0.5]) != cache.key([5, 2, 0.5], {"n_intervals": 24})
+        # zero removes component
+        cache = dispatch_cache.DispatchCache(self.avs, ignore_zero=True)
+        assert cache.key([5, 2, 0.5]) != cache.key([5, 2, 0])
+
+    def test_cache(self):
+        class SimParams:
+            n_intervals = 3
+
+        hook = dispatch_cache.SnapshotHook()
+        components = [DispatchComponent("foo"), DispatchComponent("bar")]
+        for i in range(3):
+            hook.on_interval_end(i, SimParams, components)
+            assert (hook.components is None) == (i < 2)
+        # flows shared, results copied
+        assert hook.components[0].flows is components[0].flows
+        assert hook.components[0].results is not components[0].results
+
+        cache = dispatch_cache.DispatchCache(self.avs, max_size=2)
+        cache.put("a", hook.components)
+        cache.put("b", [])
+        assert cache.get("a") is not None
+        cache.put("c", [])
+        # least recently used dropped
+        assert cache.get("b") is None
+        assert cache.hits == 1
+
+        result = dispatch_cache.finish_dispatch(cache.get("a"), self.avs, [4, 2, 0.5])
+        assert result[0].life_time == 4
+        assert result[0].results["annuity_total"] == 100 / 4 + 6
+        # saved snapshot not changed
+        assert "annuity_total" not in cache.snapshots["a"][0].results
+        assert cache.snapshots["a"][0].life_time == 10
+        # invalid cost-only attribute
+        with pytest.raises(ValueError):
+            dispatch_cache.finish_dispatch(cache.get("a"), self.avs, [0, 2, 0.5])
+
+    def test_evaluate_genes(self):
+        model = {"components": {"foo": {}}, "sim_params": {}}
+        objectives = (lambda x: -sum(c.results["annuity_total"] for c in x),)
+        opt.init_worker(model, self.avs, dill.dumps(objectives), reuse_dispatch=True)
+        cache = opt.worker_state["dispatch_cache"]
+        cache.put(cache.key([5, 2, 0.5]), [DispatchComponent("foo")])
+        # only life_time differs: not simulated
+        assert opt.evaluate_genes(1, [20, 2, 0.1]) == (1, (-11,), None, None, None)
+        assert cache.hits == 1
+        # invalid like a simulated individual
+        assert opt.evaluate_genes(1, [0, 2, 0.1]) == (1, None, None, None, 'error')
+        # other dispatch: simulated (fails without oemof model)
+        assert opt.evaluate_genes(2, [20, 3, 0.1])[1] is None
+        assert len(cache.snapshots) == 1
+
+
+class TestIslands:
+    config = {
+        "population_size": 8,
+        "n_generation": 4,
+        "n_core": 5,
+        "n_islands": 2,
+        "migration_interval": 2,
+        "attribute_variation": TestCheckpoint.av,
+        "model": {"components": {}},
+    }
+
+    def test_make_islands(self):
+        o = LocalOptimization(self.config)
+        o.population = [opt.Individual([i, 0]) for i in range(5)]
+        islands = o.make_islands()
+        assert [island.n_core for island in islands] == [3, 2]
+        assert [island.population_size for island in islands] == [4, 4]
+        assert [[ind[0] for ind in island.population] for island in islands] == [
+            [0, 2, 4], [1, 3]]
+        # shared evaluations, own population
+        assert all(island.evaluated is o.evaluated for island in islands)
+        assert islands[0].population is not islands[1].population
+
+    def test_migrate(self):
+        o = LocalOptimization(self.config, n_islands=3, n_migrants=1)
+        islands = o.make_islands()
+        fitness = [[(0, 0), (1, 1)], [(2, 2), (0, 0)], [(-1, -1)]]
+        for island, island_fitness in zip(islands, fitness):
+            for f in island_fitness:
+                ind = opt.Individual(list(f))
+                ind.fitness = f
+                island.population.append(ind)
+        # already on receiving island: not added twice
+        islands[1].population.append(islands[0].population[1])
+        o.migrate(islands)
+        assert [ind.fitness for ind in islands[0].population] == [(0, 0), (1, 1), (-1, -1)]
+        assert [ind.fitness for ind in islands[1].population] == [(2, 2), (0, 0), (1, 1)]
+        assert [ind.fitness for ind in islands[2].population] == [(-1, -1), (2, 2)]
+
+    def test_run_islands(self):
+        o = LocalOptimization(self.config)
+        result = o.run()
+        assert [stats['generation'] for stats in o.generation_stats] == [1, 2, 3, 4]
+        # each island generates population_size / n_islands children per generation
+        assert all(stats['n_evaluated'] == 8 for stats in o.generation_stats)
+        # no configuration is evaluated twice
+        assert len(o.evaluated) == 32
+        assert all(ind is not None for ind in o.evaluated.values())
+        assert result
+        assert not any(a.dominates(b) for a in result for b in result)
+
+
+class SerialPool:
+    # evaluator running all tasks immediately in the main process
+    def __init__(self, n_core, initializer, initargs):
+        initializer(*initargs)
+        self.calls = []
+
+    def apply_async(self, func, args, callback=None, error_callback=None):
+        self.calls.append((func, args))
+        callback(func(*args))
+        return self
+
+    def wait(self):
+        pass
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+class TestBatchEvaluation:
+    def test_stack_models(self):
+        model = {
+            "busses": ["bel"],
+            "components": {"ely": {
+                "component": "ely", "bus_el": "bel", "flow": ("bel", "ely"), "csv": "bel.csv"}},
+            "sim_params": {"n_intervals": 2},
+        }
+        stacked = batch_evaluation.stack_models([model, model])
+        assert stacked["busses"] == ["b0__bel", "b1__bel"]
+        assert stacked["components"]["b1__ely"] == {
+            "component": "ely", "bus_el": "b1__bel", "flow": ("b1__bel", "b1__ely"),
+            "csv": "bel.csv"}
+        assert stacked["sim_params"] == model["sim_params"]
+        # original not changed
+        assert model["components"]["ely"]["bus_el"] == "bel"
+
+        other = dict(model, sim_params={"n_intervals": 3})
+        with pytest.raises(AssertionError):
+            batch_evaluation.stack_models([model, other])
+
+    def test_split_components(self):
+        class Component:
+            def __init__(self, name):
+                self.name = name
+                self.bus_el = name[:4] + "bel"
+                self.flows = {(self.bus_el, name): [1, 2]}
+                self.results = {"annuity_total": 1}
+
+        components = [Component("b1__ely"), Component("b0__ely"), Component("b1__h2")]
+        blocks = batch_evaluation.split_components(components, 3)
+        assert [[c.name for c in block] for block in blocks] == [["ely"], ["ely", "h2"], []]
+        assert blocks[0][0].bus_el == "bel"
+        assert blocks[1][1].flows == {("bel", "h2"): [1, 2]}
+
+    def test_evaluate_batch(self):
+        model = {"components": {"foo": {"bar": 0}, "bar": {"foo": 0}},
+                 "busses": [], "sim_params": {}}
+        av = [opt.AttributeVariation(TestGA.av_dict)]
+        opt.init_worker(model, av, dill.dumps(()), ignore_zero=True, save_results=False)
+        # stacked simulation fails: evaluated one by one, smooth throws error for each
+        assert opt.evaluate_batch([(3, [0]), (4, [1])]) == [
+            (3, None, None, None, 'error'), (4, None, None, None, 'error')]
+        assert model["components"] == {"foo": {"bar": 0}, "bar": {"foo": 0}}
+
+    def test_compute_fitness(self):
+        pools = []
+
+        def evaluator(n_core, initializer, initargs):
+            pools.append(SerialPool(n_core, initializer, initargs))
+            return pools[-1]
+
+        o = opt.Optimization({
+            "population_size": 7,
+            "n_generation": 1,
+            "n_core": 2,
+            "batch_size": 3,
+            "evaluator": evaluator,
+            "attribute_variation": TestCheckpoint.av,
+            "model": {"components": {"foo": {"bar": 0, "baz": 0}}, "busses": []},
+        })
+        o.population = [opt.Individual([i, 0]) for i in range(7)]
+        assert o.compute_fitness() == 7
+        # at most batch_size individuals per batch
+        assert [len(args[0]) for _, args in pools[0].calls] == [3, 2, 2]
+        assert all(func is opt.evaluate_batch for func, _ in pools[0].calls)
+        assert all(ind.failure == 'error' for ind in o.population)
+
+    def test_equivalence(self, tmp_path, monkeypatch):
+        pytest.importorskip("oemof.solph")
+        from smooth.examples.example_model import mymodel
+        model = copy.deepcopy(mymodel)
+        names = [c.pop("name") for c in model["components"]]
+        model["components"] = dict(zip(names, model["components"]))
+        av = [opt.AttributeVariation({
+            "comp_name": "this_ely", "comp_attribute": "power_max",
+            "val_min": 100e3, "val_max": 2000e3, "val_step": 50e3,
+        }), opt.AttributeVariation({
+            "comp_name": "h2_storage", "comp_attribute": "storage_capacity",
+            "val_min": 0, "val_max": 2000, "val_step": 50,
+        })]
+        objectives = opt.Optimization(
+            population_size=1, n_generation=1, attribute_variation=[],
+            model=model).objectives
+        monkeypatch.chdir(tmp_path)
+        opt.init_worker(model, av, dill.dumps(objectives), save_results=True)
+
+        tasks = [(0, [500e3, 500]), (1, [1000e3, 0]), (2, [1500e3, 2000])]
+        single = [opt.evaluate_genes(idx, genes) for idx, genes in tasks]
+        batch = opt.evaluate_batch(tasks)
+        for single_result, batch_result in zip(single, batch):
+            assert single_result[1] is not None
+            assert batch_result[0] == single_result[0]
+            assert batch_result[1] == pytest.approx(single_result[1], rel=1e-6)
+            # flow names: oemof nodes for single, labels for batched components
+            for single_comp, batch_comp in zip(single_result[2], batch_result[2]):
+                assert batch_comp.name == single_comp.name
+                assert all(isinstance(node, str) for name in batch_comp.flows for node in name)
+                assert set(batch_comp.flows) == set(
+                    tuple(str(node) for node in name) for name in single_comp.flows)
+                # lookup by labels works for both
+                for name in batch_comp.flows:
+                    assert batch_comp.flows[name] == pytest.approx(single_comp.flows[name])